@@ -0,0 +1,180 @@
+"""Admin HTTP endpoints for capacity planning and leak hunting."""
+
+import os
+import secrets
+
+from app.manager import AppManager
+from events.events import EventQueue
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from game.game import Game
+from game.show import Contestant, ShowGame
+from metrics.memory import MemoryProfiler
+from metrics.prometheus import MetricType, PrometheusText
+from player.player import Player
+from questions.bank import QuestionBank
+from questions.models import Category, Question
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+LOCAL_HOSTS = {"127.0.0.1", "::1", "localhost"}
+COUNT_HELP = {
+    "games_running": "The number of games being played.",
+    "games_finished": "The number of ended games waiting to be evicted.",
+    "players_connected": "The number of players connected to the worker.",
+    "players_in_games": "The number of players in games, bots included.",
+    "lobby_waiting": "The number of players waiting in the lobby.",
+    "chat_rooms": "The number of rooms with chat history.",
+}
+
+
+class AdminRoutes:
+    """Admin endpoints serving metrics in the Prometheus text format.
+
+    `/admin/metrics` is cheap enough to scrape. `/admin/memory` walks the heap
+    and is meant to be called by hand. Each worker reports only its own state.
+    With ADMIN_TOKEN set, requests must send it as a bearer token. Otherwise
+    only local requests are allowed.
+    """
+    MANAGER: AppManager | None = None
+
+    @staticmethod
+    def setup(app: FastAPI, manager: AppManager) -> None:
+        """Set up the admin endpoints.
+
+        Args:
+            app (FastAPI): The FastAPI application.
+            manager (AppManager): The application manager instance.
+        """
+        AdminRoutes.MANAGER = manager
+        app.get("/admin/metrics", response_class=PlainTextResponse)(
+            AdminRoutes.handle_metrics)
+        app.get("/admin/memory", response_class=PlainTextResponse)(
+            AdminRoutes.handle_memory)
+        app.post("/admin/shows")(AdminRoutes.handle_new_show)
+
+    @staticmethod
+    async def handle_metrics(request: Request) -> PlainTextResponse:
+        """Handles a request for the live counts and the event queue metrics.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Returns:
+            PlainTextResponse: The metrics.
+        """
+        AdminRoutes._authorize(request)
+        page = AdminRoutes._page()
+        for name, value in AdminRoutes.MANAGER.counts().items():
+            page.add(f"trivia_{name}", COUNT_HELP[name], MetricType.GAUGE, value)
+        page.add("trivia_questions_loaded", "The number of questions in the bank.",
+                 MetricType.GAUGE, QuestionBank.size())
+
+        stats = EventQueue.stats()
+        for shard, depth in enumerate(stats.depth):
+            page.add("trivia_event_queue_depth", "The number of events queued on a shard.",
+                     MetricType.GAUGE, depth, {"shard": str(shard)})
+        for event, dropped in stats.dropped.items():
+            page.add("trivia_event_queue_dropped_total",
+                     "The number of low priority events dropped under backpressure.",
+                     MetricType.COUNTER, dropped, {"event": event})
+        page.add("trivia_event_queue_wait_max_seconds",
+                 "The longest time an event waited in the queue.",
+                 MetricType.GAUGE, stats.max_wait_seconds)
+        page.add("trivia_event_queue_wait_avg_seconds",
+                 "The average time events waited in the queue.",
+                 MetricType.GAUGE, stats.avg_wait_seconds)
+        return PlainTextResponse(page.render(), media_type=PrometheusText.CONTENT_TYPE)
+
+    @staticmethod
+    async def handle_memory(request: Request, top: int = Query(20, ge=0, le=200),
+                            stop: bool = False) -> PlainTextResponse:
+        """Handles a request for live object counts, per-game memory and top allocators.
+
+        The first request starts tracing allocations, so top allocators only
+        cover what was allocated since then.
+
+        Args:
+            request (Request): The HTTP request.
+            top (int, optional): The number of top allocators to report.
+            stop (bool, optional): Whether to stop tracing allocations afterwards.
+
+        Returns:
+            PlainTextResponse: The metrics.
+        """
+        AdminRoutes._authorize(request)
+        page = AdminRoutes._page()
+        live = MemoryProfiler.count_objects((Game, ShowGame, Player, Contestant, Question))
+        for name, count in live.items():
+            page.add("trivia_live_objects", "The number of live objects of a type.",
+                     MetricType.GAUGE, count, {"type": name})
+
+        sizes = []
+        for game in AdminRoutes.MANAGER.games():
+            size = MemoryProfiler.deep_size(game, shared=(Question,))
+            sizes.append(size)
+            page.add("trivia_game_memory_bytes",
+                     "The estimated memory held by a game, excluding shared questions.",
+                     MetricType.GAUGE, size, {"game": game.id})
+        page.add("trivia_game_memory_avg_bytes",
+                 "The average estimated memory held by a game.",
+                 MetricType.GAUGE, sum(sizes) / len(sizes) if sizes else 0)
+
+        for rank, allocator in enumerate(MemoryProfiler.top_allocators(top)):
+            labels = {"rank": str(rank), "location": allocator.location}
+            page.add("trivia_alloc_bytes", "The memory still held from a source line.",
+                     MetricType.GAUGE, allocator.size_bytes, labels)
+            page.add("trivia_alloc_blocks", "The blocks still held from a source line.",
+                     MetricType.GAUGE, allocator.count, labels)
+        current, peak = MemoryProfiler.traced_bytes()
+        page.add("trivia_traced_bytes", "The memory allocated since tracing started.",
+                 MetricType.GAUGE, current)
+        page.add("trivia_traced_peak_bytes", "The peak traced memory.",
+                 MetricType.GAUGE, peak)
+        if stop:
+            MemoryProfiler.stop()
+        return PlainTextResponse(page.render(), media_type=PrometheusText.CONTENT_TYPE)
+
+    @staticmethod
+    async def handle_new_show(request: Request, category: Category = Category.RANDOM,
+                              questions: int = Query(ShowGame.NUM_QUESTIONS, ge=1, le=50),
+                              start_in: int = Query(30, ge=1, le=3600)) -> dict:
+        """Handles a request to create a live show for a large audience.
+
+        Args:
+            request (Request): The HTTP request.
+            category (Category, optional): The category of the questions.
+            questions (int, optional): The number of questions.
+            start_in (int, optional): The seconds before the first question.
+
+        Returns:
+            dict: The id of the show, which players join like a game.
+        """
+        AdminRoutes._authorize(request)
+        game_id = await AdminRoutes.MANAGER.new_show(category, questions, start_in)
+        return {"id": game_id}
+
+    @staticmethod
+    def _page() -> PrometheusText:
+        """Creates a page of metrics labelled with this worker.
+
+        Returns:
+            PrometheusText: The empty page.
+        """
+        return PrometheusText({"worker": str(AdminRoutes.MANAGER.worker_id)})
+
+    @staticmethod
+    def _authorize(request: Request) -> None:
+        """Rejects requests that may not see admin data.
+
+        Args:
+            request (Request): The HTTP request.
+
+        Raises:
+            HTTPException: If the request is not authorized.
+        """
+        if ADMIN_TOKEN:
+            header = request.headers.get("authorization", "")
+            if not secrets.compare_digest(header, f"Bearer {ADMIN_TOKEN}"):
+                raise HTTPException(status_code=401, detail="invalid admin token")
+        elif request.client is None or request.client.host not in LOCAL_HOSTS:
+            raise HTTPException(status_code=403, detail="admin endpoints are local only")
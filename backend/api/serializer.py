@@ -0,0 +1,87 @@
+"""JSON serializers for Socket.IO packets."""
+
+import json
+from types import SimpleNamespace
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = json.JSONEncoder(
+    separators=(",", ":"), ensure_ascii=False, check_circular=False)
+
+
+def _stdlib_dumps(obj: object, **_) -> str:
+    """Encodes an object with the stdlib json module.
+
+    Args:
+        obj (object): The object to encode.
+
+    Returns:
+        str: The JSON text.
+    """
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _compact_dumps(obj: object, **_) -> str:
+    """Encodes an object with a reused, compact stdlib encoder.
+
+    Our enums (GamePhase, Category, PlayerType, BotLevel, PowerUp) subclass str,
+    so the C encoder writes them directly, without a `default` fallback.
+
+    Args:
+        obj (object): The object to encode.
+
+    Returns:
+        str: The JSON text.
+    """
+    return _encoder.encode(obj)
+
+
+def _orjson_dumps(obj: object, **_) -> str:
+    """Encodes an object with orjson, which serializes enums natively.
+
+    Args:
+        obj (object): The object to encode.
+
+    Returns:
+        str: The JSON text.
+    """
+    return orjson.dumps(obj).decode()
+
+
+def _orjson_loads(s: str | bytes, **_) -> object:
+    """Decodes JSON text with orjson.
+
+    Args:
+        s (str | bytes): The JSON text.
+
+    Returns:
+        object: The decoded object.
+    """
+    return orjson.loads(s)
+
+
+STDLIB = SimpleNamespace(dumps=_stdlib_dumps, loads=json.loads)
+COMPACT = SimpleNamespace(dumps=_compact_dumps, loads=json.loads)
+ORJSON = SimpleNamespace(dumps=_orjson_dumps, loads=_orjson_loads)
+
+
+def get_serializer(name: str = "fast") -> SimpleNamespace:
+    """Gets a json-compatible module to pass to socketio.AsyncServer(json=...).
+
+    Args:
+        name (str, optional): One of "stdlib", "compact", "orjson", or "fast", which
+            is orjson when it is installed and compact otherwise. Defaults to "fast".
+
+    Returns:
+        SimpleNamespace: An object with `dumps` and `loads` functions.
+    """
+    match name:
+        case "stdlib": return STDLIB
+        case "compact": return COMPACT
+        case "orjson" if orjson is not None: return ORJSON
+        case "orjson": raise ValueError("orjson is not installed")
+        case "fast": return ORJSON if orjson is not None else COMPACT
+        case _: raise ValueError(f"unknown serializer: {name}")
@@ -2,14 +2,21 @@
 
 import socketio
 from app.manager import AppManager
-from events.data import (JoinGameData, MessageData, NewPlayerData,
-                         SelectCategoryData, SetBotLevelData, SubmitAnswerData,
-                         UsePowerupData)
+from events.data import (JoinGameData, JoinLobbyData, MessageData,
+                         NewPlayerData, ResumeSessionData, SelectCategoryData,
+                         SetBotLevelData, SubmitAnswerData, UsePowerupData)
 from events.events import ClientEvent
+from log.log import get_logger
+
+log = get_logger(__name__, sampled=True)
 
 
 class SocketHandlers:
-    """Socket.IO event handlers for the application."""
+    """Socket.IO event handlers for the application.
+
+    Lookups and registration reply through the client's acknowledgement
+    callback, so only the caller gets the answer.
+    """
     SERVER: socketio.AsyncServer | None = None
     MANAGER: AppManager | None = None
 
@@ -31,6 +38,7 @@ class SocketHandlers:
         on = SocketHandlers.SERVER.on
         on(ClientEvent.GET_PLAYER)(SocketHandlers.handle_get_player)
         on(ClientEvent.NEW_PLAYER)(SocketHandlers.handle_new_player)
+        on(ClientEvent.RESUME_SESSION)(SocketHandlers.handle_resume_session)
         on(ClientEvent.JOIN_LOBBY)(SocketHandlers.handle_join_lobby)
         on(ClientEvent.JOIN_GAME)(SocketHandlers.handle_join_game)
         on(ClientEvent.SET_BOT_LEVEL)(SocketHandlers.handle_set_bot_level)
@@ -41,38 +49,63 @@ class SocketHandlers:
         on(ClientEvent.MESSAGE)(SocketHandlers.handle_message)
 
     @staticmethod
-    async def handle_get_player(sid: str, _: dict) -> None:
+    async def handle_get_player(sid: str, _: dict) -> dict:
         """Handles a player getting their player info.
 
         Args:
             sid (str): The socket ID of the player.
             _ (dict): The data from the client.
+
+        Returns:
+            dict: The player info, sent back to the caller as the acknowledgement.
         """
-        print(f"[backend] {sid} got player info")
-        await SocketHandlers.MANAGER.get_player_info(sid)
+        log.debug("%s got player info", sid)
+        info = await SocketHandlers.MANAGER.get_player_info(sid)
+        return info.__dict__
 
     @staticmethod
-    async def handle_new_player(sid: str, data: dict) -> None:
+    async def handle_new_player(sid: str, data: dict) -> dict:
         """Handles a new player submitting their name.
 
         Args:
             sid (str): The socket ID of the player.
             data (dict): The data from the client.
+
+        Returns:
+            dict: The session token, sent back to the caller as the acknowledgement.
         """
-        print(f"[backend] {sid} new player")
+        log.debug("%s new player", sid)
         event_data = NewPlayerData.from_dict(data)
-        await SocketHandlers.MANAGER.new_player(sid, event_data)
+        registered = await SocketHandlers.MANAGER.new_player(sid, event_data)
+        return registered.__dict__
+
+    @staticmethod
+    async def handle_resume_session(sid: str, data: dict) -> dict:
+        """Handles a reconnecting player resuming their session.
+
+        Args:
+            sid (str): The socket ID of the player.
+            data (dict): The data from the client.
+
+        Returns:
+            dict: The session token, sent back to the caller as the acknowledgement.
+        """
+        log.debug("%s resumed session", sid)
+        event_data = ResumeSessionData.from_dict(data)
+        registered = await SocketHandlers.MANAGER.resume_session(sid, event_data)
+        return registered.__dict__
 
     @staticmethod
-    async def handle_join_lobby(sid: str, _: dict) -> None:
+    async def handle_join_lobby(sid: str, data: dict) -> None:
         """Handles a player joining the lobby.
 
         Args:
             sid (str): The socket ID of the player.
-            _ (dict): The data from the client.
+            data (dict): The data from the client.
         """
-        print(f"[backend] {sid} joined lobby")
-        await SocketHandlers.MANAGER.join_lobby(sid)
+        event_data = JoinLobbyData.from_dict(data)
+        log.debug("%s joined lobby %s", sid, event_data.level)
+        await SocketHandlers.MANAGER.join_lobby(sid, event_data)
 
     @staticmethod
     async def handle_join_game(sid: str, data: dict) -> None:
@@ -83,7 +116,7 @@ class SocketHandlers:
             data (dict): The data from the client.
         """
         event_data = JoinGameData.from_dict(data)
-        print(f"[backend] {sid} joined game {event_data.game_id}")
+        log.debug("%s joined game %s", sid, event_data.game_id)
         await SocketHandlers.MANAGER.join_game(sid, event_data)
 
     @staticmethod
@@ -95,8 +128,8 @@ class SocketHandlers:
             data (dict): The data from the client.
         """
         event_data = SetBotLevelData.from_dict(data)
-        print(f"[backend] {sid} set bot level {event_data.level}")
-        SocketHandlers.MANAGER.set_bot_level(sid, event_data)
+        log.debug("%s set bot level %s", sid, event_data.level)
+        await SocketHandlers.MANAGER.set_bot_level(sid, event_data)
 
     @staticmethod
     async def handle_select_category(sid: str, data: dict) -> None:
@@ -107,8 +140,8 @@ class SocketHandlers:
             data (dict): The data from the client.
         """
         event_data = SelectCategoryData.from_dict(data)
-        print(f"[backend] {sid} selected category {event_data.category}")
-        SocketHandlers.MANAGER.select_category(sid, event_data)
+        log.debug("%s selected category %s", sid, event_data.category)
+        await SocketHandlers.MANAGER.select_category(sid, event_data)
 
     @staticmethod
     async def handle_submit_answer(sid: str, data: dict) -> None:
@@ -118,9 +151,9 @@ class SocketHandlers:
             sid (str): The socket ID of the player.
             data (dict): The data from the client.
         """
-        print(f"[backend] {sid} submitted answer {data}")
         event_data = SubmitAnswerData.from_dict(data)
-        SocketHandlers.MANAGER.submit_answer(sid, event_data)
+        log.debug("%s submitted answer %s", sid, data)
+        await SocketHandlers.MANAGER.submit_answer(sid, event_data)
 
     @staticmethod
     async def handle_use_powerup(sid: str, data: dict) -> None:
@@ -130,21 +163,21 @@ class SocketHandlers:
             sid (str): The socket ID of the player.
             data (dict): The data from the client.
         """
-        print(f"[backend] {sid} used powerup {data}")
+        log.debug("%s used powerup %s", sid, data)
         event_data = UsePowerupData.from_dict(data)
         await SocketHandlers.MANAGER.use_powerup(sid, event_data)
 
     @staticmethod
-    async def handle_message(_: str, data: dict) -> None:
-        """Handles a player sending a message.
+    async def handle_message(sid: str, data: dict) -> None:
+        """Handles a player sending a chat message to their room.
 
         Args:
             sid (str): The socket ID of the player.
             data (dict): The data from the client.
         """
-        print(f"[backend] sent message {data}")
+        log.debug("%s sent message %s", sid, data)
         event_data = MessageData.from_dict(data)
-        await SocketHandlers.MANAGER.send_message(event_data)
+        await SocketHandlers.MANAGER.chat(sid, event_data)
 
     @staticmethod
     async def handle_disconnect(sid: str, _: dict) -> None:
@@ -154,5 +187,5 @@ class SocketHandlers:
             sid (str): The socket ID of the player.
             _ (dict): The data from the client.
         """
-        print(f"[backend] {sid} disconnected")
+        log.info("%s disconnected", sid)
         await SocketHandlers.MANAGER.disconnect(sid)
@@ -0,0 +1,90 @@
+"""Per-room game state broadcasting with delta encoding."""
+
+import time
+
+from app.emitter import BatchEmitter
+from events.data import GameUpdateData
+from events.events import ServerEvent
+
+
+class GameBroadcaster:
+    """Broadcasts game updates, sending only the fields that changed since the last update."""
+
+    def __init__(self, emitter: BatchEmitter):
+        self._emitter = emitter
+        self._last: dict[str, dict] = {}
+
+    async def update(self, game: GameUpdateData) -> None:
+        """Broadcasts a game update to its room.
+
+        A full snapshot is sent when the phase changes, otherwise only the delta
+        from the last state sent to the room. The server time is only sent with
+        a new deadline, since clients need nothing else from it.
+
+        Args:
+            game (GameUpdateData): The game data to broadcast.
+        """
+        state = game.to_dict()
+        last = self._last.get(game.id)
+        self._last[game.id] = state
+        if last is None or last["phase"] != state["phase"]:
+            await self._emitter.emit(ServerEvent.GAME_UPDATE, state, to=game.id)
+            return
+        delta = GameBroadcaster._diff(last, state)
+        if "deadline" not in delta:
+            delta.pop("server_time", None)
+        if delta:
+            delta["id"] = game.id
+            await self._emitter.emit(ServerEvent.GAME_DELTA, delta, to=game.id)
+
+    async def send_snapshot(self, sid: str, game_id: str) -> None:
+        """Sends the last full state of a game to a single client.
+
+        The server time is refreshed, so the client counts down to the right deadline.
+
+        Args:
+            sid (str): The socket id of the client.
+            game_id (str): The id of the game.
+        """
+        state = self._last.get(game_id)
+        if state is not None:
+            state = {**state, "server_time": time.monotonic()}
+            await self._emitter.emit(ServerEvent.GAME_UPDATE, state, to=sid)
+
+    def forget(self, game_id: str) -> None:
+        """Drops the last state sent for a game.
+
+        Args:
+            game_id (str): The id of the game.
+        """
+        self._last.pop(game_id, None)
+
+    @staticmethod
+    def _diff(old: dict, new: dict) -> dict:
+        """Computes the fields of the game state that changed.
+
+        Args:
+            old (dict): The last state sent.
+            new (dict): The current state.
+
+        Returns:
+            dict: The changed fields. Players are diffed field by field, and
+                players that left are listed under `removed_players`.
+        """
+        delta = {k: v for k, v in new.items()
+                 if k != "players" and old.get(k) != v}
+        players = {}
+        for sid, p in new["players"].items():
+            old_p = old["players"].get(sid)
+            if old_p is None:
+                players[sid] = p
+                continue
+            changed = {k: v for k, v in p.items() if old_p.get(k) != v}
+            if changed:
+                players[sid] = changed
+        if players:
+            delta["players"] = players
+        removed = [sid for sid in old["players"] if sid not in new["players"]]
+        if removed:
+            delta["removed_players"] = removed
+        return delta
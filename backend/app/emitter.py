@@ -0,0 +1,94 @@
+"""Batched emitting of server events."""
+
+import asyncio
+
+import socketio
+from engineio import packet as eio_packet
+from socketio import packet
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from log.log import get_logger
+
+log = get_logger(__name__)
+
+
+class BatchEmitter:
+    """Collects outbound events and sends them in bulk, once per flush window.
+
+    Each distinct payload in a batch is encoded once, however many rooms or
+    clients it is sent to, and the encoded packets are handed straight to the
+    engine.io layer in emit order. The recipients of the whole batch are
+    collected before the first send, as a send can disconnect a client and
+    change the rooms.
+    """
+
+    FLUSH_SECONDS = 0.005
+    NAMESPACE = "/"
+
+    def __init__(self, sio: socketio.AsyncServer, flush_seconds: float = FLUSH_SECONDS):
+        self._sio = sio
+        self._flush_seconds = flush_seconds
+        self._pending: list[tuple[str, object, str | None]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    async def emit(self, event: str, data: object, to: str | None = None) -> None:
+        """Queues an event to be sent on the next flush.
+
+        Args:
+            event (str): The event to emit.
+            data (object): The data to emit.
+            to (str | None, optional): The room or sid to emit to. Defaults to every client.
+        """
+        self._pending.append((event, data, to))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        """Sends every queued event."""
+        batch, self._pending = self._pending, []
+        if isinstance(self._sio.manager, AsyncPubSubManager):
+            for event, data, to in batch:
+                await self._sio.emit(event, data, to=to)
+            return
+        encoded: dict[tuple[str, int], list[eio_packet.Packet]] = {}
+        sends: list[tuple[str, eio_packet.Packet]] = []
+        for event, data, to in batch:
+            key = (event, id(data))
+            if key not in encoded:
+                encoded[key] = self._encode(event, data)
+            for _, eio_sid in list(self._sio.manager.get_participants(self.NAMESPACE, to)):
+                sends.extend((eio_sid, p) for p in encoded[key])
+        if not sends:
+            return
+        tasks = [asyncio.create_task(self._sio._send_eio_packet(eio_sid, p))
+                 for eio_sid, p in sends]
+        await asyncio.wait(tasks)
+        for task in tasks:
+            if task.exception() is not None:
+                log.debug("emit failed: %r", task.exception())
+
+    async def _flush_later(self) -> None:
+        """Flushes the queued events once the flush window has passed."""
+        await asyncio.sleep(self._flush_seconds)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            log.exception("flush failed")
+
+    def _encode(self, event: str, data: object) -> list[eio_packet.Packet]:
+        """Encodes an event into engine.io packets.
+
+        Args:
+            event (str): The event to encode.
+            data (object): The data to encode.
+
+        Returns:
+            list[eio_packet.Packet]: The encoded packets.
+        """
+        pkt = self._sio.packet_class(
+            packet.EVENT, namespace=self.NAMESPACE, data=[event, data])
+        encoded = pkt.encode()
+        if not isinstance(encoded, list):
+            encoded = [encoded]
+        return [eio_packet.Packet(eio_packet.MESSAGE, p) for p in encoded]
@@ -3,62 +3,157 @@
 import uuid
 
 import socketio
-from events.data import (GameUpdateData, JoinGameData, LobbyUpdateData,
-                         MessageData, NewPlayerData, SelectCategoryData,
-                         SetBotLevelData, SubmitAnswerData, UsePowerupData)
+from app.broadcast import GameBroadcaster
+from app.emitter import BatchEmitter
+from chat.chat import Chat
+from clock.clock import GameClock
+from cluster.router import WorkerRouter
+from events.data import (ChatData, GameUpdateData, JoinGameData, JoinLobbyData,
+                         LobbyDeltaData, LobbyUpdateData, MatchData,
+                         MessageData, NewGameData, NewPlayerData,
+                         PlayerInfoData, PlayerRegisteredData, ResumeSessionData,
+                         SelectCategoryData, SetBotLevelData,
+                         ShowResultsData, ShowUpdateData, SubmitAnswerData,
+                         UsePowerupData)
 from events.events import EventQueue, ServerEvent
+from game.game import Game
 from game.manager import GameManager
+from game.show import ShowGame
+from game.snapshots import SnapshotStore
+from gemini.prompts import PromptRegistry
 from lobby.lobby import Lobby
+from log.log import get_logger
 from player.manager import PlayerManager
-from player.player import Player
+from player.player import BotLevel, Player, PowerUp
+from questions.models import Category
+
+log = get_logger(__name__, sampled=True)
 
 
 class AppManager:
-    """Manages the application and coordinates between services."""
+    """Manages the application and coordinates between services.
+
+    Client events are received by the worker the client is connected to, which
+    then routes the operation to the worker that owns the lobby or the game.
+    """
 
-    def __init__(self):
+    def __init__(self, router: WorkerRouter | None = None):
         self._lobby = Lobby()
-        self._game_manager = GameManager()
+        self._game_manager = GameManager(on_evict=self._forget_game)
         self._player_manager = PlayerManager()
+        self._chat = Chat()
+        self._router = router or WorkerRouter()
         self.sio: socketio.AsyncServer | None = None
+        self._emitter: BatchEmitter | None = None
+        self._broadcaster: GameBroadcaster | None = None
+        self._register_routes()
 
     async def run(self) -> None:
         """Runs the app manager."""
-        self.sio.start_background_task(self.consume_events)
+        self._emitter = BatchEmitter(self.sio)
+        self._broadcaster = GameBroadcaster(self._emitter)
+        for shard in range(EventQueue.NUM_SHARDS):
+            self.sio.start_background_task(self.consume_events, shard)
+        self.sio.start_background_task(GameClock.run)
+        self.sio.start_background_task(PromptRegistry.watch)
+        if SnapshotStore.is_enabled():
+            restored = self._game_manager.restore_games()
+            log.info("restored %d games", restored)
+            self.sio.start_background_task(SnapshotStore.run)
+        if self._router.bus is not None:
+            self.sio.start_background_task(self._router.listen)
+
+    async def consume_events(self, shard: int) -> None:
+        """Consumes server events from a shard of the event queue.
 
-    async def consume_events(self) -> None:
-        """Consumes server events from the event queue."""
+        Args:
+            shard (int): The shard to consume.
+        """
         while True:
-            event, data = await EventQueue.get()
+            event, data = await EventQueue.get(shard)
             match event:
                 case ServerEvent.LOBBY_UPDATE: await self._lobby_update(data)
-                case ServerEvent.NEW_GAME: await self._new_game()
+                case ServerEvent.LOBBY_DELTA: await self._lobby_delta(data)
+                case ServerEvent.NEW_GAME: await self._new_game(data)
                 case ServerEvent.GAME_UPDATE: await self._game_update(data)
+                case ServerEvent.SHOW_UPDATE: await self._show_update(data)
+                case ServerEvent.SHOW_RESULT: await self._show_results(data)
                 case ServerEvent.MESSAGE: await self.send_message(data)
+                case ServerEvent.CHAT: await self._chat_messages(data)
+
+    @property
+    def worker_id(self) -> int:
+        """The id of the worker this manager runs on."""
+        return self._router.worker_id
+
+    def counts(self) -> dict[str, int]:
+        """Gets the number of games and players on this worker.
+
+        Returns:
+            dict[str, int]: The counts, by name.
+        """
+        return {
+            "games_running": self._game_manager.num_running(),
+            "games_finished": self._game_manager.num_finished(),
+            "players_connected": self._player_manager.num_players(),
+            "players_in_games": self._game_manager.num_players(),
+            "lobby_waiting": self._lobby.num_waiting(),
+            "chat_rooms": self._chat.num_rooms(),
+        }
+
+    def games(self) -> list[Game | ShowGame]:
+        """Gets the games owned by this worker.
+
+        Returns:
+            list[Game | ShowGame]: The games.
+        """
+        return self._game_manager.games()
+
+    async def new_show(self, category: Category, num_questions: int,
+                       start_seconds: int) -> str:
+        """Creates a live show on the worker that owns it.
+
+        Args:
+            category (Category): The category of the questions.
+            num_questions (int): The number of questions.
+            start_seconds (int): The time before the first question.
+
+        Returns:
+            str: The id of the show, which players join like a game.
+        """
+        game_id = self._router.new_game_id()
+        await self._router.dispatch(
+            game_id, "create_show", game_id=game_id, category=category,
+            num_questions=num_questions, start_seconds=start_seconds)
+        return game_id
 
     ############################################################
     # Client event handlers
     ############################################################
 
-    async def get_player_info(self, sid: str) -> None:
+    async def get_player_info(self, sid: str) -> PlayerInfoData:
         """Gets a player's info.
 
         Args:
             sid (str): The socket id of the player.
+
+        Returns:
+            PlayerInfoData: The player's info, for the caller only.
         """
-        info = self._player_manager.get_player_info(sid)
-        await self.sio.emit(ServerEvent.PLAYER_INFO, info.__dict__)
+        return self._player_manager.get_player_info(sid)
 
-    async def new_player(self, sid: str, data: NewPlayerData) -> None:
-        """Creates a new player and adds them to the lobby.
+    async def new_player(self, sid: str, data: NewPlayerData) -> PlayerRegisteredData:
+        """Creates a new player and welcomes them.
 
         Args:
             sid (str): The socket id of the player.
             data (NewPlayerData): The data from the client.
+
+        Returns:
+            PlayerRegisteredData: The player's session token, for the caller only.
         """
-        print("[app_manager] new_player", sid, data)
+        log.info("new_player %s %s", sid, data)
         player = self._player_manager.add_player(sid, data.name)
-        await self.sio.emit(ServerEvent.PLAYER_REGISTERED, sid, to=sid)
         message = MessageData(
             id=str(uuid.uuid4()),
             sender_id="0",
@@ -66,61 +161,105 @@ class AppManager:
             message=f"{player.name} joined the game! 🐟",
             destination_id=sid,
         )
-        await self.sio.emit(ServerEvent.MESSAGE, message.__dict__)
+        await self._emitter.emit(ServerEvent.MESSAGE, message.__dict__, to=sid)
+        return PlayerRegisteredData(player.token)
+
+    async def resume_session(self, sid: str, data: ResumeSessionData) -> PlayerRegisteredData:
+        """Registers a reconnecting player under their existing session token.
 
-    async def join_lobby(self, sid: str) -> None:
-        """Joins the player to the lobby.
+        The player then reclaims their seat by joining their game with the same token.
+        Only tokens issued by the server are accepted, and a socket that is
+        already registered cannot take another token.
+
+        Args:
+            sid (str): The new socket id of the player.
+            data (ResumeSessionData): The data from the client.
+
+        Returns:
+            PlayerRegisteredData: The player's session token, for the caller only,
+                or an empty token if the session was not resumed.
+        """
+        log.debug("resume_session %s", sid)
+        player = None
+        if PlayerManager.is_issued(data.token):
+            player = self._player_manager.resume_player(sid, data.token, data.name)
+        if player is None:
+            log.debug("resume_session rejected %s", sid)
+            return PlayerRegisteredData("")
+        return PlayerRegisteredData(player.token)
+
+    async def join_lobby(self, sid: str, data: JoinLobbyData) -> None:
+        """Joins the player to the lobby queue of their skill level.
 
         Args:
             sid (str): The socket id of the player.
+            data (JoinLobbyData): The data from the client.
         """
-        print("[app_manager] join_lobby", sid)
+        log.debug("join_lobby %s %s", sid, data)
         player = self._player_manager.get_player(sid)
+        player.level = data.level
         await self._add_to_lobby(player)
 
     async def join_game(self, sid: str, data: JoinGameData) -> None:
         """Joins the player to the game.
 
+        A socket that is not registered yet is registered here, if its token
+        was issued by the server or holds a seat in the game.
+
         Args:
             sid (str): The socket id of the player.
             data (JoinGameData): The data from the client.
         """
-        print("[app_manager] join_game", sid, data)
+        log.debug("join_game %s %s", sid, data)
         player = self._player_manager.get_player(sid)
+        if player is None:
+            if not self._knows_token(data.game_id, data.token):
+                log.debug("join_game with unknown token %s", sid)
+                return
+            player = self._player_manager.resume_player(sid, data.token, "")
         await self._set_room(player, data.game_id)
+        await self._router.dispatch(
+            data.game_id, "join_game", sid=sid, game_id=data.game_id,
+            token=data.token, name=player.name)
 
-    def set_bot_level(self, sid: str, data: SetBotLevelData) -> None:
+    async def set_bot_level(self, sid: str, data: SetBotLevelData) -> None:
         """Sets the bot level for a game.
 
         Args:
             sid (str): The socket id of the player.
             data (SetBotLevelData): The data from the client.
         """
-        print("[app_manager] set_bot_level", sid, data)
+        log.debug("set_bot_level %s %s", sid, data)
         player = self._player_manager.get_player(sid)
-        self._game_manager.set_bot_level(player.room, data.level)
+        await self._router.dispatch(
+            player.room, "set_bot_level",
+            game_id=player.room, level=data.level)
 
-    def select_category(self, sid: str, data: SelectCategoryData) -> None:
+    async def select_category(self, sid: str, data: SelectCategoryData) -> None:
         """Selects a category for the game.
 
         Args:
             sid (str): The socket id of the player.
             data (SelectCategoryData): The data from the client.
         """
-        print("[app_manager] select_category", sid, data)
+        log.debug("select_category %s %s", sid, data)
         player = self._player_manager.get_player(sid)
-        player.selected_category = data.category
+        await self._router.dispatch(
+            player.room, "select_category",
+            game_id=player.room, sid=sid, category=data.category)
 
-    def submit_answer(self, sid: str, data: SubmitAnswerData) -> None:
+    async def submit_answer(self, sid: str, data: SubmitAnswerData) -> None:
         """Submits an answer to the game.
 
         Args:
             sid (str): The socket id of the player.
             data (SubmitAnswerData): The data from the client.
         """
-        print("[app_manager] submit_answer", sid, data)
+        log.debug("submit_answer %s %s", sid, data)
         player = self._player_manager.get_player(sid)
-        self._game_manager.submit_answer(player, data.answer)
+        await self._router.dispatch(
+            player.room, "submit_answer",
+            game_id=player.room, sid=sid, answer=data.answer, received_at=data.received_at)
 
     async def use_powerup(self, sid: str, data: UsePowerupData) -> None:
         """Uses a powerup for the player.
@@ -129,22 +268,48 @@ class AppManager:
             sid (str): The socket id of the player.
             data (UsePowerupData): The data from the client.
         """
-        print("[app_manager] use_powerup", sid, data)
+        log.debug("use_powerup %s %s", sid, data)
         player = self._player_manager.get_player(sid)
-        await self._game_manager.use_powerup(player, data.powerup)
+        await self._router.dispatch(
+            player.room, "use_powerup",
+            game_id=player.room, sid=sid, powerup=data.powerup)
 
     async def send_message(self, data: MessageData) -> None:
-        """Sends a message to the players.
+        """Sends a message to a single player.
 
         Args:
             data (MessageData): The data to emit.
         """
-        print("[app_manager] send_message", data)
-        dest = data.destination_id if data.destination_id != "" else None
-        player = self._player_manager.get_player(data.sender_id)
-        if player:
-            data.username = player.name
-        await self.sio.emit(ServerEvent.MESSAGE, data.__dict__, to=dest)
+        log.debug("send_message %s", data)
+        if data.destination_id == "":
+            log.warning("dropped message %s with no destination", data.id)
+            return
+        await self._emitter.emit(ServerEvent.MESSAGE, data.__dict__, to=data.destination_id)
+
+    async def chat(self, sid: str, data: MessageData) -> None:
+        """Sends a chat message to the room its sender is in.
+
+        The sender is the socket the message came from, whatever the client
+        says. Messages that are not text or are blank are dropped, and so are
+        messages over the sender's rate limit.
+
+        Args:
+            sid (str): The socket id of the sender.
+            data (MessageData): The data from the client.
+        """
+        player = self._player_manager.get_player(sid)
+        if player is None or not player.room:
+            return
+        if not isinstance(data.message, str) or not data.message.strip():
+            log.debug("chat message dropped %s", sid)
+            return
+        if not self._chat.allow(sid):
+            log.debug("chat rate limited %s", sid)
+            return
+        message = MessageData(
+            id=data.id, sender_id=sid, username=player.name, message=data.message)
+        key = Lobby.ROOM if Lobby.is_room(player.room) else player.room
+        await self._router.dispatch(key, "chat", room=player.room, message=message.__dict__)
 
     async def disconnect(self, sid: str) -> None:
         """Disconnects a player from the server.
@@ -153,31 +318,223 @@ class AppManager:
             sid (str): The socket id of the player.
         """
         player = self._player_manager.get_player(sid)
+        if player is None:
+            return
         await self.sio.leave_room(sid, player.room)
-        self._lobby.remove_player(player)
-        self._game_manager.remove_player(player)
+        key = Lobby.ROOM if Lobby.is_room(player.room) else player.room
+        await self._router.dispatch(key, "leave", sid=sid, room=player.room)
         self._player_manager.remove_player(sid)
+        self._chat.forget_sender(sid)
+
+    ############################################################
+    # Owner handlers, run on the worker that owns the lobby or game
+    ############################################################
+
+    def _register_routes(self) -> None:
+        """Registers the handlers for operations routed by other workers."""
+        route = self._router.register
+        route("join_lobby", self._owner_join_lobby)
+        route("create_game", self._owner_create_game)
+        route("create_show", self._owner_create_show)
+        route("join_game", self._owner_join_game)
+        route("set_bot_level", self._owner_set_bot_level)
+        route("select_category", self._owner_select_category)
+        route("submit_answer", self._owner_submit_answer)
+        route("use_powerup", self._owner_use_powerup)
+        route("leave", self._owner_leave)
+        route("chat", self._owner_chat)
+
+    async def _owner_join_lobby(self, sid: str, name: str, level: str, token: str) -> None:
+        """Adds a player to the lobby.
+
+        Args:
+            sid (str): The socket id of the player.
+            name (str): The name of the player.
+            level (str): The skill level of the player.
+            token (str): The session token of the player.
+        """
+        level = BotLevel(level)
+        player = Player(
+            sid=sid, name=name, level=level, room=Lobby.room_of(level), token=token)
+        await self._lobby.add_player(player)
+        await self._chat.replay(player.room, sid)
+
+    async def _owner_create_game(self, game_id: str, players: list[dict]) -> None:
+        """Creates a game on this worker.
+
+        Args:
+            game_id (str): The id of the game.
+            players (list[dict]): The sid, name and session token of each player in the game.
+        """
+        game_players = {
+            p["sid"]: Player(sid=p["sid"], name=p["name"], room=game_id, token=p["token"])
+            for p in players
+        }
+        self._game_manager.new_game(game_id, game_players)
+
+    async def _owner_create_show(self, game_id: str, category: str, num_questions: int,
+                                 start_seconds: int) -> None:
+        """Creates a live show on this worker.
+
+        Args:
+            game_id (str): The id of the show.
+            category (str): The category of the questions.
+            num_questions (int): The number of questions.
+            start_seconds (int): The time before the first question.
+        """
+        self._game_manager.new_show(game_id, Category(category), num_questions, start_seconds)
+
+    async def _owner_join_game(self, sid: str, game_id: str, token: str = "",
+                               name: str = "") -> None:
+        """Sends the current state of a game to a player who joined it.
+
+        Players join a show by joining its game id, and are added to it here.
+
+        Args:
+            sid (str): The socket id of the player.
+            game_id (str): The id of the game.
+            token (str, optional): The session token of a player reclaiming their
+                seat after a reconnect or a restart.
+            name (str, optional): The name of the player.
+        """
+        if self._game_manager.is_show(game_id):
+            state = await self._game_manager.join_show(game_id, sid, name, token)
+            await self._emitter.emit(ServerEvent.SHOW_UPDATE, state.__dict__, to=sid)
+        else:
+            if token:
+                await self._game_manager.rejoin(game_id, token, sid)
+            await self._broadcaster.send_snapshot(sid, game_id)
+        await self._chat.replay(game_id, sid)
+
+    async def _owner_set_bot_level(self, game_id: str, level: str) -> None:
+        """Sets the bot level for a game.
+
+        Args:
+            game_id (str): The id of the game.
+            level (str): The level of the bots.
+        """
+        self._game_manager.set_bot_level(game_id, BotLevel(level))
+
+    async def _owner_select_category(self, game_id: str, sid: str, category: str) -> None:
+        """Selects a category for a player.
+
+        Args:
+            game_id (str): The id of the game.
+            sid (str): The socket id of the player.
+            category (str): The category selected by the player.
+        """
+        self._game_manager.select_category(game_id, sid, Category(category))
+
+    async def _owner_submit_answer(self, game_id: str, sid: str, answer: int,
+                                   received_at: float) -> None:
+        """Submits an answer for a player.
+
+        Args:
+            game_id (str): The id of the game.
+            sid (str): The socket id of the player.
+            answer (int): The answer submitted by the player.
+            received_at (float): The monotonic time the answer was received.
+        """
+        self._game_manager.submit_answer(game_id, sid, answer, received_at)
+
+    async def _owner_use_powerup(self, game_id: str, sid: str, powerup: str) -> None:
+        """Uses a powerup for a player.
+
+        Args:
+            game_id (str): The id of the game.
+            sid (str): The socket id of the player.
+            powerup (str): The powerup used by the player.
+        """
+        await self._game_manager.use_powerup(game_id, sid, PowerUp(powerup))
+
+    async def _owner_leave(self, sid: str, room: str) -> None:
+        """Removes a disconnected player from the lobby, or detaches them from their game.
+
+        A detached player keeps their seat for GameManager.REJOIN_SECONDS.
+
+        Args:
+            sid (str): The socket id of the player.
+            room (str): The room the player was in.
+        """
+        if Lobby.is_room(room):
+            self._lobby.remove_player(sid)
+            return
+        if self._game_manager.detach(room, sid):
+            GameClock.schedule(
+                lambda: self._expire_seat(room, sid), GameManager.REJOIN_SECONDS)
+
+    async def _expire_seat(self, game_id: str, sid: str) -> None:
+        """Removes a disconnected player from their game if they did not rejoin in time.
+
+        Args:
+            game_id (str): The id of the game.
+            sid (str): The socket id the player had when they disconnected.
+        """
+        if not self._game_manager.is_detached(game_id, sid):
+            return
+        self._game_manager.remove_player(game_id, sid)
+
+    async def _owner_chat(self, room: str, message: dict) -> None:
+        """Adds a chat message to the history of a room and sends it to the room.
+
+        Args:
+            room (str): The room of the sender.
+            message (dict): The message, with its sender set by the server.
+        """
+        await self._chat.post(room, MessageData(**message))
+
+    def _forget_game(self, game_id: str) -> None:
+        """Drops the broadcast state and chat history of a game that was evicted.
+
+        Args:
+            game_id (str): The id of the game.
+        """
+        self._broadcaster.forget(game_id)
+        self._chat.close_room(game_id)
 
     ############################################################
     # Server event handlers
     ############################################################
 
     async def _lobby_update(self, data: LobbyUpdateData) -> None:
-        """Emits a lobby update to the players.
+        """Emits the full state of a lobby queue to a player who joined it.
 
         Args:
             data (LobbyUpdateData): The data to emit.
         """
-        await self.sio.emit(ServerEvent.LOBBY_UPDATE, data.__dict__, room=Lobby.ROOM)
-        if data.should_start_game:
-            await self._new_game()
+        await self._emitter.emit(
+            ServerEvent.LOBBY_UPDATE, data.__dict__, to=data.destination_id)
+
+    async def _lobby_delta(self, data: LobbyDeltaData) -> None:
+        """Emits the changes to a lobby queue to the players waiting in it.
+
+        Args:
+            data (LobbyDeltaData): The data to emit.
+        """
+        await self._emitter.emit(ServerEvent.LOBBY_DELTA, data.__dict__, to=data.room)
 
-    async def _new_game(self) -> None:
-        """Created a new game and emits the game id to the players."""
-        players = self._lobby.get_players()
-        game = self._game_manager.new_game(players)
-        await self.sio.emit(ServerEvent.NEW_GAME, game.__dict__, room=Lobby.ROOM)
-        self._lobby.clear()
+    async def _chat_messages(self, data: ChatData) -> None:
+        """Emits a batch of chat messages to a room, or a room's history to a player who joined it.
+
+        Args:
+            data (ChatData): The data to emit.
+        """
+        await self._emitter.emit(ServerEvent.CHAT, data.__dict__, to=data.destination_id or data.room)
+
+    async def _new_game(self, data: MatchData) -> None:
+        """Creates a new game on its owning worker and emits the game id to its players.
+
+        Args:
+            data (MatchData): The players matched by the lobby.
+        """
+        game_id = self._router.new_game_id()
+        await self._router.dispatch(
+            game_id, "create_game", game_id=game_id,
+            players=[{"sid": p.sid, "name": p.name, "token": p.token}
+                     for p in data.players])
+        game = NewGameData(game_id).__dict__
+        for p in data.players:
+            await self._emitter.emit(ServerEvent.NEW_GAME, game, to=p.sid)
 
     async def _game_update(self, game: GameUpdateData) -> None:
         """Emits the game update to the players.
@@ -185,12 +542,55 @@ class AppManager:
         Args:
             game (GameUpdateData): The game data to emit.
         """
-        await self.sio.emit(ServerEvent.GAME_UPDATE, game.to_dict(), room=game.id)
+        await self._broadcaster.update(game)
+
+    async def _show_update(self, data: ShowUpdateData) -> None:
+        """Emits the state of a show to its room.
+
+        Args:
+            data (ShowUpdateData): The data to emit.
+        """
+        await self._emitter.emit(ServerEvent.SHOW_UPDATE, data.__dict__, to=data.id)
+
+    async def _show_results(self, data: ShowResultsData) -> None:
+        """Emits each player of a show their own result for the round that ended.
+
+        Args:
+            data (ShowResultsData): The results of the round.
+        """
+        for r in data.results:
+            result = {
+                "id": data.id,
+                "correct_answer": data.correct_answer,
+                "num_players": data.num_players,
+                "answer": r.answer,
+                "points": r.points,
+                "score": r.score,
+                "rank": r.rank,
+            }
+            await self._emitter.emit(ServerEvent.SHOW_RESULT, result, to=r.sid)
 
     ############################################################
     # Helper methods
     ############################################################
 
+    def _knows_token(self, game_id: str, token: str) -> bool:
+        """Checks if a session token was issued by the server or holds a seat in a local game.
+
+        A seat in a game restored from a snapshot may hold a token signed with
+        the secret of an earlier run.
+
+        Args:
+            game_id (str): The id of the game the token is used to join.
+            token (str): The session token.
+
+        Returns:
+            bool: True if the token can be trusted, False otherwise.
+        """
+        if PlayerManager.is_issued(token):
+            return True
+        return self._router.is_local(game_id) and self._game_manager.has_seat(game_id, token)
+
     async def _set_room(self, player: Player, room: str) -> None:
         """Sets the room for a player.
 
@@ -198,7 +598,7 @@ class AppManager:
             player (Player): The player to set the room for.
             room (str): The room to set the player in.
         """
-        print("[app_manager] set_room", player, room)
+        log.debug("set_room %s %s", player.sid, room)
         await self.sio.leave_room(player.sid, player.room)
         await self.sio.enter_room(player.sid, room)
         player.room = room
@@ -209,6 +609,8 @@ class AppManager:
         Args:
             player (Player): The player to add to the lobby.
         """
-        print("[app_manager] add_to_lobby", player)
-        await self._set_room(player, Lobby.ROOM)
-        await self._lobby.add_player(player)
+        log.debug("add_to_lobby %s", player.sid)
+        await self._set_room(player, Lobby.room_of(player.level))
+        await self._router.dispatch(
+            Lobby.ROOM, "join_lobby", sid=player.sid, name=player.name,
+            level=player.level, token=player.token)
@@ -0,0 +1,380 @@
+"""Load test that simulates many concurrent players against a running server.
+
+Each virtual player speaks the real client protocol: it registers, joins the
+lobby and a game, picks a bot level and a category, answers every question,
+sometimes uses a power-up and chats, with random think times in between.
+
+Run from the backend directory, either against a server that is already running:
+
+    python -m benchmarks.loadtest --players 500
+
+or let the load test start an offline server (see benchmarks/server.py) and
+measure its CPU and memory:
+
+    python -m benchmarks.loadtest --players 500 --spawn-server --workers 2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import socketio
+from events.events import ClientEvent, ServerEvent
+from game.models import GamePhase
+from player.player import BotLevel, PowerUp
+from questions.models import Category
+
+
+@dataclass
+class Stats:
+    """Measurements collected by every virtual player."""
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    sent: int = 0
+    received: int = 0
+    games_finished: int = 0
+    errors: int = 0
+
+    def record(self, event: str, seconds: float) -> None:
+        """Records the latency of a client event.
+
+        Args:
+            event (str): The client event.
+            seconds (float): The time until the server's update reflected it.
+        """
+        self.latencies.setdefault(event, []).append(seconds)
+
+
+class VirtualPlayer:
+    """A simulated client that plays games through the Socket.IO protocol."""
+
+    POWERUP_CHANCE = 0.2
+    MESSAGE_CHANCE = 0.1
+
+    def __init__(self, index: int, args: argparse.Namespace, stats: Stats):
+        self._name = f"load-{index}"
+        self._args = args
+        self._stats = stats
+        self._client = socketio.AsyncClient(reconnection=False)
+        self._pending: dict[str, tuple[str, float]] = {}
+        self._games_left = args.games
+        self._finished = asyncio.Event()
+        self._phase = ""
+        self._level = random.choice(list(BotLevel))
+        self._setup_handlers()
+
+    async def run(self) -> None:
+        """Connects, plays the configured number of games, and disconnects."""
+        try:
+            await self._client.connect(self._args.url, transports=["websocket"])
+            await self._call(ClientEvent.NEW_PLAYER, {"name": self._name})
+            await self._think()
+            await self._send(ClientEvent.JOIN_LOBBY, {"level": self._level})
+            await asyncio.wait_for(self._finished.wait(), self._args.timeout)
+        except Exception:
+            self._stats.errors += 1
+        finally:
+            await self._client.disconnect()
+
+    def _setup_handlers(self) -> None:
+        """Registers the handlers for server events."""
+        on = self._client.on
+        on(ServerEvent.NEW_GAME)(self._on_new_game)
+        on(ServerEvent.GAME_UPDATE)(self._on_game_update)
+        on(ServerEvent.GAME_DELTA)(self._on_game_delta)
+        on(ServerEvent.LOBBY_UPDATE)(self._on_any)
+        on(ServerEvent.LOBBY_DELTA)(self._on_any)
+        on(ServerEvent.MESSAGE)(self._on_any)
+        on(ServerEvent.CHAT)(self._on_chat)
+
+    async def _send(self, event: ClientEvent, data: dict, awaits: str | None = None) -> None:
+        """Sends a client event, optionally tracking the latency until a matching update.
+
+        Args:
+            event (ClientEvent): The event to send.
+            data (dict): The data of the event.
+            awaits (str | None, optional): The key of the update that confirms the event.
+        """
+        if awaits is not None:
+            self._pending[awaits] = (event.value, time.perf_counter())
+        self._stats.sent += 1
+        await self._client.emit(event, data)
+
+    async def _call(self, event: ClientEvent, data: dict) -> dict:
+        """Sends a client event that the server acknowledges, recording the round trip.
+
+        Args:
+            event (ClientEvent): The event to send.
+            data (dict): The data of the event.
+
+        Returns:
+            dict: The server's reply.
+        """
+        self._stats.sent += 1
+        sent_at = time.perf_counter()
+        reply = await self._client.call(event, data, timeout=self._args.timeout)
+        self._stats.received += 1
+        self._stats.record(event.value, time.perf_counter() - sent_at)
+        return reply
+
+    def _confirm(self, key: str) -> None:
+        """Records the latency of a pending event that the server confirmed.
+
+        Args:
+            key (str): The key of the confirmed update.
+        """
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            event, sent_at = pending
+            self._stats.record(event, time.perf_counter() - sent_at)
+
+    async def _think(self) -> None:
+        """Waits for a random think time."""
+        await asyncio.sleep(random.uniform(self._args.think_min, self._args.think_max))
+
+    async def _on_any(self, *_) -> None:
+        self._stats.received += 1
+
+    async def _on_new_game(self, data: dict) -> None:
+        self._stats.received += 1
+        await self._send(ClientEvent.JOIN_GAME, {"game_id": data["id"]}, awaits="join")
+
+    async def _on_chat(self, data: dict) -> None:
+        self._stats.received += 1
+        for message in data["messages"]:
+            self._confirm(f"message:{message['id']}")
+
+    async def _on_game_update(self, data: dict) -> None:
+        self._stats.received += 1
+        self._confirm("join")
+        self._confirm("phase")
+        self._check_player(data.get("players", {}).get(self._client.get_sid(), {}))
+        if data["phase"] != self._phase:
+            self._phase = data["phase"]
+            asyncio.create_task(self._play(GamePhase(data["phase"])))
+
+    async def _on_game_delta(self, data: dict) -> None:
+        self._stats.received += 1
+        self._check_player(data.get("players", {}).get(self._client.get_sid(), {}))
+
+    def _check_player(self, player: dict) -> None:
+        """Confirms pending events from this player's fields in an update.
+
+        Args:
+            player (dict): This player's fields in a game update or delta.
+        """
+        if player.get("answer", -1) != -1:
+            self._confirm("answer")
+        if player.get("used_powerups"):
+            self._confirm("powerup")
+
+    async def _play(self, phase: GamePhase) -> None:
+        """Acts on a new game phase, like a human would.
+
+        Args:
+            phase (GamePhase): The phase that started.
+        """
+        match phase:
+            case GamePhase.BOT_LEVEL_SELECTION:
+                await self._think()
+                level = random.choice(list(BotLevel))
+                await self._send(ClientEvent.SET_BOT_LEVEL, {"level": level}, awaits="phase")
+            case GamePhase.CATEGORY_SELECTION:
+                await self._think()
+                category = Category.randomize()
+                await self._send(ClientEvent.SELECT_CATEGORY, {"category": category}, awaits="phase")
+            case GamePhase.AWAITING_ANSWERS:
+                await self._think()
+                if random.random() < self.POWERUP_CHANCE:
+                    powerup = random.choice(list(PowerUp))
+                    await self._send(ClientEvent.USE_POWERUP, {"powerup": powerup}, awaits="powerup")
+                if random.random() < self.MESSAGE_CHANCE:
+                    await self._chat()
+                await self._send(ClientEvent.SUBMIT_ANSWER, {"answer": random.randint(0, 3)}, awaits="answer")
+            case GamePhase.GAME_ENDED:
+                self._stats.games_finished += 1
+                self._games_left -= 1
+                if self._games_left <= 0:
+                    self._finished.set()
+                else:
+                    await self._think()
+                    await self._send(ClientEvent.JOIN_LOBBY, {"level": self._level})
+
+    async def _chat(self) -> None:
+        """Sends a chat message."""
+        message_id = str(uuid.uuid4())
+        await self._send(ClientEvent.MESSAGE, {
+            "id": message_id,
+            "message": "good luck everyone!",
+        }, awaits=f"message:{message_id}")
+
+
+class ProcessSampler:
+    """Samples the CPU and memory use of a process tree from /proc."""
+
+    def __init__(self, pid: int):
+        self._pid = pid
+        self._ticks_per_second = os.sysconf("SC_CLK_TCK")
+        self.cpu_percent: list[float] = []
+        self.rss_mb: list[float] = []
+
+    async def run(self, interval: float = 1.0) -> None:
+        """Samples the process tree until cancelled.
+
+        Args:
+            interval (float, optional): The seconds between samples. Defaults to 1.0.
+        """
+        last_cpu, last_time = self._cpu_seconds(), time.perf_counter()
+        while True:
+            await asyncio.sleep(interval)
+            cpu, now = self._cpu_seconds(), time.perf_counter()
+            self.cpu_percent.append(100 * (cpu - last_cpu) / (now - last_time))
+            self.rss_mb.append(self._rss_mb())
+            last_cpu, last_time = cpu, now
+
+    def _pids(self) -> list[int]:
+        """Gets the process and all its descendants.
+
+        Returns:
+            list[int]: The pids of the process tree.
+        """
+        pids, i = [self._pid], 0
+        while i < len(pids):
+            children = Path(f"/proc/{pids[i]}/task/{pids[i]}/children")
+            if children.exists():
+                pids += [int(p) for p in children.read_text().split()]
+            i += 1
+        return pids
+
+    def _cpu_seconds(self) -> float:
+        """Gets the user and system CPU time of the process tree.
+
+        Returns:
+            float: The CPU time, in seconds.
+        """
+        total = 0
+        for pid in self._pids():
+            try:
+                fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+                total += int(fields[11]) + int(fields[12])
+            except (FileNotFoundError, ProcessLookupError):
+                pass
+        return total / self._ticks_per_second
+
+    def _rss_mb(self) -> float:
+        """Gets the resident memory of the process tree.
+
+        Returns:
+            float: The resident memory, in megabytes.
+        """
+        total = 0
+        for pid in self._pids():
+            try:
+                for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+            except (FileNotFoundError, ProcessLookupError):
+                pass
+        return total / 1024
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Gets a percentile of a list of values.
+
+    Args:
+        values (list[float]): The values.
+        p (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The percentile.
+    """
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def report(stats: Stats, elapsed: float, sampler: ProcessSampler | None) -> None:
+    """Prints the results of a load test.
+
+    Args:
+        stats (Stats): The collected measurements.
+        elapsed (float): The duration of the load test, in seconds.
+        sampler (ProcessSampler | None): The server sampler, if the server was spawned.
+    """
+    print(f"duration        {elapsed:.1f}s")
+    print(f"games finished  {stats.games_finished} player-games, {stats.errors} errors")
+    print(f"client events   {stats.sent} ({stats.sent / elapsed:.0f}/s)")
+    print(f"server emits    {stats.received} received ({stats.received / elapsed:.0f}/s)")
+    print(f"\n{'event':<18}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for event, values in sorted(stats.latencies.items()):
+        ms = [v * 1000 for v in values]
+        print(f"{event:<18}{len(ms):>8}{percentile(ms, 50):>10.1f}"
+              f"{percentile(ms, 90):>10.1f}{percentile(ms, 99):>10.1f}{max(ms):>10.1f}")
+    if sampler and sampler.cpu_percent:
+        print(f"\nserver cpu      mean {statistics.mean(sampler.cpu_percent):.0f}%"
+              f"  max {max(sampler.cpu_percent):.0f}%")
+        print(f"server rss      max {max(sampler.rss_mb):.0f} MB")
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Runs the load test.
+
+    Args:
+        args (argparse.Namespace): The command line arguments.
+    """
+    server = sampler = sampler_task = None
+    if args.spawn_server:
+        env = {**os.environ, "WORKERS": str(args.workers),
+               "LOADTEST_LOBBY_TIMEOUT": str(args.lobby_timeout)}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.server"], env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True)
+        await asyncio.sleep(args.startup_delay)
+        sampler = ProcessSampler(server.pid)
+        sampler_task = asyncio.create_task(sampler.run())
+
+    stats = Stats()
+    started = time.perf_counter()
+    players = []
+    for i in range(args.players):
+        players.append(asyncio.create_task(VirtualPlayer(i, args, stats).run()))
+        if args.ramp_up:
+            await asyncio.sleep(args.ramp_up / args.players)
+    await asyncio.gather(*players)
+    elapsed = time.perf_counter() - started
+
+    if sampler_task:
+        sampler_task.cancel()
+    if server:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait()
+    report(stats, elapsed, sampler)
+
+
+def main() -> None:
+    """Parses the command line and runs the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--games", type=int, default=1, help="games per player")
+    parser.add_argument("--think-min", type=float, default=0.5)
+    parser.add_argument("--think-max", type=float, default=5.0)
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds to connect all players")
+    parser.add_argument("--timeout", type=float, default=900.0, help="seconds before a player gives up")
+    parser.add_argument("--spawn-server", action="store_true", help="start an offline server")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--lobby-timeout", type=int, default=5)
+    parser.add_argument("--startup-delay", type=float, default=3.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
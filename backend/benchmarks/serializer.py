@@ -0,0 +1,84 @@
+"""Benchmarks the Socket.IO JSON serializers on realistic game update payloads.
+
+Run from the backend directory:
+
+    python -m benchmarks.serializer
+"""
+
+import timeit
+
+from api.serializer import COMPACT, ORJSON, STDLIB, orjson
+from events.data import GameUpdateData, LobbyUpdateData, MessageData
+from game.models import GamePhase
+from player.player import BotLevel, Player, PlayerType, PowerUp
+from questions.bank import QuestionBank
+from questions.models import Category
+
+ITERATIONS = 20000
+
+
+def game_update_payload() -> dict:
+    """Builds a full game update for a four player game with bots.
+
+    Returns:
+        dict: The payload, as emitted to the game room.
+    """
+    players = {"human": Player(sid="human", name="Alice", score=42)}
+    players["human"].use_powerup(PowerUp.FIFTY_FIFTY)
+    players["human"].hide_option(1)
+    for i in range(3):
+        bot = Player(sid=f"bot-{i}", type=PlayerType.BOT,
+                     level=BotLevel.EXPERT, name=f"Bot {i}", score=10 * i)
+        players[bot.sid] = bot
+    question = QuestionBank.sample(Category.ALL, 1)[4][0]
+    return GameUpdateData(
+        id="5f0c7f3e-5d7a-4c39-9a53-0f1f3c9a7b11",
+        category=Category.SCIENCE_NATURE,
+        phase=GamePhase.AWAITING_ANSWERS,
+        players=players,
+        question_text=question.text,
+        question_options=question.options,
+        deadline=12345.5,
+        server_time=12328.5,
+    ).to_dict()
+
+
+def payloads() -> dict[str, object]:
+    """Builds the payloads to benchmark.
+
+    Returns:
+        dict[str, object]: The payloads, by name.
+    """
+    return {
+        "game_update": game_update_payload(),
+        "game_delta": {"id": "5f0c7f3e",
+                       "players": {"human": {"score": 58, "answer": 2}}},
+        "lobby_update": LobbyUpdateData(
+            players=[f"sid-{i}" for i in range(20)],
+            deadline=1760000000.0, server_time=1759999988.0,
+            room="lobby:novice", destination_id="sid-0").__dict__,
+        "message": MessageData(
+            id="1", sender_id="2", username="Friend",
+            message="I'm pretty sure it's the second one!").__dict__,
+    }
+
+
+def main() -> None:
+    """Runs the benchmark and prints microseconds per encode."""
+    serializers = {"stdlib": STDLIB, "compact": COMPACT}
+    if orjson is not None:
+        serializers["orjson"] = ORJSON
+    print(f"{'payload':<14}" + "".join(f"{n:>12}" for n in serializers))
+    for name, payload in payloads().items():
+        row = f"{name:<14}"
+        for serializer in serializers.values():
+            data = ["game_update", payload]
+            seconds = timeit.timeit(
+                lambda s=serializer, d=data: s.dumps(d, separators=(",", ":")),
+                number=ITERATIONS)
+            row += f"{seconds / ITERATIONS * 1e6:>10.2f}us"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Runs the backend offline for load tests, with a stubbed Gemini client.
+
+Run from the backend directory:
+
+    python -m benchmarks.server
+
+LOADTEST_LOBBY_TIMEOUT overrides the lobby countdown, and LOADTEST_FRIEND_DELAY
+sets how long the stubbed "Call a Friend" takes to answer, in seconds.
+"""
+
+import asyncio
+import os
+
+os.environ.setdefault("GEMINI_API_KEY", "offline")
+
+import main  # noqa: E402
+from gemini.gemini import Gemini  # noqa: E402
+from lobby.lobby import Lobby  # noqa: E402
+
+FRIEND_DELAY_SECONDS = float(os.getenv("LOADTEST_FRIEND_DELAY", "0.5"))
+
+
+async def stub_query_async(_: str, timeout: float | None = None) -> str:
+    """Answers a Gemini prompt without calling the API.
+
+    Args:
+        _ (str): The prompt.
+        timeout (float | None, optional): Ignored.
+
+    Returns:
+        str: A canned friend hint.
+    """
+    await asyncio.sleep(FRIEND_DELAY_SECONDS)
+    return "I'm pretty sure it's the second one, but don't quote me on that!"
+
+
+def run() -> None:
+    """Runs the backend with the stubbed Gemini client."""
+    Gemini.query_async = staticmethod(stub_query_async)
+    Lobby.TIMEOUT_SECONDS = int(os.getenv("LOADTEST_LOBBY_TIMEOUT", Lobby.TIMEOUT_SECONDS))
+    main.main()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,160 @@
+"""Benchmarks a live show with thousands of players in a single room.
+
+Drives a real ShowGame in process on a fast game clock, without sockets, and
+reports the cost of joining, answer ingestion, closing a round (ranking and
+per-player results) and the size of what is sent. A classic game update
+carrying the same number of players is encoded for comparison.
+
+Run from the backend directory:
+
+    python -m benchmarks.show --players 10000 --rounds 3
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from api.serializer import get_serializer
+from clock.clock import GameClock
+from events.data import GameUpdateData, ShowResultsData
+from events.events import EventQueue, ServerEvent
+from game.models import GamePhase
+from game.show import ShowGame
+from player.player import Player
+from questions.bank import QuestionBank
+from questions.models import Category
+
+TICK_SECONDS = 0.01
+SERIALIZER = get_serializer("fast")
+
+
+async def consume(shard: int, events: asyncio.Queue) -> None:
+    """Drains a shard of the event queue, timestamping each event.
+
+    Args:
+        shard (int): The shard the show's events are queued on.
+        events (asyncio.Queue): The queue to pass the events on to.
+    """
+    while True:
+        event, data = await EventQueue.get(shard)
+        await events.put((time.perf_counter(), event, data))
+
+
+async def wait_for(events: asyncio.Queue, event: ServerEvent,
+                   phase: GamePhase | None = None) -> tuple[float, object]:
+    """Waits for an event from the show, skipping the others.
+
+    Args:
+        events (asyncio.Queue): The show's events.
+        event (ServerEvent): The event to wait for.
+        phase (GamePhase | None, optional): The phase a show update must be in.
+
+    Returns:
+        tuple[float, object]: The time the event was consumed, and its data.
+    """
+    while True:
+        at, e, data = await events.get()
+        if e == event and (phase is None or data.phase == phase):
+            return at, data
+
+
+def encode_results(data: ShowResultsData) -> tuple[float, int]:
+    """Encodes every player's result, as the app manager does when emitting them.
+
+    Args:
+        data (ShowResultsData): The results of a round.
+
+    Returns:
+        tuple[float, int]: The seconds taken, and the bytes encoded.
+    """
+    start = time.perf_counter()
+    size = 0
+    for r in data.results:
+        result = {"id": data.id, "correct_answer": data.correct_answer,
+                  "num_players": data.num_players, "answer": r.answer,
+                  "points": r.points, "score": r.score, "rank": r.rank}
+        size += len(SERIALIZER.dumps([ServerEvent.SHOW_RESULT, result]))
+    return time.perf_counter() - start, size
+
+
+def classic_update_size(num_players: int) -> tuple[float, int]:
+    """Encodes a classic game update carrying every player, for comparison.
+
+    Args:
+        num_players (int): The number of players.
+
+    Returns:
+        tuple[float, int]: The seconds taken, and the bytes encoded.
+    """
+    players = {f"sid-{i}": Player(sid=f"sid-{i}", name=f"Player {i}") for i in range(num_players)}
+    update = GameUpdateData(id="classic", category=Category.ALL,
+                            phase=GamePhase.AWAITING_ANSWERS, players=players)
+    start = time.perf_counter()
+    size = len(SERIALIZER.dumps([ServerEvent.GAME_UPDATE, update.to_dict()]))
+    return time.perf_counter() - start, size
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Runs a show with simulated players and prints the measurements.
+
+    Args:
+        args (argparse.Namespace): The command line arguments.
+    """
+    QuestionBank.load()
+    GameClock.TICK_SECONDS = TICK_SECONDS
+    show = ShowGame("show", Category.ALL, args.rounds, start_seconds=1)
+    events: asyncio.Queue = asyncio.Queue()
+    tasks = [asyncio.create_task(GameClock.run()),
+             asyncio.create_task(consume(EventQueue.shard_of(show.id), events))]
+
+    start = time.perf_counter()
+    for i in range(args.players):
+        show.add_player(f"sid-{i}", f"Player {i}", f"token-{i}")
+    join_seconds = time.perf_counter() - start
+    players = [show.get_player(f"sid-{i}") for i in range(args.players)]
+    print(f"players         {args.players}")
+    print(f"join            {join_seconds / args.players * 1e6:.2f}us per player")
+
+    run_task = asyncio.create_task(show.start())
+    print(f"\n{'round':<7}{'answer us':>10}{'close ms':>10}{'update B':>10}"
+          f"{'results ms':>12}{'results KB':>12}")
+    for round_number in range(1, args.rounds + 1):
+        _, update = await wait_for(events, ServerEvent.SHOW_UPDATE, GamePhase.AWAITING_ANSWERS)
+        answering = random.sample(players, int(len(players) * args.answer_ratio))
+        start = time.perf_counter()
+        for p in answering:
+            show.submit_answer(p, random.randrange(4))
+        answered_at = time.perf_counter()
+        _, ended = await wait_for(events, ServerEvent.SHOW_UPDATE, GamePhase.ROUND_ENDED)
+        closed_at, results = await wait_for(events, ServerEvent.SHOW_RESULT)
+
+        answer_us = (answered_at - start) / max(1, len(answering)) * 1e6
+        close_ms = (closed_at - answered_at) * 1e3
+        update_bytes = len(SERIALIZER.dumps([ServerEvent.SHOW_UPDATE, ended.__dict__]))
+        results_seconds, results_bytes = encode_results(results)
+        print(f"{round_number:<7}{answer_us:>10.2f}{close_ms:>10.1f}{update_bytes:>10}"
+              f"{results_seconds * 1e3:>12.1f}{results_bytes / 1024:>12.1f}")
+
+    await run_task
+    for task in tasks:
+        task.cancel()
+
+    classic_seconds, classic_bytes = classic_update_size(args.players)
+    print(f"\nclassic update  {classic_bytes / 1024:.1f} KB, "
+          f"{classic_seconds * 1e3:.1f} ms to encode, per update")
+    print("close ms includes the answer timeout when not everyone answers")
+
+
+def main() -> None:
+    """Parses the command line and runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--answer-ratio", type=float, default=1.0,
+                        help="the fraction of players who answer each question")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Room-scoped chat service."""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from clock.clock import GameClock, Timer
+from events.data import ChatData, MessageData
+from events.events import EventQueue, ServerEvent
+
+
+@dataclass
+class TokenBucket:
+    """Limits how often a sender may post.
+
+    Each message takes a token, and tokens refill at a steady rate up to the
+    burst size.
+    """
+    capacity: float
+    rate: float
+    tokens: float
+    updated_at: float
+
+    def take(self, now: float) -> bool:
+        """Takes a token if one is left.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            bool: True if a token was taken, False if the bucket is empty.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class ChatRoom:
+    """The recent messages of a room, and those waiting for its next flush."""
+
+    def __init__(self, room: str, history_size: int):
+        self.room = room
+        self.history: deque[dict] = deque(maxlen=history_size)
+        self.pending: list[dict] = []
+        self.flush_timer: Timer | None = None
+
+
+class Chat:
+    """Sends chat messages to the room their sender is in.
+
+    Senders are rate limited with a token bucket on the worker they are
+    connected to, before their messages are routed anywhere. Each room lives
+    on the worker that owns it. The first message after a quiet spell is sent
+    right away, and a burst is sent as one batch per flush interval. The last
+    messages of a room are kept in a ring and replayed to players who join it.
+    """
+
+    HISTORY_SIZE = 50
+    BURST = 5
+    MESSAGES_PER_SECOND = 1.0
+    MAX_LENGTH = 500
+    FLUSH_TICKS = 1
+
+    def __init__(self):
+        self._rooms: dict[str, ChatRoom] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def allow(self, sid: str) -> bool:
+        """Checks if a sender may post a message now, and counts it if so.
+
+        Args:
+            sid (str): The socket id of the sender.
+
+        Returns:
+            bool: True if the message may be sent, False if the sender is over the limit.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(sid)
+        if bucket is None:
+            bucket = TokenBucket(self.BURST, self.MESSAGES_PER_SECOND, self.BURST, now)
+            self._buckets[sid] = bucket
+        return bucket.take(now)
+
+    def forget_sender(self, sid: str) -> None:
+        """Drops the rate limit state of a sender who disconnected.
+
+        Args:
+            sid (str): The socket id of the sender.
+        """
+        self._buckets.pop(sid, None)
+
+    async def post(self, room: str, message: MessageData) -> None:
+        """Adds a message to a room, sending it now or on the room's next flush.
+
+        Args:
+            room (str): The room of the sender.
+            message (MessageData): The message.
+        """
+        chat = self._rooms.get(room)
+        if chat is None:
+            chat = ChatRoom(room, self.HISTORY_SIZE)
+            self._rooms[room] = chat
+        message.message = message.message[:self.MAX_LENGTH]
+        line = message.__dict__
+        chat.history.append(line)
+        chat.pending.append(line)
+        if chat.flush_timer is None:
+            await self._flush(chat)
+
+    async def replay(self, room: str, sid: str) -> None:
+        """Sends the recent messages of a room to a player who joined it.
+
+        Args:
+            room (str): The room.
+            sid (str): The socket id of the player.
+        """
+        chat = self._rooms.get(room)
+        if chat is None or not chat.history:
+            return
+        data = ChatData(room=room, messages=list(chat.history), destination_id=sid)
+        await EventQueue.put(ServerEvent.CHAT, data, room)
+
+    def close_room(self, room: str) -> None:
+        """Discards the messages of a room that is gone.
+
+        Args:
+            room (str): The room.
+        """
+        chat = self._rooms.pop(room, None)
+        if chat is not None and chat.flush_timer is not None:
+            chat.flush_timer.cancel()
+
+    def num_rooms(self) -> int:
+        """Gets the number of rooms with chat history.
+
+        Returns:
+            int: The number of rooms.
+        """
+        return len(self._rooms)
+
+    async def _flush(self, chat: ChatRoom) -> None:
+        """Sends the messages waiting in a room, and holds later ones until the next flush.
+
+        Args:
+            chat (ChatRoom): The room.
+        """
+        chat.flush_timer = None
+        if not chat.pending:
+            return
+        data = ChatData(room=chat.room, messages=chat.pending)
+        chat.pending = []
+        await EventQueue.put(ServerEvent.CHAT, data, chat.room)
+        chat.flush_timer = GameClock.schedule(lambda: self._flush(chat), self.FLUSH_TICKS)
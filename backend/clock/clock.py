@@ -0,0 +1,86 @@
+"""A single shared clock that drives every game and lobby timer."""
+
+import asyncio
+from typing import Awaitable, Callable
+
+from log.log import get_logger
+
+log = get_logger(__name__)
+
+
+class Timer:
+    """A callback scheduled on the game clock."""
+
+    def __init__(self, callback: Callable[[], Awaitable[None]], expires_at: int):
+        self.callback = callback
+        self.expires_at = expires_at
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Cancels the timer. A cancelled timer's callback is never called."""
+        self.cancelled = True
+
+
+class GameClock:
+    """A hashed timing wheel that fires every due timer from one loop, once per tick."""
+
+    TICK_SECONDS = 1
+    WHEEL_SIZE = 64
+
+    _wheel: list[list[Timer]] = [[] for _ in range(WHEEL_SIZE)]
+    _ticks = 0
+    _running: set[asyncio.Task] = set()
+
+    @staticmethod
+    def schedule(callback: Callable[[], Awaitable[None]], ticks: int = 1) -> Timer:
+        """Schedules a callback to run after a number of ticks.
+
+        Args:
+            callback (Callable[[], Awaitable[None]]): The callback to run.
+            ticks (int, optional): The number of ticks to wait. Defaults to 1.
+
+        Returns:
+            Timer: The scheduled timer, which can be cancelled.
+        """
+        timer = Timer(callback, GameClock._ticks + max(1, ticks))
+        GameClock._wheel[timer.expires_at % GameClock.WHEEL_SIZE].append(timer)
+        return timer
+
+    @staticmethod
+    async def run() -> None:
+        """Runs the clock forever. Ticks are aligned to the loop's monotonic time so they do not drift."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            next_tick += GameClock.TICK_SECONDS
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+            GameClock._advance()
+
+    @staticmethod
+    def _advance() -> None:
+        """Advances the clock by one tick and starts the timers that are due.
+
+        Each callback runs in its own task, so a slow one does not hold up the
+        next tick for every other game.
+        """
+        GameClock._ticks += 1
+        slot = GameClock._wheel[GameClock._ticks % GameClock.WHEEL_SIZE]
+        due = [t for t in slot if t.expires_at <= GameClock._ticks]
+        slot[:] = [t for t in slot if t.expires_at > GameClock._ticks]
+        for timer in due:
+            if timer.cancelled:
+                continue
+            task = asyncio.create_task(timer.callback())
+            GameClock._running.add(task)
+            task.add_done_callback(GameClock._finished)
+
+    @staticmethod
+    def _finished(task: asyncio.Task) -> None:
+        """Forgets a finished timer task and logs it if it failed.
+
+        Args:
+            task (asyncio.Task): The task.
+        """
+        GameClock._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error("timer failed", exc_info=task.exception())
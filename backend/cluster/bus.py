@@ -0,0 +1,211 @@
+"""Message buses used to connect workers to each other."""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator
+
+from log.log import get_logger
+
+log = get_logger(__name__)
+
+
+class MessageBus(ABC):
+    """A publish/subscribe bus that carries JSON-serializable messages between workers."""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: dict) -> None:
+        """Publishes a message to every subscriber of a channel.
+
+        Args:
+            channel (str): The channel to publish to.
+            message (dict): The message to publish.
+        """
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        """Subscribes to a channel.
+
+        Args:
+            channel (str): The channel to subscribe to.
+
+        Returns:
+            AsyncIterator[dict]: The messages published to the channel.
+        """
+
+
+class LocalBus(MessageBus):
+    """An in-process bus, used to run several workers inside one event loop."""
+
+    def __init__(self):
+        self._subscribers: dict[str, list[asyncio.Queue[dict]]] = {}
+
+    async def publish(self, channel: str, message: dict) -> None:
+        for q in self._subscribers.get(channel, []):
+            q.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        q = asyncio.Queue[dict]()
+        self._subscribers.setdefault(channel, []).append(q)
+        try:
+            while True:
+                yield await q.get()
+        finally:
+            self._subscribers[channel].remove(q)
+
+
+class UnixSocketBus(MessageBus):
+    """A bus client that talks to a BusHub over a Unix domain socket.
+
+    If the hub connection drops, the client reconnects and subscribes to its
+    channels again. Messages published while it was down are lost.
+    """
+
+    CONNECT_RETRIES = 50
+    CONNECT_DELAY_SECONDS = 0.1
+
+    def __init__(self, path: str | Path):
+        self._path = str(path)
+        self._writer: asyncio.StreamWriter | None = None
+        self._connecting: asyncio.Lock | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._subscribers: dict[str, list[asyncio.Queue[dict]]] = {}
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self._send({"op": "pub", "channel": channel, "message": message})
+
+    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        q = asyncio.Queue[dict]()
+        self._subscribers.setdefault(channel, []).append(q)
+        await self._send({"op": "sub", "channel": channel})
+        try:
+            while True:
+                yield await q.get()
+        finally:
+            self._subscribers[channel].remove(q)
+
+    async def _send(self, frame: dict) -> None:
+        """Sends a frame to the hub, connecting first if needed.
+
+        Args:
+            frame (dict): The frame to send.
+        """
+        writer = await self._connect()
+        writer.write(json.dumps(frame).encode() + b"\n")
+        await writer.drain()
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        """Connects to the hub once and starts reading from it.
+
+        Returns:
+            asyncio.StreamWriter: The writer for the hub connection.
+        """
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        async with self._connecting:
+            if self._writer is not None:
+                return self._writer
+            for _ in range(self.CONNECT_RETRIES):
+                try:
+                    reader, writer = await asyncio.open_unix_connection(self._path)
+                    break
+                except (FileNotFoundError, ConnectionRefusedError):
+                    await asyncio.sleep(self.CONNECT_DELAY_SECONDS)
+            else:
+                raise ConnectionError(f"message bus is not reachable at {self._path}")
+            self._writer = writer
+            self._reader_task = asyncio.create_task(self._read(reader))
+            return writer
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        """Delivers frames from the hub to local subscribers, and reconnects when the hub goes away.
+
+        Args:
+            reader (asyncio.StreamReader): The reader for the hub connection.
+        """
+        try:
+            while line := await reader.readline():
+                frame = json.loads(line)
+                for q in self._subscribers.get(frame["channel"], []):
+                    q.put_nowait(frame["message"])
+            log.warning("message bus closed the connection, reconnecting")
+        except ConnectionError as e:
+            log.warning("message bus connection lost, reconnecting: %r", e)
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        await self._resubscribe()
+
+    async def _resubscribe(self) -> None:
+        """Connects to the hub again and restores the subscriptions of this worker."""
+        while True:
+            try:
+                for channel, queues in list(self._subscribers.items()):
+                    if queues:
+                        await self._send({"op": "sub", "channel": channel})
+                return
+            except ConnectionError as e:
+                log.error("message bus is unreachable, retrying: %r", e)
+                self._writer = None
+
+
+class BusHub:
+    """Relays messages between UnixSocketBus clients. Runs in the supervisor process.
+
+    A subscriber that falls more than MAX_BUFFER_BYTES behind is disconnected
+    rather than buffered without limit, and subscribes again on reconnecting.
+    """
+
+    MAX_BUFFER_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, path: str | Path):
+        self._path = str(path)
+        self._channels: dict[str, set[asyncio.StreamWriter]] = {}
+
+    async def serve_forever(self) -> None:
+        """Listens on the Unix socket and relays messages until cancelled."""
+        Path(self._path).unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(self._handle, path=self._path)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handles one connected worker.
+
+        Args:
+            reader (asyncio.StreamReader): The reader for the worker connection.
+            writer (asyncio.StreamWriter): The writer for the worker connection.
+        """
+        try:
+            while line := await reader.readline():
+                frame = json.loads(line)
+                channel = frame["channel"]
+                if frame["op"] == "sub":
+                    self._channels.setdefault(channel, set()).add(writer)
+                elif frame["op"] == "pub":
+                    out = json.dumps(
+                        {"channel": channel, "message": frame["message"]}).encode() + b"\n"
+                    for w in list(self._channels.get(channel, ())):
+                        self._relay(w, out)
+        finally:
+            for writers in self._channels.values():
+                writers.discard(writer)
+            writer.close()
+
+    def _relay(self, writer: asyncio.StreamWriter, out: bytes) -> None:
+        """Writes a frame to a subscriber, or drops the subscriber if it is too far behind.
+
+        Args:
+            writer (asyncio.StreamWriter): The writer for the subscriber connection.
+            out (bytes): The encoded frame.
+        """
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > self.MAX_BUFFER_BYTES:
+            log.warning("dropping a message bus subscriber that is too far behind")
+            for writers in self._channels.values():
+                writers.discard(writer)
+            writer.close()
+            return
+        writer.write(out)
@@ -0,0 +1,21 @@
+"""Socket.IO client manager that shares rooms between workers over a message bus."""
+
+from cluster.bus import MessageBus
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+
+class BusClientManager(AsyncPubSubManager):
+    """Fans out Socket.IO emits and room changes to every worker through a MessageBus."""
+
+    name = "bus"
+
+    def __init__(self, bus: MessageBus, channel: str = "socketio"):
+        super().__init__(channel=channel)
+        self._bus = bus
+
+    async def _publish(self, data: dict) -> None:
+        await self._bus.publish(self.channel, data)
+
+    async def _listen(self):
+        async for message in self._bus.subscribe(self.channel):
+            yield message
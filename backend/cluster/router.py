@@ -0,0 +1,98 @@
+"""Routing of app operations to the worker that owns them."""
+
+import itertools
+import uuid
+import zlib
+from typing import Awaitable, Callable
+
+from cluster.bus import MessageBus
+from log.log import get_logger
+
+log = get_logger(__name__)
+
+Handler = Callable[..., Awaitable[None]]
+
+
+class WorkerRouter:
+    """Shards games and the lobby across workers and routes operations to their owner.
+
+    Every shard key (a game id or the lobby room) is owned by exactly one worker.
+    Operations on a key owned by this worker are handled in place; all others are
+    published on the owning worker's bus channel. With a single worker and no bus,
+    every operation is local.
+    """
+
+    CHANNEL_PREFIX = "worker."
+
+    def __init__(self, worker_id: int = 0, num_workers: int = 1, bus: MessageBus | None = None):
+        self.worker_id = worker_id
+        self.num_workers = num_workers
+        self.bus = bus
+        self._handlers: dict[str, Handler] = {}
+        self._targets = itertools.cycle(range(num_workers))
+
+    def register(self, method: str, handler: Handler) -> None:
+        """Registers the handler for an operation.
+
+        Args:
+            method (str): The name of the operation.
+            handler (Handler): The coroutine that handles it on the owning worker.
+        """
+        self._handlers[method] = handler
+
+    def owner(self, key: str) -> int:
+        """Gets the worker that owns a shard key.
+
+        Args:
+            key (str): The shard key.
+
+        Returns:
+            int: The id of the owning worker.
+        """
+        return zlib.crc32(key.encode()) % self.num_workers
+
+    def is_local(self, key: str) -> bool:
+        """Checks if a shard key is owned by this worker.
+
+        Args:
+            key (str): The shard key.
+
+        Returns:
+            bool: True if this worker owns the key, False otherwise.
+        """
+        return self.owner(key) == self.worker_id
+
+    def new_game_id(self) -> str:
+        """Makes a new game id, placing games on workers in round-robin order.
+
+        Returns:
+            str: The new game id.
+        """
+        target = next(self._targets)
+        while True:
+            game_id = str(uuid.uuid4())
+            if self.owner(game_id) == target:
+                return game_id
+
+    async def dispatch(self, key: str, method: str, **kwargs) -> None:
+        """Runs an operation on the worker that owns a shard key.
+
+        Args:
+            key (str): The shard key.
+            method (str): The name of the operation.
+            **kwargs: The JSON-serializable arguments of the operation.
+        """
+        if self.bus is None or self.is_local(key):
+            await self._handlers[method](**kwargs)
+            return
+        channel = f"{self.CHANNEL_PREFIX}{self.owner(key)}"
+        await self.bus.publish(channel, {"method": method, "kwargs": kwargs})
+
+    async def listen(self) -> None:
+        """Handles operations routed to this worker by other workers."""
+        channel = f"{self.CHANNEL_PREFIX}{self.worker_id}"
+        async for message in self.bus.subscribe(channel):
+            try:
+                await self._handlers[message["method"]](**message["kwargs"])
+            except Exception:
+                log.exception("routed %s failed", message["method"])
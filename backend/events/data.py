@@ -1,5 +1,6 @@
 """Data classes for events."""
 
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -48,10 +49,48 @@ class NewPlayerData(ClientEventData):
         return NewPlayerData(d["name"])
 
 
+@dataclass
+class ResumeSessionData(ClientEventData):
+    """The data associated with a resume session event."""
+    token: str
+    name: str
+
+    @staticmethod
+    def from_dict(d: dict) -> "ResumeSessionData":
+        """Create a new resume session data object from a dictionary.
+
+        Args:
+            d (dict): The dictionary to create the object from.
+
+        Returns:
+            ResumeSessionData: The resume session data object.
+        """
+        return ResumeSessionData(d["token"], d["name"])
+
+
+@dataclass
+class JoinLobbyData(ClientEventData):
+    """The data associated with a join lobby event."""
+    level: BotLevel = BotLevel.NOVICE
+
+    @staticmethod
+    def from_dict(d: dict) -> "JoinLobbyData":
+        """Create a new join lobby data object from a dictionary.
+
+        Args:
+            d (dict): The dictionary to create the object from.
+
+        Returns:
+            JoinLobbyData: The join lobby data object.
+        """
+        return JoinLobbyData(BotLevel(d.get("level", BotLevel.NOVICE)))
+
+
 @dataclass
 class JoinGameData(ClientEventData):
     """The data associated with a join game event."""
     game_id: str
+    token: str = ""
 
     @staticmethod
     def from_dict(d: dict) -> "JoinGameData":
@@ -63,7 +102,7 @@ class JoinGameData(ClientEventData):
         Returns:
             JoinGameData: The join game data object.
         """
-        return JoinGameData(d["game_id"])
+        return JoinGameData(d["game_id"], d.get("token", ""))
 
 
 @dataclass
@@ -104,8 +143,13 @@ class SelectCategoryData(ClientEventData):
 
 @dataclass
 class SubmitAnswerData(ClientEventData):
-    """The data associated with a submit answer event."""
+    """The data associated with a submit answer event.
+
+    It is stamped with the server's monotonic time when parsed, which is as
+    soon as the event is received, so the answer is scored from that time.
+    """
     answer: int
+    received_at: float = 0.0
 
     @staticmethod
     def from_dict(d: dict) -> "SubmitAnswerData":
@@ -117,7 +161,7 @@ class SubmitAnswerData(ClientEventData):
         Returns:
             SubmitAnswerData: The submit answer data object.
         """
-        return SubmitAnswerData(d["answer"])
+        return SubmitAnswerData(d["answer"], time.monotonic())
 
 
 @dataclass
@@ -131,19 +175,43 @@ class UsePowerupData(ClientEventData):
         return UsePowerupData(PowerUp(d["powerup"]))
 
 
+@dataclass
+class PlayerRegisteredData(EventData):
+    """The reply to a player registering or resuming their session."""
+    token: str
+
+
 @dataclass
 class PlayerInfoData(EventData):
-    """The data associated with a player info event."""
+    """The reply to a player getting their player info."""
     id: str
     name: str
 
 
 @dataclass
 class LobbyUpdateData(EventData):
-    """The data associated with a lobby update event."""
+    """The full state of a lobby queue, sent to a player who joins it."""
     players: list[str]
-    time_remaining: int
-    should_start_game: bool
+    deadline: float
+    server_time: float
+    room: str
+    destination_id: str
+
+
+@dataclass
+class LobbyDeltaData(EventData):
+    """The changes to a lobby queue since its last update."""
+    joined: list[str]
+    left: list[str]
+    deadline: float
+    server_time: float
+    room: str
+
+
+@dataclass
+class MatchData(EventData):
+    """The players the lobby matched into a new game."""
+    players: list[Player]
 
 
 @dataclass
@@ -154,7 +222,11 @@ class NewGameData(EventData):
 
 @dataclass
 class GameUpdateData(EventData):
-    """The data associated with a game update event."""
+    """The data associated with a game update event.
+
+    The deadline of the phase and the time the update was made are both on
+    the server's monotonic clock. Clients only use their difference.
+    """
     id: str
     category: str
     phase: str
@@ -162,7 +234,10 @@ class GameUpdateData(EventData):
     question_text: str = ""
     question_options: list[str] = field(default_factory=list)
     correct_answer: int = -1
-    time_remaining: int = 0
+    deadline: float = 0.0
+    server_time: float = 0.0
+    votes: dict[str, int] = field(default_factory=dict)
+    distribution: list[int] = field(default_factory=list)
 
     def to_dict(self) -> dict:
         """Convert the game update data to a dictionary.
@@ -171,13 +246,57 @@ class GameUpdateData(EventData):
             dict: The game update data as a dictionary.
         """
         d = self.__dict__.copy()
-        d["players"] = {sid: p.__dict__ for sid, p in self.players.items()}
+        d["players"] = {sid: p.to_wire() for sid, p in self.players.items()}
         return d
 
 
+@dataclass
+class ShowUpdateData(EventData):
+    """The state of a show, the same for every player in it.
+
+    Unlike a game update it has no player map. The answer distribution is
+    only filled in once a round has ended.
+    """
+    id: str
+    category: str
+    phase: str
+    question_text: str = ""
+    question_options: list[str] = field(default_factory=list)
+    correct_answer: int = -1
+    deadline: float = 0.0
+    server_time: float = 0.0
+    num_players: int = 0
+    num_answered: int = 0
+    distribution: list[int] = field(default_factory=list)
+    leaderboard: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class ShowResultData:
+    """The result of a round for one player in a show."""
+    sid: str
+    answer: int
+    points: int
+    score: int
+    rank: int
+
+
+@dataclass
+class ShowResultsData(EventData):
+    """The results of a round of a show, to be sent to each player privately."""
+    id: str
+    correct_answer: int
+    num_players: int
+    results: list[ShowResultData]
+
+
 @dataclass
 class MessageData(EventData):
-    """The data associated with a message event."""
+    """The data associated with a message event.
+
+    Messages to a single player go out on their own. Chat lines are sent to
+    a room in batches instead.
+    """
     id: str
     sender_id: str
     username: str
@@ -199,8 +318,16 @@ class MessageData(EventData):
         timestamp = d.get("timestamp", datetime.now().isoformat())
         return MessageData(
             id=d["id"],
-            sender_id=d["sender_id"],
-            username=d["username"],
+            sender_id=d.get("sender_id", ""),
+            username=d.get("username", ""),
             message=d["message"],
             destination_id=dest_id,
             timestamp=timestamp)
+
+
+@dataclass
+class ChatData(EventData):
+    """A batch of chat messages for a room, or its recent history for a player who joined it."""
+    room: str
+    messages: list[dict]
+    destination_id: str = ""
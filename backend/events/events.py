@@ -1,7 +1,14 @@
 """Event queue and management for the application."""
 
-from asyncio import Queue
-from enum import Enum
+import asyncio
+import heapq
+import itertools
+import os
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
 
 from events.data import EventData
 
@@ -10,6 +17,7 @@ class ClientEvent(str, Enum):
     """The events that can be emitted by the client."""
     GET_PLAYER = "get_player"
     NEW_PLAYER = "new_player"
+    RESUME_SESSION = "resume_session"
     JOIN_LOBBY = "join_lobby"
     JOIN_GAME = "join_game"
     SET_BOT_LEVEL = "set_bot_level"
@@ -22,34 +30,239 @@ class ClientEvent(str, Enum):
 
 class ServerEvent(str, Enum):
     """The events that can be emitted by the server."""
-    PLAYER_INFO = "player_info"
-    PLAYER_REGISTERED = "player_registered"
     LOBBY_UPDATE = "lobby_update"
+    LOBBY_DELTA = "lobby_delta"
     NEW_GAME = "new_game"
     GAME_UPDATE = "game_update"
+    GAME_DELTA = "game_delta"
+    SHOW_UPDATE = "show_update"
+    SHOW_RESULT = "show_result"
     MESSAGE = "server_message"
+    CHAT = "chat"
+
+    def priority(self) -> "EventPriority":
+        """Gets the default queue priority of the event.
+
+        Returns:
+            EventPriority: The default priority of the event.
+        """
+        match self:
+            case ServerEvent.NEW_GAME: return EventPriority.HIGH
+            case ServerEvent.CHAT: return EventPriority.LOW
+            case _: return EventPriority.NORMAL
+
+
+class EventPriority(IntEnum):
+    """The priority of a queued server event. Lower values are consumed first."""
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+QueuedEvent = tuple[EventPriority, float, ServerEvent, EventData]
+
+
+@dataclass
+class KeyedEvents:
+    """The events queued for one key, in the order they were put."""
+    events: deque[QueuedEvent] = field(default_factory=deque)
+    counts: list[int] = field(default_factory=lambda: [0] * len(EventPriority))
+    turn: int = -1
+
+    def best(self) -> EventPriority | None:
+        """Gets the highest priority among the queued events.
+
+        Returns:
+            EventPriority | None: The priority, or None if nothing is queued.
+        """
+        for priority in EventPriority:
+            if self.counts[priority]:
+                return priority
+        return None
+
+
+class EventShard:
+    """One shard of the event queue, with a single consumer.
+
+    Events for the same key are consumed in the order they were put, so a
+    phase change never overtakes an earlier update of the same game. Priority
+    only decides which key is served next: a key gets the priority of its most
+    urgent queued event, and keys of equal priority take turns.
+    """
+
+    def __init__(self):
+        self._keys: dict[str, KeyedEvents] = {}
+        self._ready: list[tuple[EventPriority, int, str]] = []
+        self._turns = itertools.count()
+        self._size = 0
+        self._not_empty = asyncio.Event()
+
+    def qsize(self) -> int:
+        """Gets the number of queued events.
+
+        Returns:
+            int: The number of events.
+        """
+        return self._size
+
+    def put(self, key: str, event: QueuedEvent) -> None:
+        """Queues an event behind the earlier events of its key.
+
+        Args:
+            key (str): The room or game the event belongs to.
+            event (QueuedEvent): The event, with its priority first.
+        """
+        keyed = self._keys.get(key)
+        if keyed is None:
+            keyed = KeyedEvents()
+            self._keys[key] = keyed
+        best = keyed.best()
+        keyed.events.append(event)
+        keyed.counts[event[0]] += 1
+        self._size += 1
+        if best is None or event[0] < best:
+            self._schedule(key, keyed)
+        self._not_empty.set()
+
+    async def get(self) -> QueuedEvent:
+        """Waits for the next event, from the most urgent key.
+
+        Returns:
+            QueuedEvent: The oldest event of that key.
+        """
+        while not self._size:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        while True:
+            _, turn, key = heapq.heappop(self._ready)
+            keyed = self._keys.get(key)
+            if keyed is not None and keyed.turn == turn:
+                break
+        event = keyed.events.popleft()
+        keyed.counts[event[0]] -= 1
+        self._size -= 1
+        if keyed.events:
+            self._schedule(key, keyed)
+        else:
+            del self._keys[key]
+        return event
+
+    def _schedule(self, key: str, keyed: KeyedEvents) -> None:
+        """Gives a key a turn at the priority of its most urgent event.
+
+        Earlier turns of the key are left in the heap and skipped when popped.
+
+        Args:
+            key (str): The key.
+            keyed (KeyedEvents): The events queued for the key.
+        """
+        keyed.turn = next(self._turns)
+        heapq.heappush(self._ready, (keyed.best(), keyed.turn, key))
+
+
+@dataclass
+class EventQueueStats:
+    """Backpressure metrics for the event queue."""
+    depth: list[int]
+    dropped: dict[str, int]
+    max_wait_seconds: float
+    avg_wait_seconds: float
 
 
 class EventQueue:
-    """A queue of events that can be emitted by the server."""
+    """A queue of events that can be emitted by the server.
+
+    Events are sharded by key (a room or game id), so a slow room only delays
+    its own shard. Each shard has one consumer, and EVENT_QUEUE_SHARDS sets
+    how many there are. Within a shard, events keep their order per key and
+    priority picks the key served next. When a shard is backed up, low
+    priority events are dropped instead of queued.
+    """
 
-    _events = Queue[tuple[ServerEvent, EventData]]()
+    NUM_SHARDS = int(os.getenv("EVENT_QUEUE_SHARDS", "8"))
+    MAX_SHARD_DEPTH = 1000
+
+    _shards: list[EventShard] = []
+    _dropped: dict[str, int] = {}
+    _waited = 0.0
+    _max_wait = 0.0
+    _consumed = 0
 
     @staticmethod
-    async def put(event: ServerEvent, data: EventData) -> None:
+    async def put(event: ServerEvent, data: EventData, key: str = "",
+                  priority: EventPriority | None = None) -> None:
         """Add an event to the queue.
 
         Args:
             event (ServerEvent): The event to add to the queue.
             data (EventData): The data associated with the event.
+            key (str, optional): The room or game the event belongs to. Defaults to "".
+            priority (EventPriority | None, optional): The priority of the event.
+                Defaults to the event's default priority.
         """
-        await EventQueue._events.put((event, data))
+        if priority is None:
+            priority = event.priority()
+        shard = EventQueue._shard(EventQueue.shard_of(key))
+        if priority == EventPriority.LOW and shard.qsize() >= EventQueue.MAX_SHARD_DEPTH:
+            EventQueue._dropped[event.value] = EventQueue._dropped.get(event.value, 0) + 1
+            return
+        shard.put(key, (priority, time.monotonic(), event, data))
 
     @staticmethod
-    async def get() -> tuple[ServerEvent, EventData]:
-        """Get an event from the queue.
+    async def get(shard: int = 0) -> tuple[ServerEvent, EventData]:
+        """Get an event from a shard of the queue.
+
+        Args:
+            shard (int, optional): The shard to get the event from. Defaults to 0.
 
         Returns:
             tuple[ServerEvent, EventData]: The event and data from the queue.
         """
-        return await EventQueue._events.get()
+        _, enqueued_at, event, data = await EventQueue._shard(shard).get()
+        wait = time.monotonic() - enqueued_at
+        EventQueue._waited += wait
+        EventQueue._max_wait = max(EventQueue._max_wait, wait)
+        EventQueue._consumed += 1
+        return event, data
+
+    @staticmethod
+    def shard_of(key: str) -> int:
+        """Gets the shard that events with a key are queued on.
+
+        Args:
+            key (str): The room or game id.
+
+        Returns:
+            int: The index of the shard.
+        """
+        return zlib.crc32(key.encode()) % EventQueue.NUM_SHARDS
+
+    @staticmethod
+    def stats() -> EventQueueStats:
+        """Gets the backpressure metrics of the queue.
+
+        Returns:
+            EventQueueStats: The depth of each shard, drop counts by event,
+                and the time events waited in the queue.
+        """
+        consumed = max(1, EventQueue._consumed)
+        return EventQueueStats(
+            depth=[EventQueue._shard(i).qsize() for i in range(EventQueue.NUM_SHARDS)],
+            dropped=EventQueue._dropped.copy(),
+            max_wait_seconds=EventQueue._max_wait,
+            avg_wait_seconds=EventQueue._waited / consumed,
+        )
+
+    @staticmethod
+    def _shard(index: int) -> EventShard:
+        """Gets a shard of the queue, creating the shards on first use.
+
+        Args:
+            index (int): The index of the shard.
+
+        Returns:
+            EventShard: The shard.
+        """
+        if not EventQueue._shards:
+            EventQueue._shards = [EventShard() for _ in range(EventQueue.NUM_SHARDS)]
+        return EventQueue._shards[index]
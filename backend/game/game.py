@@ -1,15 +1,19 @@
 """Game management service."""
 
 import asyncio
+import math
 import random
+import time
 import uuid
 from typing import Generator
 
+from clock.clock import GameClock, Timer
 from events.data import GameUpdateData, MessageData
-from events.events import EventQueue, ServerEvent
-from game.models import GamePhase, Phase
-from gemini.gemini import Gemini
-from player.player import BotLevel, Player, PlayerType, PowerUp, bot_names
+from events.events import EventPriority, EventQueue, ServerEvent
+from game.models import POINTS_PER_SECOND, GamePhase, GameTally, Phase
+from gemini.cache import FriendCache
+from player.player import NUM_OPTIONS, BotLevel, Player, PlayerType, PowerUp, bot_names
+from questions.bank import QuestionBank
 from questions.models import Category, Question
 from questions.provider import QuestionProvider
 
@@ -18,25 +22,152 @@ class Game:
     """A game of trivia."""
 
     NUM_QUESTIONS = 10
+    UPDATE_TICKS = 1
+    FRIEND_MARGIN_SECONDS = 1
+    FRIEND_UNAVAILABLE = "Sorry, can't talk right now, you're on your own!"
 
     def __init__(self, game_id: str, players: dict[str, Player]):
         self._id = game_id
         self._players = players
+        self._solo = len(players) == 1
         self._bot_level: BotLevel | None = None
         self._category = Category.RANDOM
         self._phase: Phase | None = None
+        self._phase_over = asyncio.Event()
+        self._timer: Timer | None = None
+        self._update_timer: Timer | None = None
         self._question_provider = QuestionProvider()
         self._current_question: Question | None = None
+        self._phase_index = 0
+        self._resume_time: float | None = None
+        self._detached: set[str] = set()
+        self._tally = GameTally()
+        self._recount()
 
     #################################################
     # Public methods
     #################################################
 
+    @property
+    def id(self) -> str:
+        """The id of the game."""
+        return self._id
+
     async def start(self) -> None:
-        """Starts the game."""
-        for p in self._phases():
+        """Starts the game, or resumes it at its current phase if it was restored."""
+        for index, p in enumerate(self._phases()):
+            if index < self._phase_index:
+                continue
+            self._phase_index = index
             self._phase = p
-            await self._run_phase()
+            if self._resume_time is None:
+                await self._run_phase()
+            else:
+                p.duration, self._resume_time = self._resume_time, None
+                await self._run_phase(setup=False)
+
+    def snapshot(self) -> dict:
+        """Gets the state of the game, to resume it after a restart.
+
+        Returns:
+            dict: The state of the game.
+        """
+        question = self._current_question
+        return {
+            "id": self._id,
+            "solo": self._solo,
+            "bot_level": self._bot_level,
+            "category": self._category,
+            "phase_index": self._phase_index,
+            "time_remaining": self._phase.time_remaining() if self._phase else None,
+            "question": question.id if question else None,
+            "provider": self._question_provider.snapshot(),
+            "players": [p.snapshot() for p in self._players.values()],
+        }
+
+    @staticmethod
+    def from_snapshot(state: dict) -> "Game":
+        """Restores a game from a snapshot. Its human players are detached until they rejoin.
+
+        Args:
+            state (dict): The state of the game.
+
+        Returns:
+            Game: The restored game, which resumes its current phase when started.
+        """
+        players = [Player.from_snapshot(p) for p in state["players"]]
+        game = Game(state["id"], {p.sid: p for p in players})
+        game._solo = state["solo"]
+        game._bot_level = BotLevel(state["bot_level"]) if state["bot_level"] else None
+        game._category = Category(state["category"])
+        game._phase_index = state["phase_index"]
+        game._resume_time = state["time_remaining"]
+        if state["question"] is not None:
+            game._current_question = QuestionBank.get(state["question"])
+        game._question_provider.restore(state["provider"])
+        game._detached = {p.sid for p in players if p.type == PlayerType.HUMAN}
+        game._recount()
+        return game
+
+    async def rejoin(self, token: str, sid: str) -> bool:
+        """Reattaches a player to their seat under a new socket id.
+
+        The player does not have to be detached yet, since a reconnect can
+        arrive before the server notices that the old connection dropped.
+
+        Args:
+            token (str): The session token of the player.
+            sid (str): The new socket id of the player.
+
+        Returns:
+            bool: True if the player was reattached, False otherwise.
+        """
+        player = next((p for p in self._players.values()
+                       if p.type == PlayerType.HUMAN and p.token == token), None)
+        if player is None:
+            return False
+        self._detached.discard(player.sid)
+        self._players.pop(player.sid)
+        player.sid = sid
+        self._players[sid] = player
+        self._cancel_changed()
+        await self._update(EventPriority.HIGH)
+        return True
+
+    def detach(self, sid: str) -> bool:
+        """Marks a disconnected player as detached. They keep their seat until removed.
+
+        Args:
+            sid (str): The socket id of the player.
+
+        Returns:
+            bool: True if the player was detached, False if they are not in the game.
+        """
+        if sid not in self._players:
+            return False
+        self._detached.add(sid)
+        return True
+
+    def is_detached(self, sid: str) -> bool:
+        """Checks if a player is detached.
+
+        Args:
+            sid (str): The socket id of the player.
+
+        Returns:
+            bool: True if the player is detached, False otherwise.
+        """
+        return sid in self._detached
+
+    def drop_detached(self) -> None:
+        """Removes the players who did not rejoin the game after it was restored."""
+        for sid in self._detached:
+            player = self._players.pop(sid, None)
+            if player is not None:
+                self._untally(player)
+        self._detached.clear()
+        self._changed()
+        self._check_phase()
 
     def set_bot_level(self, level: BotLevel) -> None:
         """Sets the bot level for the game.
@@ -45,20 +176,51 @@ class Game:
             level (BotLevel): The level of the bot.
         """
         self._bot_level = level
+        self._check_phase()
+
+    def select_category(self, player: Player, category: Category) -> None:
+        """Selects a category for a player, replacing their previous choice.
+
+        Args:
+            player (Player): The player who selected the category.
+            category (Category): The category selected by the player.
+        """
+        if not self._in_phase(GamePhase.CATEGORY_SELECTION):
+            return
+        self._tally.vote(category, player.selected_category)
+        player.selected_category = category
+        self._changed()
+        self._check_phase()
 
-    def submit_answer(self, player: Player, answer: int) -> None:
-        """Submits an answer for a player.
+    def submit_answer(self, player: Player, answer: int, received_at: float | None = None) -> None:
+        """Submits an answer for a player. Only their first answer counts.
+
+        The answer is scored from the time left when the server received it,
+        and answers received after the deadline are ignored.
 
         Args:
             player (Player): The player who submitted the answer.
             answer (int): The answer submitted by the player.
+            received_at (float | None, optional): The monotonic time the answer
+                was received. Defaults to now.
         """
+        if not self._in_phase(GamePhase.AWAITING_ANSWERS) or player.answer != -1:
+            return
+        if not 0 <= answer < NUM_OPTIONS:
+            return
+        remaining = self._phase.time_remaining(received_at)
+        if remaining <= 0:
+            return
         player.answer = answer
-        points = self._phase.time_remaining
+        points = round(remaining * POINTS_PER_SECOND)
         if player.double_points:
             points *= 2
-        if answer == self._current_question.correct_index:
+        correct = answer == self._current_question.correct_index
+        if correct:
             player.score += points
+        self._tally.answer(answer, correct)
+        self._changed()
+        self._check_phase()
 
     async def use_powerup(self, player: Player, powerup: PowerUp) -> None:
         """Uses a powerup for the player.
@@ -67,13 +229,24 @@ class Game:
             player (Player): The player who uses the powerup.
             powerup (PowerUp): The powerup to use.
         """
-        if powerup in player.used_powerups:
+        if not player.use_powerup(powerup):
             return
-        player.used_powerups.append(powerup)
+        self._changed()
         match powerup:
             case PowerUp.FIFTY_FIFTY: self._fifty_fifty(player)
             case PowerUp.CALL_FRIEND: await self._call_friend(player)
-            case PowerUp.DOUBLE_POINTS: player.double_points = True
+            case PowerUp.DOUBLE_POINTS: self._double_points(player)
+
+    def get_player(self, sid: str) -> Player | None:
+        """Gets a player in the game.
+
+        Args:
+            sid (str): The socket id of the player.
+
+        Returns:
+            Player | None: The player, or None if they are not in the game.
+        """
+        return self._players.get(sid)
 
     def remove_player(self, player: Player) -> None:
         """Removes a player from the game.
@@ -82,19 +255,89 @@ class Game:
             player (Player): The player to remove.
         """
         self._players.pop(player.sid)
+        self._detached.discard(player.sid)
+        self._untally(player)
+        self._changed()
+        self._check_phase()
+
+    def num_players(self) -> int:
+        """Gets the number of players in the game, bots included.
+
+        Returns:
+            int: The number of players.
+        """
+        return len(self._players)
 
-    def is_empty(self) -> bool:
-        """Checks if the game is empty.
+    def has_humans(self) -> bool:
+        """Checks if any human players are left in the game.
 
         Returns:
-            bool: True if the game is empty, False otherwise.
+            bool: True if the game has human players, False otherwise.
         """
-        return len(self._players) == 0
+        return any(p.type == PlayerType.HUMAN for p in self._players.values())
+
+    def has_seat(self, token: str) -> bool:
+        """Checks if a session token holds a seat in the game.
+
+        Args:
+            token (str): The session token.
+
+        Returns:
+            bool: True if a human player has the token, False otherwise.
+        """
+        return any(p.type == PlayerType.HUMAN and p.token == token
+                   for p in self._players.values())
+
+    def stop(self) -> None:
+        """Stops the game clock from driving the game, so it can be discarded."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._cancel_changed()
 
     #################################################
     # Private methods
     #################################################
 
+    def _in_phase(self, title: GamePhase) -> bool:
+        """Checks if the game is in a phase.
+
+        Args:
+            title (GamePhase): The phase.
+
+        Returns:
+            bool: True if the current phase is the given one, False otherwise.
+        """
+        return self._phase is not None and self._phase.title == title
+
+    def _recount(self) -> None:
+        """Rebuilds the tally from the players, when the game is created or restored."""
+        self._tally = GameTally()
+        q = self._current_question
+        for p in self._get_players_by_type(PlayerType.HUMAN):
+            self._tally.humans += 1
+            if p.selected_category is not None:
+                self._tally.vote(p.selected_category)
+            if p.answer != -1:
+                self._tally.answer(p.answer, q is not None and p.answer == q.correct_index)
+            self._tally.double_points += p.double_points
+
+    def _untally(self, player: Player) -> None:
+        """Removes a player who left from the tally.
+
+        Args:
+            player (Player): The player.
+        """
+        if player.type != PlayerType.HUMAN:
+            return
+        self._tally.humans -= 1
+        if player.selected_category is not None:
+            self._tally.unvote(player.selected_category)
+        if player.answer != -1:
+            q = self._current_question
+            self._tally.unanswer(player.answer, q is not None and player.answer == q.correct_index)
+        self._tally.double_points -= player.double_points
+
     def _add_bots(self) -> None:
         """Adds bots to the game."""
         random.shuffle(bot_names)
@@ -115,14 +358,13 @@ class Game:
             Generator[Phase, None, None]: The phases of the game.
         """
         yield self._make_phase(GamePhase.GAME_STARTED)
-        if len(self._players) == 1:
+        if self._solo:
             yield self._make_phase(GamePhase.BOT_LEVEL_SELECTION)
         yield self._make_phase(GamePhase.CATEGORY_SELECTION)
         yield self._make_phase(GamePhase.CATEGORY_RESULTS)
         for _ in range(Game.NUM_QUESTIONS):
             yield self._make_phase(GamePhase.AWAITING_ANSWERS)
             yield self._make_phase(GamePhase.ROUND_ENDED)
-            self._next_question()
         yield self._make_phase(GamePhase.GAME_ENDED)
 
     def _make_phase(self, title: GamePhase) -> Phase:
@@ -134,7 +376,7 @@ class Game:
         Returns:
             Phase: The Phase object for the phase.
         """
-        p = Phase(title=title, time_remaining=title.get_duration())
+        p = Phase(title=title, duration=title.get_duration())
         match title:
             case GamePhase.GAME_STARTED:
                 p.setup = self._players_reset
@@ -150,24 +392,90 @@ class Game:
                 p.teardown = self._update_bot_scores
             case GamePhase.ROUND_ENDED:
                 p.setup = self._adjust_difficulty
+                p.teardown = self._next_question
         return p
 
-    async def _run_phase(self) -> None:
-        """Runs the current phase."""
-        self._phase.setup()
-        await self._update()
-        while self._phase.time_remaining > 0 and not self._phase.should_stop():
-            await self._tick()
-            await self._update()
+    async def _run_phase(self, setup: bool = True) -> None:
+        """Runs the current phase until it times out or its stop condition is met.
+
+        The deadline is sent once when the phase starts, and clients count down
+        to it locally.
+
+        Args:
+            setup (bool, optional): Whether to set up the phase. Defaults to True,
+                and is False when resuming a restored phase.
+        """
+        if setup:
+            self._phase.setup()
+        self._phase.start()
+        self._cancel_changed()
+        await self._update(EventPriority.HIGH)
+        self._phase_over.clear()
+        self._check_phase()
+        if not self._phase_over.is_set():
+            self._schedule_deadline()
+            await self._phase_over.wait()
         self._phase.teardown()
 
+    def _changed(self) -> None:
+        """Schedules an update for a change made during the phase.
+
+        Changes are batched into one update per UPDATE_TICKS, which the
+        broadcaster sends as a delta.
+        """
+        if self._update_timer is None and self._phase is not None:
+            self._update_timer = GameClock.schedule(self._send_changes, self.UPDATE_TICKS)
+
+    def _cancel_changed(self) -> None:
+        """Cancels a pending update, when a full update is about to be sent."""
+        if self._update_timer is not None:
+            self._update_timer.cancel()
+            self._update_timer = None
+
+    async def _send_changes(self) -> None:
+        """Sends the changes made during the phase. Called by the game clock."""
+        self._update_timer = None
+        await self._update()
+
+    def _schedule_deadline(self) -> None:
+        """Schedules a check of the phase on the game clock when its deadline is due."""
+        ticks = math.ceil(self._phase.time_remaining() / GameClock.TICK_SECONDS)
+        self._timer = GameClock.schedule(self._deadline_due, ticks)
+
+    async def _deadline_due(self) -> None:
+        """Ends the phase at its deadline. Called by the game clock.
+
+        Clock ticks are not aligned with the deadline, so the check is
+        scheduled again if the tick came early.
+        """
+        self._timer = None
+        self._check_phase()
+        if not self._phase_over.is_set():
+            self._schedule_deadline()
+
+    def _check_phase(self) -> None:
+        """Ends the current phase if it has timed out or its stop condition is met."""
+        if self._phase is None:
+            return
+        if self._phase.time_remaining() > 0 and not self._phase.should_stop():
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._phase_over.set()
+
     def _next_question(self) -> None:
         """Gets the next question."""
         self._current_question = next(
             self._question_provider.questions(), None)
 
-    async def _update(self) -> None:
-        """Updates the game state and yields the current state."""
+    async def _update(self, priority: EventPriority = EventPriority.NORMAL) -> None:
+        """Updates the game state and yields the current state.
+
+        Args:
+            priority (EventPriority, optional): The priority of the update.
+                Defaults to NORMAL.
+        """
         question_text = ""
         question_options = []
         if self._current_question is not None:
@@ -175,8 +483,14 @@ class Game:
             question_options = self._current_question.options
 
         correct_answer = -1
+        distribution = []
         if self._phase.title == GamePhase.ROUND_ENDED:
             correct_answer = self._current_question.correct_index
+            distribution = list(self._tally.distribution)
+
+        votes = {}
+        if self._phase.title in (GamePhase.CATEGORY_SELECTION, GamePhase.CATEGORY_RESULTS):
+            votes = {c.value: n for c, n in self._tally.votes.items()}
 
         update = GameUpdateData(
             id=self._id,
@@ -186,14 +500,12 @@ class Game:
             question_text=question_text,
             question_options=question_options,
             correct_answer=correct_answer,
-            time_remaining=self._phase.time_remaining,
+            deadline=self._phase.deadline,
+            server_time=time.monotonic(),
+            votes=votes,
+            distribution=distribution,
         )
-        await EventQueue.put(ServerEvent.GAME_UPDATE, update)
-
-    async def _tick(self) -> None:
-        """Ticks the game timer."""
-        await asyncio.sleep(1)
-        self._phase.time_remaining -= 1
+        await EventQueue.put(ServerEvent.GAME_UPDATE, update, self._id, priority)
 
     def _get_players_by_type(self, player_type: PlayerType) -> list[Player]:
         """Gets the players by type.
@@ -210,11 +522,14 @@ class Game:
         """Resets the players for a new game."""
         for p in self._players.values():
             p.total_reset()
+        self._tally.reset_votes()
+        self._tally.reset_round()
 
     def _round_reset(self) -> None:
         """Resets the answers for each player."""
         for p in self._players.values():
             p.round_reset()
+        self._tally.reset_round()
 
     def _is_bot_level_set(self) -> bool:
         """Checks if the bot level has been set.
@@ -230,30 +545,26 @@ class Game:
         Returns:
             bool: True if all players have selected a category, False otherwise.
         """
-        humans = self._get_players_by_type(PlayerType.HUMAN)
-        return all(h.selected_category is not None for h in humans)
+        return self._tally.voted >= self._tally.humans
 
     def _load_questions(self) -> None:
         """Loads the questions for the game from the category with the most votes."""
-        votes = {c: 0 for c in Category}
-        humans = self._get_players_by_type(PlayerType.HUMAN)
-        for h in humans:
-            if h.selected_category is not None:
-                votes[h.selected_category] += 1
+        votes = self._tally.votes
         if len(votes) == 0:
             self._category = Category.randomize()
         else:
             majority = max(votes.values())
             candidates = [c for c in votes if votes[c] == majority]
             self._category = random.choice(candidates)
-        self._question_provider.load_questions(self._category)
+        self._question_provider.load_questions(
+            self._category, Game.NUM_QUESTIONS)
         self._next_question()
 
     def _update_bot_scores(self) -> None:
         """Updates the scores for each bot."""
         bots = self._get_players_by_type(PlayerType.BOT)
         for b in bots:
-            b.score += b.level.mock_round_points()
+            b.score += b.level.mock_round_points() * POINTS_PER_SECOND
 
     def _all_answered(self) -> bool:
         """Checks if all players have answered the current question.
@@ -261,17 +572,13 @@ class Game:
         Returns:
             bool: True if all players have answered the current question, False otherwise.
         """
-        humans = self._get_players_by_type(PlayerType.HUMAN)
-        return all(h.answer != -1 for h in humans)
+        return self._tally.answered >= self._tally.humans
 
     def _adjust_difficulty(self) -> None:
         """Adjusts the difficulty of the questions."""
-        humans = self._get_players_by_type(PlayerType.HUMAN)
-        answers = [h.answer for h in humans]
-        correct = [a == self._current_question.correct_index for a in answers]
-        if all(correct):
+        if self._tally.correct == self._tally.humans:
             self._question_provider.increase_difficulty()
-        if not any(correct):
+        if self._tally.correct == 0:
             self._question_provider.decrease_difficulty()
 
     def _fifty_fifty(self, player: Player) -> None:
@@ -283,8 +590,17 @@ class Game:
         correct = self._current_question.correct_index
         indices = [i for i in range(4) if i != correct]
         random.shuffle(indices)
-        player.visible_options[indices[0]] = False
-        player.visible_options[indices[1]] = False
+        player.hide_option(indices[0])
+        player.hide_option(indices[1])
+
+    def _double_points(self, player: Player) -> None:
+        """Doubles the points the player wins this round.
+
+        Args:
+            player (Player): The player who uses the powerup.
+        """
+        player.double_points = True
+        self._tally.double_points += 1
 
     async def _call_friend(self, player: Player) -> None:
         """Sends a message to the player's friend.
@@ -292,11 +608,14 @@ class Game:
         Args:
             player (Player): The player who uses the powerup.
         """
-        await self._friend_message(player.sid, "Thinking...")
         q = self._current_question
-        prompt = Gemini.call_friend_prompt(q.text, q.options)
-        response = await Gemini.query_async(prompt)
-        await self._friend_message(player.sid, response)
+        if q.friend_hint:
+            await self._friend_message(player.sid, q.friend_hint)
+            return
+        await self._friend_message(player.sid, "Thinking...")
+        timeout = self._phase.time_remaining() - Game.FRIEND_MARGIN_SECONDS
+        response = await FriendCache.get(q, timeout=max(timeout, 0))
+        await self._friend_message(player.sid, response or Game.FRIEND_UNAVAILABLE)
 
     async def _friend_message(self, destination_id: str, message: str) -> None:
         """Sends a message to the player's friend.
@@ -312,4 +631,4 @@ class Game:
             message=message,
             destination_id=destination_id
         )
-        await EventQueue.put(ServerEvent.MESSAGE, message)
+        await EventQueue.put(ServerEvent.MESSAGE, message, self._id)
@@ -1,34 +1,216 @@
 """Game manager for managing multiple game instances."""
 
 import asyncio
-import uuid
+import os
+from typing import Callable
 
-from events.data import NewGameData
+from clock.clock import GameClock
+from events.data import NewGameData, ShowUpdateData
 from game.game import Game
+from game.show import ShowGame
+from game.snapshots import SnapshotStore
+from log.log import get_logger
 from player.player import BotLevel, Player, PowerUp
+from questions.models import Category
+
+log = get_logger(__name__)
 
 
 class GameManager:
-    """Manager for managing multiple game instances."""
+    """Manager for managing multiple game instances, including live shows.
+
+    Each game runs in its own task. A game that has ended lingers for
+    LINGER_SECONDS, so late joiners still get its final state, and is then
+    evicted. A game left with no human players is stopped and evicted at once.
+    """
+
+    REJOIN_SECONDS = 30
+    LINGER_SECONDS = int(os.getenv("GAME_LINGER_SECONDS", "30"))
+
+    def __init__(self, on_evict: Callable[[str], None] = lambda _: None):
+        """Initializes the game manager.
 
-    def __init__(self):
-        self._games: dict[str, Game] = {}
+        Args:
+            on_evict (Callable[[str], None], optional): Called with the id of
+                each game when it is evicted.
+        """
+        self._games: dict[str, Game | ShowGame] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._on_evict = on_evict
 
-    def new_game(self, players: dict[str, Player]) -> NewGameData:
+    def new_game(self, game_id: str, players: dict[str, Player]) -> NewGameData:
         """Creates a new game.
 
         Args:
+            game_id (str): The id of the game.
             players (dict[str, Player]): The players in the game.
 
         Returns:
             NewGameData: The new game data.
         """
-        game_id = str(uuid.uuid4())
         game = Game(game_id, players)
-        self._games[game_id] = game
-        asyncio.create_task(game.start())
+        self._start(game)
         return NewGameData(game_id)
 
+    def new_show(self, game_id: str, category: Category, num_questions: int,
+                 start_seconds: int) -> None:
+        """Creates a live show that players can join until it ends.
+
+        Args:
+            game_id (str): The id of the show.
+            category (Category): The category of the questions.
+            num_questions (int): The number of questions.
+            start_seconds (int): The time before the first question.
+        """
+        self._start(ShowGame(game_id, category, num_questions, start_seconds))
+
+    def is_show(self, game_id: str) -> bool:
+        """Checks if a game is a live show.
+
+        Args:
+            game_id (str): The id of the game.
+
+        Returns:
+            bool: True if the game is a show, False otherwise.
+        """
+        return isinstance(self._games.get(game_id), ShowGame)
+
+    def has_seat(self, game_id: str, token: str) -> bool:
+        """Checks if a session token holds a seat in a game or show.
+
+        Args:
+            game_id (str): The id of the game.
+            token (str): The session token.
+
+        Returns:
+            bool: True if the token holds a seat, False otherwise.
+        """
+        game = self._games.get(game_id)
+        return game is not None and game.has_seat(token)
+
+    async def join_show(self, game_id: str, sid: str, name: str,
+                        token: str = "") -> ShowUpdateData | None:
+        """Adds a player to a live show, or reattaches them if they were in it.
+
+        A player without a name is not seated, and only watches the show.
+
+        Args:
+            game_id (str): The id of the show.
+            sid (str): The socket id of the player.
+            name (str): The name of the player.
+            token (str, optional): The session token of the player.
+
+        Returns:
+            ShowUpdateData | None: The current state of the show, or None if
+                there is no such show.
+        """
+        show = self._games.get(game_id)
+        if not isinstance(show, ShowGame):
+            return None
+        if not (token and await show.rejoin(token, sid)) and name:
+            show.add_player(sid, name, token)
+        return show.state()
+
+    def restore_games(self) -> int:
+        """Restores the games saved in the snapshot store, resuming each at its current phase.
+
+        Players who do not rejoin within REJOIN_SECONDS are removed.
+
+        Returns:
+            int: The number of restored games.
+        """
+        if not SnapshotStore.is_enabled():
+            return 0
+        states = SnapshotStore.load()
+        for state in states:
+            game = Game.from_snapshot(state)
+            self._start(game)
+            GameClock.schedule(lambda g=game: self._drop_detached(g), self.REJOIN_SECONDS)
+        return len(states)
+
+    async def rejoin(self, game_id: str, token: str, sid: str) -> bool:
+        """Reattaches a player to their seat in a game under a new socket id.
+
+        Args:
+            game_id (str): The id of the game.
+            token (str): The session token of the player.
+            sid (str): The new socket id of the player.
+
+        Returns:
+            bool: True if the player was reattached, False otherwise.
+        """
+        game = self._games.get(game_id)
+        return game is not None and await game.rejoin(token, sid)
+
+    def detach(self, game_id: str, sid: str) -> bool:
+        """Marks a disconnected player as detached, keeping their seat until they rejoin.
+
+        Args:
+            game_id (str): The id of the game.
+            sid (str): The socket id of the player.
+
+        Returns:
+            bool: True if the player was detached, False if they are not in the game.
+        """
+        game = self._games.get(game_id)
+        return game is not None and game.detach(sid)
+
+    def is_detached(self, game_id: str, sid: str) -> bool:
+        """Checks if a player is detached from a game.
+
+        Args:
+            game_id (str): The id of the game.
+            sid (str): The socket id of the player.
+
+        Returns:
+            bool: True if the player is detached, False otherwise.
+        """
+        game = self._games.get(game_id)
+        return game is not None and game.is_detached(sid)
+
+    def num_running(self) -> int:
+        """Gets the number of games that are still being played.
+
+        Returns:
+            int: The number of running games.
+        """
+        return len(self._tasks)
+
+    def num_finished(self) -> int:
+        """Gets the number of games that have ended and are waiting to be evicted.
+
+        Returns:
+            int: The number of finished games.
+        """
+        return len(self._games) - len(self._tasks)
+
+    def num_players(self) -> int:
+        """Gets the number of players in all games, bots included.
+
+        Returns:
+            int: The number of players.
+        """
+        return sum(game.num_players() for game in self._games.values())
+
+    def games(self) -> list[Game | ShowGame]:
+        """Gets the games on this worker, running or finished.
+
+        Returns:
+            list[Game | ShowGame]: The games.
+        """
+        return list(self._games.values())
+
+    def has_game(self, game_id: str) -> bool:
+        """Checks if a game exists.
+
+        Args:
+            game_id (str): The id of the game.
+
+        Returns:
+            bool: True if the game exists, False otherwise.
+        """
+        return game_id in self._games
+
     def set_bot_level(self, game_id: str, level: BotLevel) -> None:
         """Sets the bot level for a game.
 
@@ -36,40 +218,139 @@ class GameManager:
             game_id (str): The id of the game.
             level (BotLevel): The level of the bot.
         """
-        game = self._games.get(game_id)
+        game = self._classic(game_id)
         if game:
             game.set_bot_level(level)
 
-    def submit_answer(self, player: Player, answer: int) -> None:
+    def select_category(self, game_id: str, sid: str, category: Category) -> None:
+        """Selects a category for a player.
+
+        Args:
+            game_id (str): The id of the game.
+            sid (str): The socket id of the player who selected the category.
+            category (Category): The category selected by the player.
+        """
+        game = self._classic(game_id)
+        player = game.get_player(sid) if game else None
+        if player:
+            game.select_category(player, category)
+
+    def submit_answer(self, game_id: str, sid: str, answer: int,
+                      received_at: float | None = None) -> None:
         """Submits an answer for a player.
 
         Args:
-            player (Player): The player who submitted the answer.
+            game_id (str): The id of the game.
+            sid (str): The socket id of the player who submitted the answer.
             answer (int): The answer submitted by the player.
+            received_at (float | None, optional): The monotonic time the answer
+                was received. Defaults to now.
         """
-        game = self._games.get(player.room)
-        if game:
-            game.submit_answer(player, answer)
+        game = self._games.get(game_id)
+        player = game.get_player(sid) if game else None
+        if player:
+            game.submit_answer(player, answer, received_at)
 
-    async def use_powerup(self, player: Player, powerup: PowerUp) -> None:
+    async def use_powerup(self, game_id: str, sid: str, powerup: PowerUp) -> None:
         """Uses a powerup for the player.
 
         Args:
-            player (Player): The player who used the powerup.
+            game_id (str): The id of the game.
+            sid (str): The socket id of the player who used the powerup.
             powerup (PowerUp): The powerup used by the player.
         """
-        game = self._games.get(player.room)
-        if game:
+        game = self._classic(game_id)
+        player = game.get_player(sid) if game else None
+        if player:
             await game.use_powerup(player, powerup)
 
-    def remove_player(self, player: Player) -> None:
-        """Removes a player from the game.
+    def remove_player(self, game_id: str, sid: str) -> None:
+        """Removes a player from the game, and evicts a game with no humans left.
+
+        Shows are only evicted once they end, since players can join them at
+        any time.
 
         Args:
-            player (Player): The player to remove.
+            game_id (str): The id of the game.
+            sid (str): The socket id of the player to remove.
         """
-        game = self._games.get(player.room)
-        if game:
+        game = self._games.get(game_id)
+        player = game.get_player(sid) if game else None
+        if player:
             game.remove_player(player)
-            if game.is_empty():
-                self._games.pop(player.room)
+            if isinstance(game, Game) and not game.has_humans():
+                self._evict(game)
+
+    def _classic(self, game_id: str) -> Game | None:
+        """Gets a game that is not a show, for the actions shows do not have.
+
+        Args:
+            game_id (str): The id of the game.
+
+        Returns:
+            Game | None: The game, or None if there is no such game or it is a show.
+        """
+        game = self._games.get(game_id)
+        return game if isinstance(game, Game) else None
+
+    def _start(self, game: Game | ShowGame) -> None:
+        """Starts running a game. Shows are too large to be snapshotted.
+
+        Args:
+            game (Game | ShowGame): The game.
+        """
+        self._games[game.id] = game
+        if SnapshotStore.is_enabled() and isinstance(game, Game):
+            SnapshotStore.track(game)
+        self._tasks[game.id] = asyncio.create_task(self._run(game))
+
+    async def _run(self, game: Game | ShowGame) -> None:
+        """Runs a game, then stops snapshotting it and schedules its eviction.
+
+        Args:
+            game (Game | ShowGame): The game.
+        """
+        try:
+            await game.start()
+        except Exception:
+            log.exception("game %s failed", game.id)
+        finally:
+            self._tasks.pop(game.id, None)
+            SnapshotStore.forget(game.id)
+        GameClock.schedule(lambda: self._linger_over(game), self.LINGER_SECONDS)
+
+    async def _linger_over(self, game: Game | ShowGame) -> None:
+        """Evicts a game whose linger period is over. Called by the game clock.
+
+        Args:
+            game (Game | ShowGame): The game.
+        """
+        self._evict(game)
+
+    async def _drop_detached(self, game: Game) -> None:
+        """Removes the players of a restored game who did not rejoin it.
+
+        Args:
+            game (Game): The game.
+        """
+        game.drop_detached()
+        if not game.has_humans():
+            self._evict(game)
+
+    def _evict(self, game: Game | ShowGame) -> None:
+        """Stops a game if it is still running, and drops all of its state.
+
+        Args:
+            game (Game | ShowGame): The game.
+        """
+        if self._games.get(game.id) is not game:
+            return
+        task = self._tasks.pop(game.id, None)
+        if task is not None:
+            task.cancel()
+        game.stop()
+        self._games.pop(game.id)
+        SnapshotStore.forget(game.id)
+        self._on_evict(game.id)
+        log.info("evicted game %s, %d running, %d finished",
+                 game.id, self.num_running(), self.num_finished())
@@ -1,9 +1,13 @@
 """Models for the game."""
 
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Callable
 
+from player.player import NUM_OPTIONS
+from questions.models import Category
+
 
 class GamePhase(str, Enum):
     """The phase of a game."""
@@ -32,11 +36,122 @@ class GamePhase(str, Enum):
             case _: return 0
 
 
+POINTS_PER_SECOND = 10
+
+
 @dataclass
 class Phase:
-    """The data for a game phase."""
+    """The data for a game phase.
+
+    The deadline is on the monotonic clock, which is shared by every worker
+    on the host, so it can be compared with the time an event was received.
+    """
     title: GamePhase
-    time_remaining: int = 0
+    duration: float = 0
     setup: Callable[[], None] = lambda: None
     teardown: Callable[[], None] = lambda: None
     should_stop: Callable[[], bool] = lambda: False
+    deadline: float = 0.0
+
+    def start(self) -> None:
+        """Starts the phase, setting its deadline from its duration."""
+        self.deadline = time.monotonic() + self.duration
+
+    def time_remaining(self, at: float | None = None) -> float:
+        """Gets the time left before the deadline.
+
+        Args:
+            at (float | None, optional): The monotonic time to measure from.
+                Defaults to now.
+
+        Returns:
+            float: The seconds left, or 0 if the deadline has passed.
+        """
+        if at is None:
+            at = time.monotonic()
+        return max(0.0, self.deadline - at)
+
+
+@dataclass
+class GameTally:
+    """Running counts of what the human players of a game have done.
+
+    The game updates them as players vote, answer, use power ups and leave,
+    so phase checks and end-of-round logic never scan the players.
+    """
+    humans: int = 0
+    voted: int = 0
+    votes: dict[Category, int] = field(default_factory=dict)
+    answered: int = 0
+    correct: int = 0
+    distribution: list[int] = field(default_factory=lambda: [0] * NUM_OPTIONS)
+    double_points: int = 0
+
+    def vote(self, category: Category, previous: Category | None = None) -> None:
+        """Counts a player's category vote, replacing their previous one.
+
+        Args:
+            category (Category): The category voted for.
+            previous (Category | None, optional): The player's previous vote.
+        """
+        if previous is None:
+            self.voted += 1
+        else:
+            self._count_vote(previous, -1)
+        self._count_vote(category, 1)
+
+    def answer(self, answer: int, correct: bool) -> None:
+        """Counts a player's answer.
+
+        Args:
+            answer (int): The index of the answer.
+            correct (bool): Whether the answer is correct.
+        """
+        self.answered += 1
+        self.correct += correct
+        self.distribution[answer] += 1
+
+    def unvote(self, category: Category) -> None:
+        """Removes the vote of a player who left.
+
+        Args:
+            category (Category): The category they voted for.
+        """
+        self.voted -= 1
+        self._count_vote(category, -1)
+
+    def unanswer(self, answer: int, correct: bool) -> None:
+        """Removes the answer of a player who left.
+
+        Args:
+            answer (int): The index of the answer.
+            correct (bool): Whether the answer is correct.
+        """
+        self.answered -= 1
+        self.correct -= correct
+        self.distribution[answer] -= 1
+
+    def reset_votes(self) -> None:
+        """Clears the votes, for a new game."""
+        self.voted = 0
+        self.votes = {}
+
+    def reset_round(self) -> None:
+        """Clears the answers and double points, for a new round."""
+        self.answered = 0
+        self.correct = 0
+        self.distribution = [0] * NUM_OPTIONS
+        self.double_points = 0
+
+    def _count_vote(self, category: Category, delta: int) -> None:
+        """Adds to the tally of a category, dropping categories with no votes.
+
+        Args:
+            category (Category): The category.
+            delta (int): The change in votes.
+        """
+        count = self.votes.get(category, 0) + delta
+        if count:
+            self.votes[category] = count
+        else:
+            self.votes.pop(category, None)
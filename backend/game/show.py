@@ -0,0 +1,378 @@
+"""Live-show games for a large audience in a single room."""
+
+import asyncio
+import bisect
+import heapq
+import math
+import time
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Generator
+
+from clock.clock import GameClock, Timer
+from events.data import ShowResultData, ShowResultsData, ShowUpdateData
+from events.events import EventPriority, EventQueue, ServerEvent
+from game.models import POINTS_PER_SECOND, GamePhase, Phase
+from player.player import NUM_OPTIONS
+from questions.models import Category, Question
+from questions.provider import QuestionProvider
+
+
+@dataclass(slots=True)
+class Contestant:
+    """A player in a show. Lighter than a Player, since a show holds thousands."""
+    sid: str
+    name: str
+    token: str = ""
+    score: int = 0
+
+
+class ShowGame:
+    """A live show, where every player in one room answers the same questions.
+
+    An answer is scored on arrival and counted in the round's answer
+    distribution, so ingesting it is O(1). The room gets fixed-size updates
+    with counts, the distribution and a top-N leaderboard instead of every
+    player. Each player's own result and rank are sent to them privately when
+    a round ends, and ranking is the only work that touches every player.
+    """
+
+    NUM_QUESTIONS = 10
+    LEADERBOARD_SIZE = 10
+    EASIER_BELOW = 0.25
+    HARDER_ABOVE = 0.75
+
+    def __init__(self, game_id: str, category: Category = Category.RANDOM,
+                 num_questions: int = NUM_QUESTIONS, start_seconds: int = 30):
+        self._id = game_id
+        self._category = category
+        self._num_questions = num_questions
+        self._start_seconds = start_seconds
+        self._players: dict[str, Contestant] = {}
+        self._sid_of: dict[str, str] = {}
+        self._detached: set[str] = set()
+        self._answers: dict[str, tuple[int, int]] = {}
+        self._distribution = [0] * NUM_OPTIONS
+        self._scores: list[int] = []
+        self._leaderboard: list[dict] = []
+        self._phase: Phase | None = None
+        self._phase_over = asyncio.Event()
+        self._timer: Timer | None = None
+        self._question_provider = QuestionProvider()
+        self._questions = self._question_provider.questions()
+        self._current_question: Question | None = None
+
+    #################################################
+    # Public methods
+    #################################################
+
+    @property
+    def id(self) -> str:
+        """The id of the show."""
+        return self._id
+
+    async def start(self) -> None:
+        """Runs the show until its last phase is over."""
+        for p in self._phases():
+            self._phase = p
+            await self._run_phase()
+
+    def state(self) -> ShowUpdateData:
+        """Gets the current state of the show.
+
+        Returns:
+            ShowUpdateData: The state, as sent to the room.
+        """
+        phase = self._phase
+        if phase is None:
+            phase = Phase(GamePhase.GAME_STARTED, self._start_seconds)
+            phase.start()
+        q = self._current_question
+        if phase.title == GamePhase.GAME_STARTED:
+            q = None
+        ended = phase.title == GamePhase.ROUND_ENDED
+        return ShowUpdateData(
+            id=self._id,
+            category=self._category,
+            phase=phase.title,
+            question_text=q.text if q else "",
+            question_options=q.options if q else [],
+            correct_answer=q.correct_index if q and ended else -1,
+            deadline=phase.deadline,
+            server_time=time.monotonic(),
+            num_players=len(self._players),
+            num_answered=len(self._answers),
+            distribution=list(self._distribution) if ended else [],
+            leaderboard=self._leaderboard,
+        )
+
+    def add_player(self, sid: str, name: str, token: str = "") -> None:
+        """Adds a player to the show. Players can join at any time.
+
+        A player who is already in the show keeps their seat and score.
+
+        Args:
+            sid (str): The socket id of the player.
+            name (str): The name of the player.
+            token (str, optional): The session token of the player.
+        """
+        if sid in self._players:
+            return
+        self._players[sid] = Contestant(sid, name, token)
+        if token:
+            self._sid_of[token] = sid
+
+    def has_seat(self, token: str) -> bool:
+        """Checks if a session token holds a seat in the show.
+
+        Args:
+            token (str): The session token.
+
+        Returns:
+            bool: True if a player has the token, False otherwise.
+        """
+        return self._sid_of.get(token) in self._players
+
+    async def rejoin(self, token: str, sid: str) -> bool:
+        """Reattaches a player to the show under a new socket id.
+
+        Args:
+            token (str): The session token of the player.
+            sid (str): The new socket id of the player.
+
+        Returns:
+            bool: True if the player was reattached, False otherwise.
+        """
+        old_sid = self._sid_of.get(token)
+        if old_sid is None or old_sid not in self._players:
+            return False
+        self._detached.discard(old_sid)
+        player = self._players.pop(old_sid)
+        player.sid = sid
+        self._players[sid] = player
+        self._sid_of[token] = sid
+        if old_sid in self._answers:
+            self._answers[sid] = self._answers.pop(old_sid)
+        return True
+
+    def detach(self, sid: str) -> bool:
+        """Marks a disconnected player as detached. They keep their score until removed.
+
+        Args:
+            sid (str): The socket id of the player.
+
+        Returns:
+            bool: True if the player was detached, False if they are not in the show.
+        """
+        if sid not in self._players:
+            return False
+        self._detached.add(sid)
+        return True
+
+    def is_detached(self, sid: str) -> bool:
+        """Checks if a player is detached.
+
+        Args:
+            sid (str): The socket id of the player.
+
+        Returns:
+            bool: True if the player is detached, False otherwise.
+        """
+        return sid in self._detached
+
+    def submit_answer(self, player: Contestant, answer: int,
+                      received_at: float | None = None) -> None:
+        """Scores a player's answer to the current question. Later answers are ignored.
+
+        Args:
+            player (Contestant): The player who submitted the answer.
+            answer (int): The index of the answer.
+            received_at (float | None, optional): The monotonic time the answer
+                was received. Defaults to now.
+        """
+        if self._phase.title != GamePhase.AWAITING_ANSWERS or player.sid in self._answers:
+            return
+        if not 0 <= answer < NUM_OPTIONS:
+            return
+        remaining = self._phase.time_remaining(received_at)
+        if remaining <= 0:
+            return
+        points = 0
+        if answer == self._current_question.correct_index:
+            points = round(remaining * POINTS_PER_SECOND)
+            player.score += points
+        self._answers[player.sid] = (answer, points)
+        self._distribution[answer] += 1
+        self._check_phase()
+
+    def get_player(self, sid: str) -> Contestant | None:
+        """Gets a player in the show.
+
+        Args:
+            sid (str): The socket id of the player.
+
+        Returns:
+            Contestant | None: The player, or None if they are not in the show.
+        """
+        return self._players.get(sid)
+
+    def remove_player(self, player: Contestant) -> None:
+        """Removes a player from the show.
+
+        Args:
+            player (Contestant): The player to remove.
+        """
+        self._players.pop(player.sid)
+        self._detached.discard(player.sid)
+        if self._sid_of.get(player.token) == player.sid:
+            del self._sid_of[player.token]
+        answer = self._answers.pop(player.sid, None)
+        if answer is not None:
+            self._distribution[answer[0]] -= 1
+        self._check_phase()
+
+    def num_players(self) -> int:
+        """Gets the number of players in the show.
+
+        Returns:
+            int: The number of players.
+        """
+        return len(self._players)
+
+    def stop(self) -> None:
+        """Stops the game clock from driving the show, so it can be discarded."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    #################################################
+    # Private methods
+    #################################################
+
+    def _phases(self) -> Generator[Phase, None, None]:
+        """Yields the phases of the show.
+
+        Yields:
+            Generator[Phase, None, None]: The phases of the show.
+        """
+        yield Phase(title=GamePhase.GAME_STARTED, duration=self._start_seconds,
+                    setup=self._load_questions)
+        for _ in range(self._num_questions):
+            if self._current_question is None:
+                break
+            yield Phase(title=GamePhase.AWAITING_ANSWERS,
+                        duration=GamePhase.AWAITING_ANSWERS.get_duration(),
+                        setup=self._round_reset, should_stop=self._all_answered)
+            yield Phase(title=GamePhase.ROUND_ENDED,
+                        duration=GamePhase.ROUND_ENDED.get_duration(),
+                        setup=self._rank, teardown=self._next_question)
+        yield Phase(title=GamePhase.GAME_ENDED,
+                    duration=GamePhase.GAME_ENDED.get_duration())
+
+    async def _run_phase(self) -> None:
+        """Runs the current phase until it times out or its stop condition is met."""
+        self._phase.setup()
+        self._phase.start()
+        await self._update(EventPriority.HIGH)
+        if self._phase.title == GamePhase.ROUND_ENDED:
+            await self._send_results()
+        self._phase_over.clear()
+        self._check_phase()
+        if not self._phase_over.is_set():
+            self._schedule_deadline()
+            await self._phase_over.wait()
+        self._phase.teardown()
+
+    def _schedule_deadline(self) -> None:
+        """Schedules a check of the phase on the game clock when its deadline is due."""
+        ticks = math.ceil(self._phase.time_remaining() / GameClock.TICK_SECONDS)
+        self._timer = GameClock.schedule(self._deadline_due, ticks)
+
+    async def _deadline_due(self) -> None:
+        """Ends the phase at its deadline, or checks again if the tick came early."""
+        self._timer = None
+        self._check_phase()
+        if not self._phase_over.is_set():
+            self._schedule_deadline()
+
+    def _check_phase(self) -> None:
+        """Ends the current phase if it has timed out or its stop condition is met."""
+        if self._phase is None:
+            return
+        if self._phase.time_remaining() > 0 and not self._phase.should_stop():
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._phase_over.set()
+
+    async def _update(self, priority: EventPriority = EventPriority.NORMAL) -> None:
+        """Sends the state of the show to its room.
+
+        Args:
+            priority (EventPriority, optional): The priority of the update.
+                Defaults to NORMAL.
+        """
+        await EventQueue.put(ServerEvent.SHOW_UPDATE, self.state(), self._id, priority)
+
+    async def _send_results(self) -> None:
+        """Sends each connected player their result for the round that ended."""
+        results = [
+            ShowResultData(sid, *self._answers.get(sid, (-1, 0)), p.score, self._rank_of(p.score))
+            for sid, p in self._players.items() if sid not in self._detached
+        ]
+        data = ShowResultsData(
+            id=self._id,
+            correct_answer=self._current_question.correct_index,
+            num_players=len(self._players),
+            results=results,
+        )
+        await EventQueue.put(ServerEvent.SHOW_RESULT, data, self._id, EventPriority.HIGH)
+
+    def _load_questions(self) -> None:
+        """Loads the questions of the show."""
+        self._question_provider.load_questions(self._category, self._num_questions)
+        self._next_question()
+
+    def _next_question(self) -> None:
+        """Gets the next question."""
+        self._current_question = next(self._questions, None)
+
+    def _round_reset(self) -> None:
+        """Clears the answers of the last round."""
+        self._answers = {}
+        self._distribution = [0] * NUM_OPTIONS
+
+    def _all_answered(self) -> bool:
+        """Checks if every player has answered the current question.
+
+        Returns:
+            bool: True if every player has answered, False otherwise. An empty
+                show waits out the question, for players who join late.
+        """
+        return bool(self._players) and len(self._answers) >= len(self._players)
+
+    def _rank(self) -> None:
+        """Ranks the players by score, and adjusts the difficulty to how many were right."""
+        self._scores = sorted(p.score for p in self._players.values())
+        top = heapq.nlargest(self.LEADERBOARD_SIZE, self._players.values(),
+                             key=attrgetter("score"))
+        self._leaderboard = [{"name": p.name, "score": p.score} for p in top]
+        if self._answers:
+            correct = self._distribution[self._current_question.correct_index]
+            ratio = correct / len(self._players)
+            if ratio > self.HARDER_ABOVE:
+                self._question_provider.increase_difficulty()
+            elif ratio < self.EASIER_BELOW:
+                self._question_provider.decrease_difficulty()
+
+    def _rank_of(self, score: int) -> int:
+        """Gets the rank of a score among the scores ranked at the end of the round.
+
+        Args:
+            score (int): The score.
+
+        Returns:
+            int: The rank, starting at 1. Tied scores share a rank.
+        """
+        return len(self._scores) - bisect.bisect_right(self._scores, score) + 1
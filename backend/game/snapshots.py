@@ -0,0 +1,107 @@
+"""Snapshots of running games, to resume them after a restart."""
+
+import asyncio
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+from game.game import Game
+from log.log import get_logger
+
+log = get_logger(__name__)
+
+
+class SnapshotStore:
+    """A SQLite store of game snapshots, written in WAL mode.
+
+    Tracked games are snapshotted together once per interval, and the batch is
+    encoded and written in one transaction on a worker thread. Set SNAPSHOT_PATH
+    to enable it.
+    """
+
+    PATH = os.getenv("SNAPSHOT_PATH", "")
+    INTERVAL_SECONDS = 2
+    _games: dict[str, Game] = {}
+    _forgotten: set[str] = set()
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """Checks if snapshots are enabled.
+
+        Returns:
+            bool: True if snapshots are enabled, False otherwise.
+        """
+        return bool(SnapshotStore.PATH)
+
+    @staticmethod
+    def track(game: Game) -> None:
+        """Starts snapshotting a game.
+
+        Args:
+            game (Game): The game.
+        """
+        SnapshotStore._games[game.id] = game
+        SnapshotStore._forgotten.discard(game.id)
+
+    @staticmethod
+    def forget(game_id: str) -> None:
+        """Stops snapshotting a game, and deletes its snapshot.
+
+        Args:
+            game_id (str): The id of the game.
+        """
+        if SnapshotStore._games.pop(game_id, None) is not None:
+            SnapshotStore._forgotten.add(game_id)
+
+    @staticmethod
+    def load() -> list[dict]:
+        """Loads the latest snapshot of every game. Blocks, so call it before serving.
+
+        Returns:
+            list[dict]: The snapshots.
+        """
+        with closing(SnapshotStore._connect()) as conn:
+            rows = conn.execute("SELECT state FROM snapshots").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    @staticmethod
+    async def run() -> None:
+        """Writes snapshots of the tracked games once per interval, forever."""
+        while True:
+            await asyncio.sleep(SnapshotStore.INTERVAL_SECONDS)
+            states = [(game_id, game.snapshot()) for game_id, game in SnapshotStore._games.items()]
+            forgotten, SnapshotStore._forgotten = SnapshotStore._forgotten, set()
+            try:
+                await asyncio.to_thread(SnapshotStore._write, states, forgotten)
+            except sqlite3.Error as e:
+                log.error("failed to write snapshots: %s", e)
+
+    @staticmethod
+    def _connect() -> sqlite3.Connection:
+        """Opens the store, creating its table if needed.
+
+        Returns:
+            sqlite3.Connection: The connection to the store.
+        """
+        conn = sqlite3.connect(SnapshotStore.PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots "
+            "(game_id TEXT PRIMARY KEY, state TEXT NOT NULL)")
+        return conn
+
+    @staticmethod
+    def _write(states: list[tuple[str, dict]], forgotten: set[str]) -> None:
+        """Encodes and writes snapshots, and deletes the snapshots of forgotten games.
+
+        Args:
+            states (list[tuple[str, dict]]): The id and state of each game.
+            forgotten (set[str]): The ids of the games to delete.
+        """
+        rows = [(game_id, json.dumps(state)) for game_id, state in states]
+        with closing(SnapshotStore._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?)", rows)
+            conn.executemany(
+                "DELETE FROM snapshots WHERE game_id = ?", [(g,) for g in forgotten])
@@ -0,0 +1,184 @@
+"""
+This module contains the FriendCache class, which caches "Call a Friend" answers.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+from gemini.gemini import Gemini
+from log.log import get_logger
+from questions.models import Question
+
+log = get_logger(__name__)
+
+
+class FriendCache:
+    """
+    A cache of "Call a Friend" answers, keyed by question text and options.
+
+    Answers are kept in memory with LRU and TTL eviction, and optionally in a
+    SQLite database (FRIEND_CACHE_PATH) that survives restarts. Concurrent
+    requests for the same question share one Gemini query.
+    """
+
+    MAX_ENTRIES = 2048
+    TTL_SECONDS = 7 * 24 * 60 * 60
+    DB_PATH = os.getenv("FRIEND_CACHE_PATH", "")
+    _entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+    _pending: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    async def get(question: Question, timeout: float | None = None) -> str | None:
+        """Gets the friend's answer to a question, querying Gemini on a miss.
+
+        Args:
+            question (Question): The question to answer.
+            timeout (float | None, optional): The seconds the caller can wait.
+                A query outlives a caller that stops waiting, so that the answer
+                is still cached. Defaults to Gemini.REQUEST_TIMEOUT_SECONDS.
+
+        Returns:
+            str | None: The friend's answer, or None if there was none in time.
+        """
+        key = FriendCache.key(question)
+        answer = FriendCache._get_memory(key)
+        if answer is not None:
+            return answer
+
+        task = FriendCache._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(FriendCache._load(key, question))
+            FriendCache._pending[key] = task
+            task.add_done_callback(lambda _: FriendCache._pending.pop(key, None))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except TimeoutError:
+            return None
+
+    @staticmethod
+    def key(question: Question) -> str:
+        """Gets the cache key of a question.
+
+        Args:
+            question (Question): The question.
+
+        Returns:
+            str: The cache key.
+        """
+        text = "\x1f".join([question.text, *question.options])
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @staticmethod
+    def clear() -> None:
+        """Clears the in-memory cache."""
+        FriendCache._entries.clear()
+
+    @staticmethod
+    async def _load(key: str, question: Question) -> str | None:
+        """Loads an answer from the disk cache, or from Gemini, and caches it.
+
+        Args:
+            key (str): The cache key of the question.
+            question (Question): The question to answer.
+
+        Returns:
+            str | None: The friend's answer, or None if Gemini did not answer.
+        """
+        answer = None
+        if FriendCache.DB_PATH:
+            answer = await asyncio.to_thread(FriendCache._get_disk, key)
+        if answer is None:
+            prompt = Gemini.call_friend_prompt(question.text, question.options)
+            answer = await Gemini.query_async(prompt)
+            if answer is None:
+                return None
+            if FriendCache.DB_PATH:
+                await asyncio.to_thread(FriendCache._put_disk, key, answer)
+        FriendCache._put_memory(key, answer)
+        return answer
+
+    @staticmethod
+    def _get_memory(key: str) -> str | None:
+        """Gets an unexpired answer from memory.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str | None: The answer, or None on a miss.
+        """
+        entry = FriendCache._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, answer = entry
+        if expires_at < time.monotonic():
+            del FriendCache._entries[key]
+            return None
+        FriendCache._entries.move_to_end(key)
+        return answer
+
+    @staticmethod
+    def _put_memory(key: str, answer: str) -> None:
+        """Stores an answer in memory, evicting the least recently used one if full.
+
+        Args:
+            key (str): The cache key.
+            answer (str): The answer.
+        """
+        FriendCache._entries[key] = (time.monotonic() + FriendCache.TTL_SECONDS, answer)
+        FriendCache._entries.move_to_end(key)
+        if len(FriendCache._entries) > FriendCache.MAX_ENTRIES:
+            FriendCache._entries.popitem(last=False)
+
+    @staticmethod
+    def _connect() -> sqlite3.Connection:
+        """Opens the disk cache, creating its table if needed.
+
+        Returns:
+            sqlite3.Connection: The connection to the disk cache.
+        """
+        conn = sqlite3.connect(FriendCache.DB_PATH)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS friend_answers "
+            "(key TEXT PRIMARY KEY, answer TEXT NOT NULL, created_at REAL NOT NULL)")
+        return conn
+
+    @staticmethod
+    def _get_disk(key: str) -> str | None:
+        """Gets an unexpired answer from the disk cache.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str | None: The answer, or None on a miss.
+        """
+        try:
+            with FriendCache._connect() as conn:
+                row = conn.execute(
+                    "SELECT answer FROM friend_answers WHERE key = ? AND created_at > ?",
+                    (key, time.time() - FriendCache.TTL_SECONDS)).fetchone()
+        except sqlite3.Error as e:
+            log.warning("disk cache read failed: %s", e)
+            return None
+        return row[0] if row else None
+
+    @staticmethod
+    def _put_disk(key: str, answer: str) -> None:
+        """Stores an answer in the disk cache.
+
+        Args:
+            key (str): The cache key.
+            answer (str): The answer.
+        """
+        try:
+            with FriendCache._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO friend_answers VALUES (?, ?, ?)",
+                    (key, answer, time.time()))
+        except sqlite3.Error as e:
+            log.warning("disk cache write failed: %s", e)
@@ -4,12 +4,17 @@ This module contains the Gemini class, which is used to query the Gemini API.
 
 import asyncio
 import os
+import random
 import time
-from pathlib import Path
-from string import Template
 
+import httpx
+from gemini.prompts import PromptRegistry
 from google import genai
+from google.genai import types
 from google.genai.errors import ClientError, ServerError
+from log.log import get_logger
+
+log = get_logger(__name__)
 
 
 class Gemini:
@@ -17,58 +22,83 @@ class Gemini:
     A class for querying the Gemini API.
     """
 
-    CLIENT = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    REQUEST_TIMEOUT_SECONDS = 20
+    CLIENT = genai.Client(
+        api_key=os.getenv("GEMINI_API_KEY"),
+        http_options=types.HttpOptions(timeout=REQUEST_TIMEOUT_SECONDS * 1000))
     MODEL = "gemini-2.5-flash-preview-04-17"
-    CALL_FRIEND_TPL_PATH = Path(__file__).parent / "call_friend.txt"
+    MAX_CONCURRENT_QUERIES = 16
+    MAX_RETRIES = 8
+    BASE_BACKOFF_SECONDS = 0.5
+    MAX_BACKOFF_SECONDS = 8
+    _SEMAPHORE: asyncio.Semaphore | None = None
 
     @staticmethod
-    def query(prompt: str) -> str:
-        """Query the Gemini API with a prompt.
+    async def query_async(prompt: str, timeout: float | None = None) -> str | None:
+        """Queries the Gemini API with a prompt.
+
+        Requests use the SDK's async client and its pooled connections, and at
+        most MAX_CONCURRENT_QUERIES run at once. Failed requests are retried with
+        jittered exponential backoff until the timeout expires.
 
         Args:
             prompt (str): The prompt to query the Gemini API with.
+            timeout (float | None, optional): The seconds until the answer is no
+                longer useful. Defaults to REQUEST_TIMEOUT_SECONDS.
 
         Returns:
-            str: The response from the Gemini API.
+            str | None: The response from the Gemini API, or None if there was no
+                response before the timeout.
         """
-        retries = 30
-        for i in range(retries):
+        timeout = Gemini.REQUEST_TIMEOUT_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        try:
+            async with asyncio.timeout(timeout):
+                async with Gemini._semaphore():
+                    return await Gemini._query_with_retries(prompt, deadline)
+        except TimeoutError:
+            log.warning("query timed out after %.1f seconds", timeout)
+            return None
+
+    @staticmethod
+    async def _query_with_retries(prompt: str, deadline: float) -> str | None:
+        """Queries the Gemini API, retrying failed requests until the deadline.
+
+        Args:
+            prompt (str): The prompt to query the Gemini API with.
+            deadline (float): The monotonic time after which no retry is started.
+
+        Returns:
+            str | None: The response from the Gemini API, or None if every retry failed.
+        """
+        for attempt in range(Gemini.MAX_RETRIES):
             try:
-                response = Gemini.CLIENT.models.generate_content(
+                response = await Gemini.CLIENT.aio.models.generate_content(
                     model=Gemini.MODEL,
                     contents=[prompt],
                     config={"response_mime_type": "text/plain"}
                 )
-                break
-            except ServerError as e:
-                msg = f"Server error: {str(e)}"
-                remaining = retries - i - 1
-                if remaining > 0:
-                    msg += f" {remaining} retries left."
-                print(msg)
-            except ClientError as e:
-                msg = f"Client error: {str(e)}"
-                remaining = retries - i - 1
-                if remaining > 0:
-                    msg += f" {remaining} retries left."
-                print(msg)
-                print("Waiting 60 seconds before retrying...")
-                time.sleep(60)
-        return response.text
+                return response.text
+            except (ClientError, ServerError, httpx.HTTPError) as e:
+                delay = random.uniform(0, min(
+                    Gemini.MAX_BACKOFF_SECONDS, Gemini.BASE_BACKOFF_SECONDS * 2 ** attempt))
+                if time.monotonic() + delay >= deadline:
+                    log.warning("error: %s, no time left to retry", e)
+                    return None
+                log.warning("error: %s, retrying in %.1f seconds", e, delay)
+                await asyncio.sleep(delay)
+        return None
 
     @staticmethod
-    async def query_async(prompt: str) -> str:
-        """Queries the Gemini API with a prompt in a background task.
-
-        Args:
-            prompt (str): The prompt to query the Gemini API with.
+    def _semaphore() -> asyncio.Semaphore:
+        """Gets the semaphore that bounds concurrent queries.
 
         Returns:
-            str: The response from the Gemini API.
+            asyncio.Semaphore: The semaphore.
         """
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, Gemini.query, prompt)
-        return response
+        if Gemini._SEMAPHORE is None:
+            Gemini._SEMAPHORE = asyncio.Semaphore(Gemini.MAX_CONCURRENT_QUERIES)
+        return Gemini._SEMAPHORE
 
     @staticmethod
     def call_friend_prompt(question: str, options: list[str]) -> str:
@@ -81,5 +111,6 @@ class Gemini:
         Returns:
             str: The prompt for calling a friend for help.
         """
-        tpl = Template(Gemini.CALL_FRIEND_TPL_PATH.read_text())
-        return tpl.substitute(question=question, options=options)
+        return PromptRegistry.render(
+            "call_friend", question=question,
+            options=PromptRegistry.format_options(options))
@@ -0,0 +1,128 @@
+"""
+Precomputes "Call a Friend" hints for every question in the question bank.
+
+Hints are stored in the friend_hint column of questions.db, next to their
+question, and the game serves them without querying Gemini. Hints are saved
+in batches, and questions that already have a hint are skipped, so an
+interrupted run resumes where it stopped. Run from the backend directory:
+
+    python -m gemini.precompute --parallel 8
+
+Use --stub to fill the hints from a local stub model instead of Gemini. Its
+made-up hints would be served as real ones, so it needs --db, which copies the
+question bank to another file on first use and writes there:
+
+    python -m gemini.precompute --stub --db /tmp/questions-stub.db
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from gemini.gemini import Gemini
+from gemini.prompts import PromptRegistry
+from log.log import get_logger, setup_logging
+from questions.db import QuestionDB
+from questions.models import Question
+
+log = get_logger(__name__)
+
+Model = Callable[[Question], Awaitable[str | None]]
+
+
+async def gemini_model(question: Question) -> str | None:
+    """Asks Gemini for a friend hint.
+
+    Args:
+        question (Question): The question.
+
+    Returns:
+        str | None: The hint, or None if Gemini did not answer.
+    """
+    prompt = Gemini.call_friend_prompt(question.text, question.options)
+    return await Gemini.query_async(prompt)
+
+
+async def stub_model(question: Question) -> str | None:
+    """Makes up a friend hint without calling Gemini.
+
+    Args:
+        question (Question): The question.
+
+    Returns:
+        str | None: The hint.
+    """
+    option = random.Random(question.text).choice(question.options)
+    return f"I'm pretty sure it's {option}, but don't quote me on that!"
+
+
+async def precompute(model: Model, parallel: int, batch_size: int, limit: int | None) -> int:
+    """Generates and stores the missing friend hints.
+
+    Args:
+        model (Model): The model that generates a hint for a question.
+        parallel (int): The maximum number of concurrent model calls.
+        batch_size (int): The number of hints stored per checkpoint.
+        limit (int | None): The maximum number of questions to process.
+
+    Returns:
+        int: The number of hints stored.
+    """
+    rows = QuestionDB.get_questions_without_hint()[:limit]
+    log.info("%d questions without a friend hint", len(rows))
+    semaphore = asyncio.Semaphore(parallel)
+    batch: list[tuple[int, str]] = []
+    stored = 0
+
+    async def generate(question_id: int, question: Question) -> tuple[int, str | None]:
+        async with semaphore:
+            return question_id, await model(question)
+
+    tasks = [asyncio.create_task(generate(i, q)) for i, q in rows]
+    for task in asyncio.as_completed(tasks):
+        question_id, hint = await task
+        if hint is None:
+            log.warning("no hint for question %d", question_id)
+            continue
+        batch.append((question_id, hint))
+        if len(batch) >= batch_size:
+            stored += len(batch)
+            await asyncio.to_thread(QuestionDB.save_friend_hints, batch)
+            log.info("checkpoint: %d/%d hints stored", stored, len(rows))
+            batch = []
+    if batch:
+        stored += len(batch)
+        await asyncio.to_thread(QuestionDB.save_friend_hints, batch)
+    log.info("done: %d/%d hints stored", stored, len(rows))
+    return stored
+
+
+def main() -> None:
+    """Parses the command line and precomputes the friend hints."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--parallel", type=int, default=8, help="concurrent model calls")
+    parser.add_argument("--batch-size", type=int, default=25, help="hints stored per checkpoint")
+    parser.add_argument("--limit", type=int, default=None, help="questions to process")
+    parser.add_argument("--stub", action="store_true", help="use a local stub model")
+    parser.add_argument("--db", type=Path, default=None,
+                        help="write to this copy of the question bank instead")
+    args = parser.parse_args()
+    db = args.db or QuestionDB.DB_PATH
+    if args.stub and db.resolve() == QuestionDB.DEFAULT_PATH.resolve():
+        parser.error("--stub must not write to the question bank, pass --db with another path")
+
+    setup_logging()
+    if not db.exists():
+        shutil.copyfile(QuestionDB.DEFAULT_PATH, db)
+    QuestionDB.DB_PATH = db
+    PromptRegistry.load()
+    Gemini.MAX_CONCURRENT_QUERIES = args.parallel
+    model = stub_model if args.stub else gemini_model
+    asyncio.run(precompute(model, args.parallel, args.batch_size, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+This module contains the PromptRegistry class, which holds the AI prompt templates.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from string import Template
+
+from log.log import get_logger
+
+log = get_logger(__name__)
+
+
+@dataclass
+class Prompt:
+    """A compiled prompt template and the modification time of its file."""
+    template: Template
+    mtime: float
+
+
+class PromptRegistry:
+    """
+    A registry of prompt templates, compiled once and reloaded when their files change.
+
+    Every <name>.txt file in TEMPLATES_DIR is a string.Template registered as
+    <name>, so an AI-backed power-up only needs a template file and a call to
+    render().
+    """
+
+    TEMPLATES_DIR = Path(__file__).parent
+    RELOAD_INTERVAL_SECONDS = 2
+    _prompts: dict[str, Prompt] = {}
+
+    @staticmethod
+    def load() -> None:
+        """Loads and compiles every template. Blocks, so call it before serving."""
+        PromptRegistry._prompts.update(PromptRegistry._read_changed())
+
+    @staticmethod
+    async def watch() -> None:
+        """Reloads templates whose files changed, reading them in a worker thread."""
+        while True:
+            await asyncio.sleep(PromptRegistry.RELOAD_INTERVAL_SECONDS)
+            changed = await asyncio.to_thread(PromptRegistry._read_changed)
+            for name in changed:
+                log.info("reloaded prompt %s", name)
+            PromptRegistry._prompts.update(changed)
+
+    @staticmethod
+    def render(name: str, /, **fields: str) -> str:
+        """Renders a prompt.
+
+        Args:
+            name (str): The name of the template.
+            **fields (str): The values of the template's placeholders.
+
+        Returns:
+            str: The prompt.
+        """
+        return PromptRegistry._prompts[name].template.substitute(fields)
+
+    @staticmethod
+    def format_options(options: list[str]) -> str:
+        """Formats answer options for a prompt, one numbered option per line.
+
+        Args:
+            options (list[str]): The options.
+
+        Returns:
+            str: The formatted options.
+        """
+        return "\n".join(f"{i}. {option}" for i, option in enumerate(options, 1))
+
+    @staticmethod
+    def _read_changed() -> dict[str, Prompt]:
+        """Reads and compiles the templates that are new or changed on disk.
+
+        Returns:
+            dict[str, Prompt]: The changed prompts, keyed by name.
+        """
+        changed = {}
+        for path in PromptRegistry.TEMPLATES_DIR.glob("*.txt"):
+            try:
+                mtime = path.stat().st_mtime
+                prompt = PromptRegistry._prompts.get(path.stem)
+                if prompt is None or prompt.mtime != mtime:
+                    changed[path.stem] = Prompt(Template(path.read_text()), mtime)
+            except OSError as e:
+                log.warning("failed to read prompt %s: %s", path, e)
+        return changed
@@ -1,73 +1,249 @@
 """Lobby management service."""
 
-import asyncio
+import math
+import time
+from collections import OrderedDict
 
-from events.data import LobbyUpdateData
-from events.events import EventQueue, ServerEvent
-from player.player import Player
+from clock.clock import GameClock, Timer
+from events.data import LobbyDeltaData, LobbyUpdateData, MatchData
+from events.events import EventPriority, EventQueue, ServerEvent
+from player.player import BotLevel, Player
+
+
+class LobbyQueue:
+    """Players waiting for a game at one skill level, in order of arrival."""
+
+    def __init__(self, level: BotLevel, room: str):
+        self.level = level
+        self.room = room
+        self.players: OrderedDict[str, Player] = OrderedDict()
+        self.started_at = 0.0
+        self.deadline = 0.0
+        self.timer: Timer | None = None
+        self.joined: set[str] = set()
+        self.left: set[str] = set()
+        self.flush_timer: Timer | None = None
 
 
 class Lobby:
-    """Manages the game lobby."""
+    """Matches waiting players into games, with one queue per skill level.
+
+    A game starts as soon as a queue holds a full table. Otherwise the queue
+    counts down, and the more players are waiting the shorter the countdown.
+    When it runs out, the table is filled from the neighbouring levels before
+    the game starts with whoever is there.
+
+    Clients count down locally to the deadline they are sent. A player who
+    joins gets the queue's full state once. After that, membership and
+    deadline changes go out as deltas, at most one per queue per flush
+    interval.
+    """
 
     ROOM = 'lobby'
     TIMEOUT_SECONDS = 30
+    MAX_GAME_SIZE = 4
+    FLUSH_TICKS = 1
 
     def __init__(self):
-        self._players: dict[str, Player] = {}
-        self._time_remaining = self.TIMEOUT_SECONDS
-        self._is_timer_active = False
+        self._queues = {
+            level: LobbyQueue(level, Lobby.room_of(level)) for level in BotLevel
+        }
+        self._queue_of: dict[str, LobbyQueue] = {}
+
+    @staticmethod
+    def room_of(level: BotLevel) -> str:
+        """Gets the room of the players waiting at a skill level.
+
+        Args:
+            level (BotLevel): The skill level.
+
+        Returns:
+            str: The room of the level's queue.
+        """
+        return f"{Lobby.ROOM}:{level.value}"
+
+    @staticmethod
+    def is_room(room: str) -> bool:
+        """Checks if a room is one of the lobby's queues.
+
+        Args:
+            room (str): The room to check.
+
+        Returns:
+            bool: True if the room is a lobby queue, False otherwise.
+        """
+        return room.startswith(f"{Lobby.ROOM}:")
 
     async def add_player(self, player: Player) -> None:
-        """Adds a player to the lobby.
+        """Adds a player to the queue of their skill level.
 
         Args:
-            sid (str): The sid of the player to add.
+            player (Player): The player to add.
         """
-        self._players[player.sid] = player
-        if not self._is_timer_active:
-            asyncio.create_task(self._start_timer())
+        self.remove_player(player.sid)
+        queue = self._queues[player.level]
+        queue.players[player.sid] = player
+        self._queue_of[player.sid] = queue
+        if len(queue.players) >= self.MAX_GAME_SIZE:
+            await self._start_game(queue)
+            return
 
-    def remove_player(self, player: Player) -> None:
+        if queue.timer is None:
+            queue.started_at = time.time()
+        self._reset_deadline(queue)
+        self._record(queue, joined=(player.sid,))
+        data = LobbyUpdateData(
+            players=list(queue.players.keys()),
+            deadline=queue.deadline,
+            server_time=time.time(),
+            room=queue.room,
+            destination_id=player.sid,
+        )
+        await EventQueue.put(ServerEvent.LOBBY_UPDATE, data, self.ROOM)
+
+    def remove_player(self, sid: str) -> None:
         """Removes a player from the lobby.
 
         Args:
             sid (str): The sid of the player to remove.
         """
-        self._players.pop(player.sid)
-        if not self._players.values():
-            self._is_timer_active = False
+        queue = self._queue_of.pop(sid, None)
+        if queue is None:
+            return
+        queue.players.pop(sid, None)
+        self._reset_deadline(queue)
+        self._record(queue, left=(sid,))
 
-    def get_players(self) -> dict[str, Player]:
-        """Gets the players in the lobby.
+    def num_waiting(self) -> int:
+        """Gets the number of players waiting in the lobby.
 
         Returns:
-            dict[str, Player]: The players in the lobby.
+            int: The number of waiting players.
         """
-        return self._players.copy()
-
-    def clear(self) -> None:
-        """Clears the lobby."""
-        self._is_timer_active = False
-        self._players.clear()
-
-    async def _start_timer(self) -> None:
-        """Starts the timer."""
-        self._time_remaining = self.TIMEOUT_SECONDS
-        self._is_timer_active = True
-        while self._is_timer_active:
-            await self._tick()
-            await asyncio.sleep(1)
-            self._time_remaining -= 1
-
-    async def _tick(self) -> None:
-        """Called when the timer ticks."""
-        should_start_game = self._time_remaining <= 0 < len(self._players)
-        data = LobbyUpdateData(
-            players=list(self._players.keys()),
-            time_remaining=self._time_remaining,
-            should_start_game=should_start_game,
+        return len(self._queue_of)
+
+    def _reset_deadline(self, queue: LobbyQueue) -> None:
+        """Sets a queue's deadline from its depth, and schedules the game start for it.
+
+        Args:
+            queue (LobbyQueue): The queue.
+        """
+        self._stop_timer(queue)
+        if not queue.players:
+            return
+        missing = max(self.MAX_GAME_SIZE - len(queue.players), 1)
+        wait = self.TIMEOUT_SECONDS * missing / (self.MAX_GAME_SIZE - 1)
+        queue.deadline = queue.started_at + wait
+        ticks = math.ceil(max(queue.deadline - time.time(), 0) / GameClock.TICK_SECONDS)
+        queue.timer = GameClock.schedule(lambda: self._on_deadline(queue), ticks)
+
+    def _stop_timer(self, queue: LobbyQueue) -> None:
+        """Stops a queue's countdown.
+
+        Args:
+            queue (LobbyQueue): The queue.
+        """
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+
+    async def _on_deadline(self, queue: LobbyQueue) -> None:
+        """Called by the game clock when a queue's countdown is over.
+
+        Args:
+            queue (LobbyQueue): The queue.
+        """
+        queue.timer = None
+        if queue.players:
+            await self._start_game(queue)
+
+    async def _start_game(self, queue: LobbyQueue) -> None:
+        """Starts a game with the players who waited longest in a queue.
+
+        Args:
+            queue (LobbyQueue): The queue.
+        """
+        queue.started_at = time.time()
+        players = self._take(queue, self.MAX_GAME_SIZE)
+        if len(players) < self.MAX_GAME_SIZE:
+            for level in self._neighbours(queue.level):
+                players += self._take(self._queues[level], self.MAX_GAME_SIZE - len(players))
+        await EventQueue.put(
+            ServerEvent.NEW_GAME, MatchData(players), self.ROOM, EventPriority.HIGH)
+
+    def _take(self, queue: LobbyQueue, count: int) -> list[Player]:
+        """Removes the players who waited longest from a queue.
+
+        Args:
+            queue (LobbyQueue): The queue.
+            count (int): The maximum number of players to remove.
+
+        Returns:
+            list[Player]: The removed players.
+        """
+        players = []
+        while queue.players and len(players) < count:
+            _, player = queue.players.popitem(last=False)
+            del self._queue_of[player.sid]
+            players.append(player)
+        if players:
+            self._reset_deadline(queue)
+            self._record(queue, left=tuple(p.sid for p in players))
+        return players
+
+    def _record(self, queue: LobbyQueue, joined: tuple[str, ...] = (),
+                left: tuple[str, ...] = ()) -> None:
+        """Records membership changes of a queue, to be sent on its next flush.
+
+        Args:
+            queue (LobbyQueue): The queue.
+            joined (tuple[str, ...], optional): The sids of the players who joined.
+            left (tuple[str, ...], optional): The sids of the players who left.
+        """
+        for sid in joined:
+            if sid in queue.left:
+                queue.left.discard(sid)
+            else:
+                queue.joined.add(sid)
+        for sid in left:
+            if sid in queue.joined:
+                queue.joined.discard(sid)
+            else:
+                queue.left.add(sid)
+        if queue.flush_timer is None:
+            queue.flush_timer = GameClock.schedule(
+                lambda: self._flush(queue), self.FLUSH_TICKS)
+
+    async def _flush(self, queue: LobbyQueue) -> None:
+        """Sends the membership changes of a queue since its last flush.
+
+        Args:
+            queue (LobbyQueue): The queue.
+        """
+        queue.flush_timer = None
+        if not queue.players:
+            queue.joined, queue.left = set(), set()
+            return
+        data = LobbyDeltaData(
+            joined=list(queue.joined),
+            left=list(queue.left),
+            deadline=queue.deadline,
+            server_time=time.time(),
+            room=queue.room,
         )
-        await EventQueue.put(ServerEvent.LOBBY_UPDATE, data)
-        if should_start_game:
-            self._is_timer_active = False
+        queue.joined, queue.left = set(), set()
+        await EventQueue.put(ServerEvent.LOBBY_DELTA, data, self.ROOM)
+
+    @staticmethod
+    def _neighbours(level: BotLevel) -> list[BotLevel]:
+        """Gets the skill levels next to a level.
+
+        Args:
+            level (BotLevel): The skill level.
+
+        Returns:
+            list[BotLevel]: The adjacent levels.
+        """
+        levels = list(BotLevel)
+        i = levels.index(level)
+        return [levels[j] for j in (i - 1, i + 1) if 0 <= j < len(levels)]
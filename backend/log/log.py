@@ -0,0 +1,83 @@
+"""Structured, leveled logging with a background writer."""
+
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+
+_RECORD_ATTRS = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line, including any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({k: v for k, v in record.__dict__.items()
+                      if k not in _RECORD_ATTRS})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Keeps a random fraction of records below WARNING."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self._rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self._rate
+
+
+def setup_logging() -> None:
+    """Routes every log record through a queue to a writer thread.
+
+    Call once per process. Handlers inherited from a parent process are replaced.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    records = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s %(message)s"))
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(records)]
+    root.setLevel(LOG_LEVEL)
+    _listener = QueueListener(records, stream)
+    _listener.start()
+
+
+def get_logger(name: str, sampled: bool = False) -> logging.Logger:
+    """Gets a logger.
+
+    Args:
+        name (str): The name of the logger, usually the module's __name__.
+        sampled (bool, optional): Whether the logger is on a hot path, and keeps
+            only LOG_SAMPLE_RATE of its records below WARNING. Defaults to False.
+
+    Returns:
+        logging.Logger: The logger.
+    """
+    logger = logging.getLogger(name)
+    if sampled and LOG_SAMPLE_RATE < 1 and not logger.filters:
+        logger.addFilter(SampleFilter(LOG_SAMPLE_RATE))
+    return logger
@@ -1,52 +1,134 @@
 """Main entry point for the backend application."""
 
+import asyncio
+import multiprocessing
+import os
+import socket
+import time
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 import socketio
 import uvicorn
+from api.admin import AdminRoutes
+from api.serializer import get_serializer
 from api.socket import SocketHandlers
 from app.manager import AppManager
+from cluster.bus import BusHub, UnixSocketBus
+from cluster.manager import BusClientManager
+from cluster.router import WorkerRouter
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from game.snapshots import SnapshotStore
+from gemini.prompts import PromptRegistry
+from log.log import setup_logging
+from questions.bank import QuestionBank
 
 load_dotenv()
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
-manager = AppManager()
+HOST = "0.0.0.0"
+PORT = 8000
+WORKERS = int(os.getenv("WORKERS", "1"))
+BUS_PATH = os.getenv("BUS_PATH", "/tmp/trivia-bus.sock")
+SERIALIZER = os.getenv("SERIALIZER", "fast")
 
 
-@asynccontextmanager
-async def lifespan(_: FastAPI):
-    """Initialize the app manager when the application starts.
+def create_app(router: WorkerRouter) -> FastAPI:
+    """Create and configure the FastAPI application.
 
     Args:
-        _ (FastAPI): The FastAPI application.
-    """
-    manager.sio = sio
-    SocketHandlers.setup(sio, manager)
-    await manager.run()
-    yield
-
-
-def create_app() -> FastAPI:
-    """Create and configure the FastAPI application.
+        router (WorkerRouter): The router of the worker serving the application.
 
     Returns:
         FastAPI: The FastAPI application.
     """
+    client_manager = None
+    if router.bus is not None:
+        client_manager = BusClientManager(router.bus)
+    sio = socketio.AsyncServer(
+        async_mode="asgi", cors_allowed_origins="*",
+        client_manager=client_manager, json=get_serializer(SERIALIZER))
+    manager = AppManager(router)
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI):
+        """Initialize the app manager when the application starts.
+
+        Args:
+            _ (FastAPI): The FastAPI application.
+        """
+        QuestionBank.load()
+        PromptRegistry.load()
+        manager.sio = sio
+        SocketHandlers.setup(sio, manager)
+        await manager.run()
+        yield
+
     app = FastAPI(
         title="Trivia Game Backend",
         description="Backend API for the trivia game application",
         version="1.0.0",
         lifespan=lifespan
     )
+    app.state.sio = sio
+    AdminRoutes.setup(app, manager)
     return app
 
 
+def run_worker(worker_id: int, sock: socket.socket) -> None:
+    """Runs one worker process of a multi-worker deployment.
+
+    Args:
+        worker_id (int): The id of the worker.
+        sock (socket.socket): The listening socket shared by all workers.
+    """
+    setup_logging()
+    if SnapshotStore.is_enabled():
+        SnapshotStore.PATH = f"{SnapshotStore.PATH}.{worker_id}"
+    router = WorkerRouter(worker_id, WORKERS, UnixSocketBus(BUS_PATH))
+    app = create_app(router)
+    sio_app = socketio.ASGIApp(app.state.sio, other_asgi_app=app)
+    server = uvicorn.Server(uvicorn.Config(sio_app))
+    server.run(sockets=[sock])
+
+
+def run_bus_hub() -> None:
+    """Runs the message bus hub that connects the workers."""
+    setup_logging()
+    asyncio.run(BusHub(BUS_PATH).serve_forever())
+
+
 def main():
-    """Main entry point for the backend application."""
-    app = create_app()
-    sio_app = socketio.ASGIApp(sio, other_asgi_app=app)
-    uvicorn.run(sio_app, host="0.0.0.0", port=8000)
+    """Main entry point for the backend application.
+
+    Set WORKERS to run several worker processes that share the port. Games are
+    sharded across workers, and Socket.IO rooms are shared over a Unix socket bus.
+    Clients must use the websocket transport in this mode.
+    """
+    setup_logging()
+    if WORKERS <= 1:
+        app = create_app(WorkerRouter())
+        sio_app = socketio.ASGIApp(app.state.sio, other_asgi_app=app)
+        uvicorn.run(sio_app, host=HOST, port=PORT)
+        return
+
+    Path(BUS_PATH).unlink(missing_ok=True)
+    hub = multiprocessing.Process(target=run_bus_hub, daemon=True)
+    hub.start()
+    while not Path(BUS_PATH).exists():
+        time.sleep(0.05)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, PORT))
+    sock.set_inheritable(True)
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(i, sock))
+        for i in range(WORKERS)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
 
 
 if __name__ == "__main__":
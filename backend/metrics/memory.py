@@ -0,0 +1,121 @@
+"""On-demand memory profiling."""
+
+import asyncio
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from enum import Enum
+from types import FunctionType, MethodType, ModuleType
+
+
+@dataclass
+class Allocator:
+    """A source line and the memory allocated by it."""
+    location: str
+    size_bytes: int
+    count: int
+
+
+class MemoryProfiler:
+    """Measures the memory of the process on demand.
+
+    Tracing with tracemalloc slows down every allocation, so it is off until
+    the first request for top allocators and can be stopped again.
+    """
+
+    TRACE_FRAMES = 1
+
+    @staticmethod
+    def is_tracing() -> bool:
+        """Checks if allocations are being traced.
+
+        Returns:
+            bool: True if tracemalloc is tracing, False otherwise.
+        """
+        return tracemalloc.is_tracing()
+
+    @staticmethod
+    def stop() -> None:
+        """Stops tracing allocations and frees the traces."""
+        tracemalloc.stop()
+
+    @staticmethod
+    def top_allocators(limit: int) -> list[Allocator]:
+        """Gets the source lines that allocated the most memory still alive.
+
+        Starts tracing if it is off, in which case only later allocations are seen.
+
+        Args:
+            limit (int): The maximum number of lines to return.
+
+        Returns:
+            list[Allocator]: The lines, largest first.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MemoryProfiler.TRACE_FRAMES)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        return [
+            Allocator(str(stat.traceback[0]), stat.size, stat.count)
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+
+    @staticmethod
+    def traced_bytes() -> tuple[int, int]:
+        """Gets the memory allocated since tracing started.
+
+        Returns:
+            tuple[int, int]: The current and peak traced bytes, or zeros if
+                tracing is off.
+        """
+        if not tracemalloc.is_tracing():
+            return 0, 0
+        return tracemalloc.get_traced_memory()
+
+    @staticmethod
+    def count_objects(types: tuple[type, ...]) -> dict[str, int]:
+        """Counts the live objects of some types tracked by the garbage collector.
+
+        Args:
+            types (tuple[type, ...]): The types to count.
+
+        Returns:
+            dict[str, int]: The number of live objects by type name.
+        """
+        counts = {t.__name__: 0 for t in types}
+        for obj in gc.get_objects():
+            if isinstance(obj, types):
+                counts[type(obj).__name__] += 1
+        return counts
+
+    @staticmethod
+    def deep_size(root: object, shared: tuple[type, ...] = ()) -> int:
+        """Estimates the memory held by an object and everything it references.
+
+        Modules, classes, functions, enum members, futures and objects of the
+        shared types are not counted, since they are not owned by the object.
+
+        Args:
+            root (object): The object to measure.
+            shared (tuple[type, ...], optional): Types whose instances are
+                shared with the rest of the process.
+
+        Returns:
+            int: The estimated size in bytes.
+        """
+        skip = (type, ModuleType, FunctionType, MethodType, Enum, asyncio.Future,
+                asyncio.AbstractEventLoop) + shared
+        seen: set[int] = set()
+        stack = [root]
+        size = 0
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen or (obj is not root and isinstance(obj, skip)):
+                continue
+            seen.add(id(obj))
+            size += sys.getsizeof(obj)
+            stack.extend(gc.get_referents(obj))
+        return size
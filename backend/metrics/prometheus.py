@@ -0,0 +1,77 @@
+"""Metrics in the Prometheus text exposition format."""
+
+from enum import Enum
+
+
+class MetricType(str, Enum):
+    """The type of a metric."""
+    COUNTER = "counter"
+    GAUGE = "gauge"
+
+
+class PrometheusText:
+    """Builds a page of metrics in the Prometheus text exposition format."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, labels: dict[str, str] | None = None):
+        """Initializes an empty page.
+
+        Args:
+            labels (dict[str, str] | None, optional): Labels added to every sample.
+        """
+        self._labels = labels or {}
+        self._lines: list[str] = []
+        self._declared: set[str] = set()
+
+    def add(self, name: str, help_text: str, kind: MetricType, value: float,
+            labels: dict[str, str] | None = None) -> None:
+        """Adds a sample of a metric, declaring the metric on its first sample.
+
+        Args:
+            name (str): The name of the metric.
+            help_text (str): The description of the metric.
+            kind (MetricType): The type of the metric.
+            value (float): The value of the sample.
+            labels (dict[str, str] | None, optional): The labels of the sample.
+        """
+        if name not in self._declared:
+            self._declared.add(name)
+            self._lines.append(f"# HELP {name} {help_text}")
+            self._lines.append(f"# TYPE {name} {kind.value}")
+        self._lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+    def render(self) -> str:
+        """Renders the page.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        return "\n".join(self._lines) + "\n"
+
+    def _format_labels(self, labels: dict[str, str] | None) -> str:
+        """Formats the labels of a sample.
+
+        Args:
+            labels (dict[str, str] | None): The labels of the sample.
+
+        Returns:
+            str: The labels in braces, or an empty string if there are none.
+        """
+        merged = {**self._labels, **(labels or {})}
+        if not merged:
+            return ""
+        pairs = ",".join(f'{k}="{self._escape(str(v))}"' for k, v in merged.items())
+        return "{" + pairs + "}"
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        """Escapes a label value.
+
+        Args:
+            value (str): The label value.
+
+        Returns:
+            str: The escaped value.
+        """
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
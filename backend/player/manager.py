@@ -1,11 +1,27 @@
 """Player management service."""
 
+import hashlib
+import hmac
+import os
+import secrets
+
 from events.data import PlayerInfoData
 from player.player import Player
 
 
 class PlayerManager:
-    """Manages the players in the game."""
+    """Manages the players connected to this worker.
+
+    Each player gets a session token when they register. The token follows
+    them into the lobby and their game, and it is how a reconnecting client
+    reclaims its seat under a new socket id.
+
+    Tokens are signed with SESSION_SECRET, so any worker can tell that a token
+    was issued by the server. The secret is generated on startup if it is not
+    set, and is shared with the workers through the environment.
+    """
+
+    SECRET = os.environ.setdefault("SESSION_SECRET", secrets.token_hex(32))
 
     def __init__(self):
         self._players: dict[str, Player] = {}
@@ -20,10 +36,66 @@ class PlayerManager:
         Returns:
             Player: The player object.
         """
-        p = Player(sid=sid, name=name)
+        p = Player(sid=sid, name=name, token=PlayerManager.issue_token())
         self._players[sid] = p
         return p
 
+    def resume_player(self, sid: str, token: str, name: str) -> Player | None:
+        """Registers a reconnecting player under their existing session token.
+
+        The caller checks the token first.
+
+        Args:
+            sid (str): The new socket id of the player.
+            token (str): The session token of the player.
+            name (str): The name of the player.
+
+        Returns:
+            Player | None: The player object, or None if the socket is already registered.
+        """
+        if sid in self._players:
+            return None
+        p = Player(sid=sid, name=name, token=token)
+        self._players[sid] = p
+        return p
+
+    @staticmethod
+    def issue_token() -> str:
+        """Makes a new session token, signed by the server.
+
+        Returns:
+            str: The session token.
+        """
+        nonce = secrets.token_urlsafe(16)
+        return f"{nonce}.{PlayerManager._sign(nonce)}"
+
+    @staticmethod
+    def is_issued(token: str) -> bool:
+        """Checks if a session token was issued by the server.
+
+        Args:
+            token (str): The session token.
+
+        Returns:
+            bool: True if the token has a valid signature, False otherwise.
+        """
+        if not isinstance(token, str):
+            return False
+        nonce, _, signature = token.rpartition(".")
+        return bool(nonce) and hmac.compare_digest(signature, PlayerManager._sign(nonce))
+
+    @staticmethod
+    def _sign(nonce: str) -> str:
+        """Signs the random part of a session token.
+
+        Args:
+            nonce (str): The random part of the token.
+
+        Returns:
+            str: The signature.
+        """
+        return hmac.new(PlayerManager.SECRET.encode(), nonce.encode(), hashlib.sha256).hexdigest()[:32]
+
     def get_player(self, sid: str) -> Player:
         """Gets a player from the manager.
 
@@ -43,6 +115,14 @@ class PlayerManager:
         """
         self._players.pop(sid, None)
 
+    def num_players(self) -> int:
+        """Gets the number of players connected to this worker.
+
+        Returns:
+            int: The number of players.
+        """
+        return len(self._players)
+
     def get_player_info(self, sid: str) -> PlayerInfoData:
         """Gets a player's info.
 
@@ -50,10 +50,28 @@ class PowerUp(str, Enum):
     CALL_FRIEND = "call_friend"
     DOUBLE_POINTS = "double_points"
 
+    def bit(self) -> int:
+        """Gets the bit of the power up in a player's used power ups mask.
 
-@dataclass
+        Returns:
+            int: The bit of the power up.
+        """
+        return POWERUP_BITS[self]
+
+
+POWERUP_BITS = {p: 1 << i for i, p in enumerate(PowerUp)}
+NUM_OPTIONS = 4
+WIRE_FIELDS = frozenset({
+    "sid", "name", "score", "answer", "hidden_options", "powerups_used", "double_points"})
+
+
+@dataclass(slots=True)
 class Player:
-    """A player in the game."""
+    """A player in the game.
+
+    Hidden options and used power ups are stored as bitmasks. The client-facing
+    view of the player is cached and rebuilt only after the player changes.
+    """
     sid: str
     type: PlayerType = PlayerType.HUMAN
     level: BotLevel = BotLevel.NOVICE
@@ -62,22 +80,119 @@ class Player:
     score: int = 0
     selected_category: Category | None = None
     answer: int = -1
-    visible_options: list[bool] = field(
-        default_factory=lambda: [True, True, True, True])
-    used_powerups: list[PowerUp] = field(default_factory=list)
+    hidden_options: int = 0
+    powerups_used: int = 0
     double_points: bool = False
+    token: str = ""
+    _wire: dict | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        object.__setattr__(self, name, value)
+        if name in WIRE_FIELDS:
+            object.__setattr__(self, "_wire", None)
+
+    @property
+    def visible_options(self) -> list[bool]:
+        """The visibility of each answer option for the player."""
+        return [not self.hidden_options >> i & 1 for i in range(NUM_OPTIONS)]
+
+    @property
+    def used_powerups(self) -> list[PowerUp]:
+        """The power ups the player has used."""
+        return [p for p in PowerUp if self.powerups_used & p.bit()]
+
+    def hide_option(self, index: int) -> None:
+        """Hides an answer option from the player.
+
+        Args:
+            index (int): The index of the option to hide.
+        """
+        self.hidden_options |= 1 << index
+
+    def use_powerup(self, powerup: PowerUp) -> bool:
+        """Marks a power up as used.
+
+        Args:
+            powerup (PowerUp): The power up to use.
+
+        Returns:
+            bool: True if the power up was unused, False if it was already used.
+        """
+        if self.powerups_used & powerup.bit():
+            return False
+        self.powerups_used |= powerup.bit()
+        return True
+
+    def to_wire(self) -> dict:
+        """Gets the client-facing view of the player.
+
+        Returns:
+            dict: The fields of the player that are sent to clients. The dict is
+                shared until the player changes, and must not be modified.
+        """
+        if self._wire is None:
+            wire = {
+                "sid": self.sid,
+                "name": self.name,
+                "score": self.score,
+                "answer": self.answer,
+                "visible_options": self.visible_options,
+                "used_powerups": self.used_powerups,
+                "double_points": self.double_points,
+            }
+            object.__setattr__(self, "_wire", wire)
+        return self._wire
+
+    def snapshot(self) -> dict:
+        """Gets the full state of the player.
+
+        Returns:
+            dict: The state of the player.
+        """
+        return {
+            "sid": self.sid,
+            "type": self.type,
+            "level": self.level,
+            "name": self.name,
+            "room": self.room,
+            "score": self.score,
+            "selected_category": self.selected_category,
+            "answer": self.answer,
+            "hidden_options": self.hidden_options,
+            "powerups_used": self.powerups_used,
+            "double_points": self.double_points,
+            "token": self.token,
+        }
+
+    @staticmethod
+    def from_snapshot(state: dict) -> "Player":
+        """Creates a player from a snapshot of its state.
+
+        Args:
+            state (dict): The state of the player.
+
+        Returns:
+            Player: The player.
+        """
+        category = state["selected_category"]
+        return Player(**{
+            **state,
+            "type": PlayerType(state["type"]),
+            "level": BotLevel(state["level"]),
+            "selected_category": Category(category) if category else None,
+        })
 
     def total_reset(self) -> None:
         """Resets the player for a new game."""
         self.score = 0
         self.selected_category = None
-        self.used_powerups.clear()
+        self.powerups_used = 0
         self.round_reset()
 
     def round_reset(self) -> None:
         """Resets the player for a new round."""
         self.answer = -1
-        self.visible_options = [True, True, True, True]
+        self.hidden_options = 0
         self.double_points = False
 
 
@@ -0,0 +1,88 @@
+"""Process-wide in-memory question bank."""
+
+import random
+
+from questions.db import QuestionDB
+from questions.models import Category, Question
+
+
+class QuestionBank:
+    """An in-memory index of every question, keyed by category and difficulty."""
+
+    NUM_DIFFICULTIES = 10
+
+    _index: dict[str, list[list[Question]]] = {}
+    _by_id: dict[int, Question] = {}
+
+    @staticmethod
+    def load() -> None:
+        """Loads every question from the database and indexes it."""
+        index = {c: QuestionBank._empty_buckets() for c in Category}
+        by_id = {}
+        for category, questions in QuestionDB.get_all_questions().items():
+            buckets = index.setdefault(category, QuestionBank._empty_buckets())
+            for q in questions:
+                buckets[q.difficulty - 1].append(q)
+                index[Category.ALL][q.difficulty - 1].append(q)
+                by_id[q.id] = q
+        QuestionBank._index = index
+        QuestionBank._by_id = by_id
+
+    @staticmethod
+    def is_loaded() -> bool:
+        """Checks if the question bank has been loaded.
+
+        Returns:
+            bool: True if the question bank has been loaded, False otherwise.
+        """
+        return bool(QuestionBank._index)
+
+    @staticmethod
+    def size() -> int:
+        """Gets the number of questions in the bank.
+
+        Returns:
+            int: The number of questions.
+        """
+        return len(QuestionBank._by_id)
+
+    @staticmethod
+    def sample(category: Category, count: int) -> list[list[Question]]:
+        """Samples up to `count` random questions from each difficulty of a category.
+
+        Args:
+            category (Category): The category of questions to sample.
+            count (int): The maximum number of questions per difficulty.
+
+        Returns:
+            list[list[Question]]: The sampled questions, bucketed by difficulty.
+        """
+        if not QuestionBank.is_loaded():
+            QuestionBank.load()
+        if category == Category.RANDOM:
+            category = Category.randomize()
+        buckets = QuestionBank._index[category]
+        return [random.sample(b, min(count, len(b))) for b in buckets]
+
+    @staticmethod
+    def get(question_id: int) -> Question | None:
+        """Gets a question by its id.
+
+        Args:
+            question_id (int): The id of the question.
+
+        Returns:
+            Question | None: The question, or None if there is no such question.
+        """
+        if not QuestionBank.is_loaded():
+            QuestionBank.load()
+        return QuestionBank._by_id.get(question_id)
+
+    @staticmethod
+    def _empty_buckets() -> list[list[Question]]:
+        """Creates an empty list of questions for every difficulty.
+
+        Returns:
+            list[list[Question]]: The empty difficulty buckets.
+        """
+        return [[] for _ in range(QuestionBank.NUM_DIFFICULTIES)]
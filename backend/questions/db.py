@@ -1,39 +1,71 @@
 """Question database."""
 
+import os
 import sqlite3
 from pathlib import Path
 
-from questions.models import Category, Question
+from questions.models import Question
 
 
 class QuestionDB:
-    """Database for managing questions."""
+    """Database for managing questions.
 
-    DB_PATH = Path(__file__).parent / "questions.db"
+    QUESTIONS_DB_PATH points the app at another copy of the database, so test
+    runs can write to it without touching the tracked question bank.
+    """
 
-    @staticmethod
-    def get_questions(category: Category = Category.RANDOM) -> list[Question]:
-        """Gets 10 questions from the sqlite database.
+    DEFAULT_PATH = Path(__file__).parent / "questions.db"
+    DB_PATH = Path(os.getenv("QUESTIONS_DB_PATH", DEFAULT_PATH))
 
-        Args:
-            category (Category, optional): The category of questions to get. Defaults to ALL.
+    @staticmethod
+    def get_all_questions() -> dict[str, list[Question]]:
+        """Gets every question from the sqlite database, grouped by category.
 
         Returns:
-            list[Question]: The questions from the database.
+            dict[str, list[Question]]: The questions, keyed by category name.
         """
-        if category == Category.RANDOM:
-            category = Category.randomize()
-
+        questions: dict[str, list[Question]] = {}
         with sqlite3.connect(QuestionDB.DB_PATH) as conn:
             cur = conn.cursor()
-            if category != Category.ALL:
-                cur.execute(
-                    "SELECT * FROM questions WHERE category = ? ORDER BY RANDOM()",
-                    (category,))
-            else:
-                cur.execute(
-                    "SELECT * FROM questions ORDER BY RANDOM()")
-            rows = cur.fetchall()
-            questions = [Question.from_row(r) for r in rows]
+            cur.execute("SELECT * FROM questions")
+            for r in cur.fetchall():
+                questions.setdefault(r[1], []).append(
+                    Question.from_row(r))
             cur.close()
         return questions
+
+    @staticmethod
+    def get_questions_without_hint() -> list[tuple[int, Question]]:
+        """Gets every question that has no precomputed friend hint.
+
+        Returns:
+            list[tuple[int, Question]]: The id and question of each row.
+        """
+        QuestionDB._add_friend_hint_column()
+        with sqlite3.connect(QuestionDB.DB_PATH) as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM questions WHERE friend_hint IS NULL ORDER BY id")
+            rows = [(r[0], Question.from_row(r)) for r in cur.fetchall()]
+            cur.close()
+        return rows
+
+    @staticmethod
+    def save_friend_hints(hints: list[tuple[int, str]]) -> None:
+        """Stores precomputed friend hints next to their questions.
+
+        Args:
+            hints (list[tuple[int, str]]): The id of each question and its hint.
+        """
+        QuestionDB._add_friend_hint_column()
+        with sqlite3.connect(QuestionDB.DB_PATH) as conn:
+            conn.executemany(
+                "UPDATE questions SET friend_hint = ? WHERE id = ?",
+                [(hint, question_id) for question_id, hint in hints])
+
+    @staticmethod
+    def _add_friend_hint_column() -> None:
+        """Adds the friend hint column to the questions table if it is missing."""
+        with sqlite3.connect(QuestionDB.DB_PATH) as conn:
+            columns = [r[1] for r in conn.execute("PRAGMA table_info(questions)")]
+            if "friend_hint" not in columns:
+                conn.execute("ALTER TABLE questions ADD COLUMN friend_hint TEXT")
@@ -46,6 +46,8 @@ class Question:
     correct_index: int
     options: list[str]
     difficulty: int
+    friend_hint: str | None = None
+    id: int = 0
 
     @staticmethod
     def from_row(r: tuple) -> "Question":
@@ -61,5 +63,7 @@ class Question:
             text=r[2],
             correct_index=r[3],
             options=r[4:8],
-            difficulty=r[8]
+            difficulty=r[8],
+            friend_hint=r[9] if len(r) > 9 else None,
+            id=r[0]
         )
@@ -2,7 +2,7 @@
 
 from typing import Generator
 
-from questions.db import QuestionDB
+from questions.bank import QuestionBank
 from questions.models import Category, Question
 
 
@@ -13,16 +13,15 @@ class QuestionProvider:
         self._questions: list[list[Question]] = [[] for _ in range(10)]
         self._difficulty = 0
 
-    def load_questions(self, category: Category = Category.RANDOM) -> None:
-        """Loads questions from the database.
+    def load_questions(self, category: Category = Category.RANDOM, count: int = 10) -> None:
+        """Loads questions from the question bank.
 
         Args:
             category (Category, optional): The category of questions to load. Defaults to RANDOM.
+            count (int, optional): The maximum number of questions per difficulty. Defaults to 10.
         """
-        questions = QuestionDB.get_questions(category)
-        for q in questions:
-            self._questions[q.difficulty - 1].append(q)
-        self._questions = [l for l in self._questions if l]
+        questions = QuestionBank.sample(category, count)
+        self._questions = [l for l in questions if l]
         self._difficulty = len(self._questions) // 2
 
     def questions(self) -> Generator[Question, None, None]:
@@ -46,3 +45,26 @@ class QuestionProvider:
     def decrease_difficulty(self) -> None:
         """Decreases the difficulty of the questions."""
         self._difficulty = max(0, self._difficulty - 1)
+
+    def snapshot(self) -> dict:
+        """Gets the state of the provider, with questions stored by id.
+
+        Returns:
+            dict: The state of the provider.
+        """
+        return {
+            "questions": [[q.id for q in l] for l in self._questions],
+            "difficulty": self._difficulty,
+        }
+
+    def restore(self, state: dict) -> None:
+        """Restores the state of the provider from a snapshot.
+
+        Args:
+            state (dict): The state of the provider.
+        """
+        self._questions = [
+            [q for q in map(QuestionBank.get, ids) if q is not None]
+            for ids in state["questions"]
+        ]
+        self._difficulty = state["difficulty"]
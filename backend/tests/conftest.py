@@ -0,0 +1,22 @@
+"""Shared test setup."""
+
+import os
+
+import pytest
+
+# The Gemini client reads its key on import, and no test calls it.
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from clock.clock import GameClock  # noqa: E402
+from events.events import EventQueue  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_queues():
+    """Gives each test an empty event queue and game clock."""
+    EventQueue._shards = []
+    EventQueue._dropped = {}
+    GameClock._wheel = [[] for _ in range(GameClock.WHEEL_SIZE)]
+    GameClock._ticks = 0
+    yield
+
@@ -0,0 +1,77 @@
+"""Tests for the delta encoding of game broadcasts."""
+
+import asyncio
+
+from app.broadcast import GameBroadcaster
+from events.data import GameUpdateData
+from player.player import Player
+
+
+def player(sid: str, score: int = 0, answer: int = -1) -> dict:
+    return {"sid": sid, "name": sid, "score": score, "answer": answer}
+
+
+def state(phase: str = "awaiting_answers", players: dict | None = None, **fields) -> dict:
+    return {"id": "g", "phase": phase, "deadline": 10.0, "server_time": 1.0,
+            "players": players or {}, **fields}
+
+
+class RecordingEmitter:
+    def __init__(self):
+        self.emitted: list[tuple[str, dict, str]] = []
+
+    async def emit(self, event: str, data: dict, to: str | None = None) -> None:
+        self.emitted.append((event, data, to))
+
+
+def test_diff_of_equal_states_is_empty():
+    s = state(players={"a": player("a")})
+    assert GameBroadcaster._diff(s, state(players={"a": player("a")})) == {}
+
+
+def test_diff_keeps_changed_top_level_fields():
+    delta = GameBroadcaster._diff(state(question="q1"), state(question="q2"))
+    assert delta == {"question": "q2"}
+
+
+def test_diff_sends_only_changed_player_fields():
+    old = state(players={"a": player("a"), "b": player("b")})
+    new = state(players={"a": player("a", score=30, answer=2), "b": player("b")})
+    assert GameBroadcaster._diff(old, new) == {"players": {"a": {"score": 30, "answer": 2}}}
+
+
+def test_diff_sends_new_players_in_full():
+    new = state(players={"a": player("a")})
+    assert GameBroadcaster._diff(state(), new) == {"players": {"a": player("a")}}
+
+
+def test_diff_lists_removed_players():
+    old = state(players={"a": player("a"), "b": player("b")})
+    new = state(players={"a": player("a")})
+    assert GameBroadcaster._diff(old, new) == {"removed_players": ["b"]}
+
+
+def test_update_sends_full_state_on_phase_change_and_deltas_within_a_phase():
+    emitter = RecordingEmitter()
+    broadcaster = GameBroadcaster(emitter)
+    alice = Player(sid="a", name="alice")
+
+    def update(phase: str, deadline: float, server_time: float) -> GameUpdateData:
+        return GameUpdateData(id="g", category="Random", phase=phase, players={"a": alice},
+                              deadline=deadline, server_time=server_time)
+
+    async def run():
+        await broadcaster.update(update("awaiting_answers", 10.0, 1.0))
+        alice.score = 10
+        await broadcaster.update(update("awaiting_answers", 10.0, 2.0))
+        await broadcaster.update(update("awaiting_answers", 10.0, 3.0))
+        await broadcaster.update(update("awaiting_answers", 12.0, 4.0))
+        await broadcaster.update(update("round_ended", 15.0, 5.0))
+
+    asyncio.run(run())
+    events = [(e, d) for e, d, _ in emitter.emitted]
+    assert [e for e, _ in events] == [
+        "game_update", "game_delta", "game_delta", "game_update"]
+    assert events[1][1] == {"id": "g", "players": {"a": {"score": 10}}}
+    assert events[2][1] == {"id": "g", "deadline": 12.0, "server_time": 4.0}
+    assert events[3][1]["phase"] == "round_ended"
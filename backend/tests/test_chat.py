@@ -0,0 +1,96 @@
+"""Tests for room chat and its rate limit."""
+
+import asyncio
+
+from chat.chat import Chat, TokenBucket
+from events.data import MessageData
+from events.events import EventQueue, ServerEvent
+
+
+def message(text: str, sender: str = "a") -> MessageData:
+    return MessageData(id=text, sender_id=sender, username=sender, message=text)
+
+
+async def sent(room: str) -> list[list[str]]:
+    """Takes the chat batches queued for a room, as lists of message texts."""
+    shard = EventQueue.shard_of(room)
+    batches = []
+    while EventQueue._shard(shard).qsize():
+        event, data = await EventQueue.get(shard)
+        assert event == ServerEvent.CHAT
+        batches.append([m["message"] for m in data.messages])
+    return batches
+
+
+def test_bucket_allows_a_burst_then_refills():
+    bucket = TokenBucket(capacity=3, rate=1.0, tokens=3, updated_at=0.0)
+    assert [bucket.take(0.0) for _ in range(4)] == [True, True, True, False]
+    assert not bucket.take(0.5)
+    assert bucket.take(1.0)
+    assert not bucket.take(1.0)
+
+
+def test_bucket_does_not_refill_past_capacity():
+    bucket = TokenBucket(capacity=2, rate=1.0, tokens=2, updated_at=0.0)
+    assert [bucket.take(100.0) for _ in range(3)] == [True, True, False]
+
+
+def test_senders_are_limited_separately():
+    chat = Chat()
+    assert all(chat.allow("a") for _ in range(Chat.BURST))
+    assert not chat.allow("a")
+    assert chat.allow("b")
+
+
+def test_forgotten_sender_starts_with_a_full_bucket():
+    chat = Chat()
+    for _ in range(Chat.BURST):
+        chat.allow("a")
+    chat.forget_sender("a")
+    assert chat.allow("a")
+
+
+def test_first_message_goes_out_now_and_a_burst_waits_for_the_flush():
+    chat = Chat()
+
+    async def run():
+        await chat.post("room", message("hi"))
+        await chat.post("room", message("one"))
+        await chat.post("room", message("two"))
+        first = await sent("room")
+        await chat._flush(chat._rooms["room"])
+        return first, await sent("room")
+
+    first, flushed = asyncio.run(run())
+    assert first == [["hi"]]
+    assert flushed == [["one", "two"]]
+
+
+def test_long_messages_are_truncated():
+    chat = Chat()
+    asyncio.run(chat.post("room", message("x" * (Chat.MAX_LENGTH + 10))))
+    assert len(chat._rooms["room"].history[0]["message"]) == Chat.MAX_LENGTH
+
+
+def test_history_keeps_the_last_messages_and_is_replayed():
+    chat = Chat()
+
+    async def run():
+        for i in range(Chat.HISTORY_SIZE + 5):
+            await chat.post("room", message(str(i)))
+        await sent("room")
+        await chat.replay("room", "newcomer")
+        shard = EventQueue.shard_of("room")
+        return await EventQueue.get(shard)
+
+    _, data = asyncio.run(run())
+    assert data.destination_id == "newcomer"
+    assert [m["message"] for m in data.messages] == [
+        str(i) for i in range(5, Chat.HISTORY_SIZE + 5)]
+
+
+def test_closed_room_is_forgotten():
+    chat = Chat()
+    asyncio.run(chat.post("room", message("hi")))
+    chat.close_room("room")
+    assert chat.num_rooms() == 0
@@ -0,0 +1,78 @@
+"""Tests for the sharded event queue."""
+
+import asyncio
+
+from events.events import EventPriority, EventQueue, EventShard, ServerEvent
+
+HIGH, NORMAL, LOW = EventPriority.HIGH, EventPriority.NORMAL, EventPriority.LOW
+
+
+def consume(shard: EventShard, puts: list[tuple[str, EventPriority, str]]) -> list[str]:
+    """Puts events on a shard, then takes them all.
+
+    Args:
+        shard (EventShard): The shard.
+        puts (list[tuple[str, EventPriority, str]]): The key, priority and data of each event.
+
+    Returns:
+        list[str]: The data of the events, in the order they were taken.
+    """
+    for key, priority, data in puts:
+        shard.put(key, (priority, 0.0, ServerEvent.GAME_UPDATE, data))
+
+    async def run():
+        return [(await shard.get())[3] for _ in puts]
+
+    return asyncio.run(run())
+
+
+def test_events_of_a_key_keep_their_order_whatever_their_priority():
+    order = consume(EventShard(), [("a", LOW, "a1"), ("a", NORMAL, "a2"), ("a", HIGH, "a3")])
+    assert order == ["a1", "a2", "a3"]
+
+
+def test_priority_picks_the_next_key():
+    order = consume(EventShard(), [("a", NORMAL, "a1"), ("b", HIGH, "b1")])
+    assert order == ["b1", "a1"]
+
+
+def test_urgent_event_promotes_its_whole_key():
+    order = consume(EventShard(), [
+        ("a", LOW, "a1"), ("b", NORMAL, "b1"), ("a", HIGH, "a2"), ("b", NORMAL, "b2")])
+    assert order == ["a1", "a2", "b1", "b2"]
+
+
+def test_keys_of_equal_priority_take_turns():
+    order = consume(EventShard(), [
+        ("a", NORMAL, "a1"), ("a", NORMAL, "a2"), ("b", NORMAL, "b1"), ("c", NORMAL, "c1")])
+    assert order == ["a1", "b1", "c1", "a2"]
+
+
+def test_get_waits_for_a_put():
+    shard = EventShard()
+
+    async def run():
+        waiting = asyncio.create_task(shard.get())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        shard.put("a", (NORMAL, 0.0, ServerEvent.GAME_UPDATE, "a1"))
+        return (await waiting)[3]
+
+    assert asyncio.run(run()) == "a1"
+    assert shard.qsize() == 0
+
+
+def test_full_shard_drops_low_priority_events():
+    EventQueue.MAX_SHARD_DEPTH, depth = 2, EventQueue.MAX_SHARD_DEPTH
+    try:
+        async def run():
+            for i in range(3):
+                await EventQueue.put(ServerEvent.GAME_UPDATE, f"u{i}", "g")
+            await EventQueue.put(ServerEvent.CHAT, "chat", "g")
+            return EventQueue.stats()
+
+        stats = asyncio.run(run())
+    finally:
+        EventQueue.MAX_SHARD_DEPTH = depth
+    assert stats.depth[EventQueue.shard_of("g")] == 3
+    assert stats.dropped == {ServerEvent.CHAT.value: 1}
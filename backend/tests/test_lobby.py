@@ -0,0 +1,126 @@
+"""Tests for lobby matchmaking."""
+
+import asyncio
+
+from events.events import EventQueue, ServerEvent
+from lobby.lobby import Lobby
+from player.player import BotLevel, Player
+
+
+def waiting(sid: str, level: BotLevel = BotLevel.NOVICE) -> Player:
+    return Player(sid=sid, name=sid, level=level)
+
+
+async def matches() -> list[list[str]]:
+    """Takes the queued lobby events, and returns the sids of each game started."""
+    shard = EventQueue.shard_of(Lobby.ROOM)
+    games = []
+    while EventQueue._shard(shard).qsize():
+        event, data = await EventQueue.get(shard)
+        if event == ServerEvent.NEW_GAME:
+            games.append([p.sid for p in data.players])
+    return games
+
+
+def test_full_table_starts_a_game_in_arrival_order():
+    async def run():
+        lobby = Lobby()
+        for sid in "abcd":
+            await lobby.add_player(waiting(sid))
+        return lobby, await matches()
+
+    lobby, games = asyncio.run(run())
+    assert games == [["a", "b", "c", "d"]]
+    assert lobby.num_waiting() == 0
+
+
+def test_levels_are_matched_separately():
+    async def run():
+        lobby = Lobby()
+        for sid in "abc":
+            await lobby.add_player(waiting(sid, BotLevel.NOVICE))
+        await lobby.add_player(waiting("x", BotLevel.EXPERT))
+        return lobby, await matches()
+
+    lobby, games = asyncio.run(run())
+    assert games == []
+    assert lobby.num_waiting() == 4
+
+
+def test_deadline_shortens_as_the_queue_fills():
+    async def run():
+        lobby = Lobby()
+        queue = lobby._queues[BotLevel.NOVICE]
+        waits = []
+        for sid in "abc":
+            await lobby.add_player(waiting(sid))
+            waits.append(round(queue.deadline - queue.started_at))
+        return waits
+
+    assert asyncio.run(run()) == [30, 20, 10]
+
+
+def test_deadline_starts_a_short_game():
+    async def run():
+        lobby = Lobby()
+        for sid in "ab":
+            await lobby.add_player(waiting(sid))
+        await lobby._on_deadline(lobby._queues[BotLevel.NOVICE])
+        return await matches()
+
+    assert asyncio.run(run()) == [["a", "b"]]
+
+
+def test_deadline_tops_up_from_neighbouring_levels():
+    async def run():
+        lobby = Lobby()
+        await lobby.add_player(waiting("n1", BotLevel.NOVICE))
+        await lobby.add_player(waiting("i1", BotLevel.INTERMEDIATE))
+        await lobby.add_player(waiting("i2", BotLevel.INTERMEDIATE))
+        await lobby.add_player(waiting("e1", BotLevel.EXPERT))
+        await lobby.add_player(waiting("e2", BotLevel.EXPERT))
+        await lobby._on_deadline(lobby._queues[BotLevel.INTERMEDIATE])
+        return lobby, await matches()
+
+    lobby, games = asyncio.run(run())
+    assert games == [["i1", "i2", "n1", "e1"]]
+    assert lobby.num_waiting() == 1
+
+
+def test_top_up_only_uses_adjacent_levels():
+    async def run():
+        lobby = Lobby()
+        await lobby.add_player(waiting("n1", BotLevel.NOVICE))
+        await lobby.add_player(waiting("e1", BotLevel.EXPERT))
+        await lobby._on_deadline(lobby._queues[BotLevel.NOVICE])
+        return await matches()
+
+    assert asyncio.run(run()) == [["n1"]]
+
+
+def test_removed_player_is_not_matched():
+    async def run():
+        lobby = Lobby()
+        for sid in "abc":
+            await lobby.add_player(waiting(sid))
+        lobby.remove_player("b")
+        await lobby.add_player(waiting("d"))
+        await lobby.add_player(waiting("e"))
+        return lobby, await matches()
+
+    lobby, games = asyncio.run(run())
+    assert games == [["a", "c", "d", "e"]]
+    assert lobby.num_waiting() == 0
+
+
+def test_rejoining_moves_a_player_to_their_new_level():
+    async def run():
+        lobby = Lobby()
+        await lobby.add_player(waiting("a", BotLevel.NOVICE))
+        await lobby.add_player(waiting("a", BotLevel.EXPERT))
+        return lobby
+
+    lobby = asyncio.run(run())
+    assert list(lobby._queues[BotLevel.NOVICE].players) == []
+    assert list(lobby._queues[BotLevel.EXPERT].players) == ["a"]
+    assert lobby.num_waiting() == 1
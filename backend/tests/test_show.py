@@ -0,0 +1,99 @@
+"""Tests for live-show scoring and ranking."""
+
+import asyncio
+
+from events.events import EventQueue, ServerEvent
+from game.models import POINTS_PER_SECOND, GamePhase, Phase
+from game.show import ShowGame
+from questions.models import Question
+
+
+def show_in_round(*players: tuple[str, int]) -> ShowGame:
+    """Makes a show that is awaiting answers to a question whose answer is 1."""
+    show = ShowGame("show")
+    for sid, score in players:
+        show.add_player(sid, sid, f"token-{sid}")
+        show.get_player(sid).score = score
+    show._current_question = Question("q", 1, ["a", "b", "c", "d"], 1)
+    show._phase = Phase(GamePhase.AWAITING_ANSWERS, 10)
+    show._phase.start()
+    return show
+
+
+def test_ties_share_a_rank():
+    show = show_in_round(("a", 50), ("b", 30), ("c", 30), ("d", 0))
+    show._rank()
+    assert [show._rank_of(show.get_player(s).score) for s in "abcd"] == [1, 2, 2, 4]
+
+
+def test_leaderboard_is_the_top_scores_in_order():
+    show = show_in_round(*((str(i), i * 10) for i in range(ShowGame.LEADERBOARD_SIZE + 5)))
+    show._rank()
+    scores = [e["score"] for e in show._leaderboard]
+    assert len(scores) == ShowGame.LEADERBOARD_SIZE
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] == (ShowGame.LEADERBOARD_SIZE + 4) * 10
+
+
+def test_correct_answer_scores_by_time_remaining():
+    show = show_in_round(("a", 0), ("b", 0))
+    received_at = show._phase.deadline - 4
+    show.submit_answer(show.get_player("a"), 1, received_at)
+    show.submit_answer(show.get_player("b"), 2, received_at)
+    assert show.get_player("a").score == 4 * POINTS_PER_SECOND
+    assert show.get_player("b").score == 0
+    assert show._distribution == [0, 1, 1, 0]
+
+
+def test_only_the_first_answer_in_time_counts():
+    show = show_in_round(("a", 0), ("b", 0))
+    a = show.get_player("a")
+    show.submit_answer(a, 2)
+    show.submit_answer(a, 1)
+    show.submit_answer(show.get_player("b"), 1, show._phase.deadline + 1)
+    assert a.score == 0
+    assert show._distribution == [0, 0, 1, 0]
+    assert "b" not in show._answers
+
+
+def test_removed_player_leaves_the_distribution():
+    show = show_in_round(("a", 0), ("b", 0), ("c", 0))
+    show.submit_answer(show.get_player("a"), 3)
+    show.remove_player(show.get_player("a"))
+    assert show._distribution == [0, 0, 0, 0]
+    assert show.num_players() == 2
+
+
+def test_rejoin_keeps_score_and_answer():
+    show = show_in_round(("a", 40), ("b", 0))
+    show.submit_answer(show.get_player("a"), 2)
+    assert asyncio.run(show.rejoin("token-a", "a2"))
+    assert show.get_player("a") is None
+    assert show.get_player("a2").score == 40
+    assert show._answers["a2"][0] == 2
+
+
+def test_joining_again_keeps_the_seat():
+    show = show_in_round(("a", 40))
+    show.add_player("a", "a")
+    assert show.get_player("a").score == 40
+
+
+def test_results_rank_connected_players():
+    show = show_in_round(("a", 0), ("b", 20), ("c", 0))
+    show.submit_answer(show.get_player("a"), 1, show._phase.deadline - 5)
+    show.detach("c")
+    show._rank()
+
+    async def run():
+        await show._send_results()
+        return await EventQueue.get(EventQueue.shard_of(show.id))
+
+    event, data = asyncio.run(run())
+    assert event == ServerEvent.SHOW_RESULT
+    assert data.num_players == 3
+    results = {r.sid: (r.answer, r.points, r.score, r.rank) for r in data.results}
+    assert results == {
+        "a": (1, 5 * POINTS_PER_SECOND, 5 * POINTS_PER_SECOND, 1),
+        "b": (-1, 0, 20, 2),
+    }
@@ -0,0 +1,125 @@
+"""Tests for the running tallies of a game."""
+
+from dataclasses import asdict
+
+from game.game import Game
+from game.models import GamePhase, GameTally, Phase
+from player.player import Player, PlayerType
+from questions.models import Category, Question
+
+
+def game_in(title: GamePhase, num_humans: int = 3) -> Game:
+    """Makes a game with some humans and a bot, in a phase, with a question whose answer is 1."""
+    players = {f"h{i}": Player(sid=f"h{i}", name=f"h{i}") for i in range(num_humans)}
+    players["bot"] = Player(sid="bot", name="bot", type=PlayerType.BOT)
+    game = Game("g", players)
+    game._current_question = Question("q", 1, ["a", "b", "c", "d"], 1)
+    game._phase = Phase(title, 10)
+    game._phase.start()
+    return game
+
+
+def recounted(game: Game) -> dict:
+    """Gets the tally of a game as rebuilt from its players."""
+    game._recount()
+    return asdict(game._tally)
+
+
+def test_vote_replaces_the_previous_vote():
+    tally = GameTally(humans=2)
+    tally.vote(Category.SCIENCE_NATURE)
+    tally.vote(Category.HISTORY, Category.SCIENCE_NATURE)
+    tally.vote(Category.HISTORY)
+    assert tally.voted == 2
+    assert tally.votes == {Category.HISTORY: 2}
+
+
+def test_unvote_drops_empty_categories():
+    tally = GameTally(humans=2)
+    tally.vote(Category.SCIENCE_NATURE)
+    tally.vote(Category.HISTORY)
+    tally.unvote(Category.SCIENCE_NATURE)
+    assert tally.voted == 1
+    assert tally.votes == {Category.HISTORY: 1}
+
+
+def test_answer_and_unanswer():
+    tally = GameTally(humans=2)
+    tally.answer(1, True)
+    tally.answer(2, False)
+    tally.unanswer(1, True)
+    assert (tally.answered, tally.correct) == (1, 0)
+    assert tally.distribution == [0, 0, 1, 0]
+
+
+def test_reset_round_keeps_votes():
+    tally = GameTally(humans=1, double_points=1)
+    tally.vote(Category.SCIENCE_NATURE)
+    tally.answer(1, True)
+    tally.reset_round()
+    assert (tally.answered, tally.correct, tally.double_points) == (0, 0, 0)
+    assert tally.distribution == [0, 0, 0, 0]
+    assert tally.votes == {Category.SCIENCE_NATURE: 1}
+
+
+def test_new_game_counts_only_humans():
+    assert game_in(GamePhase.CATEGORY_SELECTION)._tally.humans == 3
+
+
+def test_category_votes_are_tallied():
+    game = game_in(GamePhase.CATEGORY_SELECTION)
+    game.select_category(game.get_player("h0"), Category.SCIENCE_NATURE)
+    game.select_category(game.get_player("h1"), Category.SCIENCE_NATURE)
+    game.select_category(game.get_player("h0"), Category.HISTORY)
+    assert game._tally.voted == 2
+    assert game._tally.votes == {Category.SCIENCE_NATURE: 1, Category.HISTORY: 1}
+    assert asdict(game._tally) == recounted(game)
+
+
+def test_votes_outside_category_selection_are_ignored():
+    game = game_in(GamePhase.AWAITING_ANSWERS)
+    game.select_category(game.get_player("h0"), Category.SCIENCE_NATURE)
+    assert game._tally.voted == 0
+
+
+def test_answers_are_tallied_once():
+    game = game_in(GamePhase.AWAITING_ANSWERS)
+    game.submit_answer(game.get_player("h0"), 1)
+    game.submit_answer(game.get_player("h0"), 2)
+    game.submit_answer(game.get_player("h1"), 3)
+    assert (game._tally.answered, game._tally.correct) == (2, 1)
+    assert game._tally.distribution == [0, 1, 0, 1]
+    assert asdict(game._tally) == recounted(game)
+
+
+def test_all_answered_ends_the_phase():
+    game = game_in(GamePhase.AWAITING_ANSWERS, num_humans=2)
+    game._phase.should_stop = game._all_answered
+    game.submit_answer(game.get_player("h0"), 1)
+    assert not game._phase_over.is_set()
+    game.submit_answer(game.get_player("h1"), 0)
+    assert game._phase_over.is_set()
+
+
+def test_leaving_player_is_untallied():
+    game = game_in(GamePhase.AWAITING_ANSWERS)
+    game.submit_answer(game.get_player("h0"), 1)
+    game.submit_answer(game.get_player("h1"), 2)
+    game.remove_player(game.get_player("h0"))
+    assert game._tally.humans == 2
+    assert (game._tally.answered, game._tally.correct) == (1, 0)
+    assert game._tally.distribution == [0, 0, 1, 0]
+    assert asdict(game._tally) == recounted(game)
+
+
+def test_leaving_voter_is_untallied():
+    game = game_in(GamePhase.CATEGORY_SELECTION, num_humans=2)
+    game.select_category(game.get_player("h0"), Category.SCIENCE_NATURE)
+    game.remove_player(game.get_player("h0"))
+    assert (game._tally.humans, game._tally.voted, game._tally.votes) == (1, 0, {})
+
+
+def test_leaving_bot_is_not_untallied():
+    game = game_in(GamePhase.AWAITING_ANSWERS)
+    game.remove_player(game.get_player("bot"))
+    assert game._tally.humans == 3
@@ -1,24 +1,62 @@
 "use client";
 
 import { useCallback, useEffect, useState } from "react";
+import { useParams } from "next/navigation";
 import socket from "../../../shared/socket";
-import { ServerEvent } from "../../../shared/events";
-import { GameUpdate } from "../types";
+import { ClientEvent, ServerEvent } from "../../../shared/events";
+import { loadSession } from "../../../shared/session";
+import { localDeadline } from "../../../shared/countdown";
+import { GameDelta, GameState, GameUpdate } from "../types";
 
 export function useGame() {
-  const [gameState, setGameState] = useState<GameUpdate | null>(null);
+  const [gameState, setGameState] = useState<GameState | null>(null);
+  const { game_id: gameId } = useParams<{ game_id: string }>();
 
   const handleGameUpdate = useCallback((update: GameUpdate) => {
     console.log("[frontend] game_update", update);
-    setGameState(update);
+    setGameState({ ...update, localDeadline: localDeadline(update) });
+  }, []);
+
+  // A reconnect gets a new socket id, so resume the session first and then,
+  // once the server acknowledges it, reclaim the seat with the session token.
+  const handleReconnect = useCallback(() => {
+    const session = loadSession();
+    if (session === null) return;
+    socket.emit(ClientEvent.RESUME_SESSION, session, () => {
+      socket.emit(ClientEvent.JOIN_GAME, { game_id: gameId, token: session.token });
+    });
+  }, [gameId]);
+
+  const handleGameDelta = useCallback((delta: GameDelta) => {
+    setGameState((prev) => {
+      if (prev === null || prev.id !== delta.id) return prev;
+      const { players: changed, removed_players, ...fields } = delta;
+      const players = { ...prev.players };
+      for (const [sid, p] of Object.entries(changed ?? {})) {
+        players[sid] = { ...players[sid], ...p };
+      }
+      for (const sid of removed_players ?? []) {
+        delete players[sid];
+      }
+      const next = { ...prev, ...fields, players };
+      // A resumed phase gets a new deadline without a new phase.
+      if (fields.deadline !== undefined && fields.server_time !== undefined) {
+        next.localDeadline = localDeadline(next);
+      }
+      return next;
+    });
   }, []);
 
   useEffect(() => {
     socket.on(ServerEvent.GAME_UPDATE, handleGameUpdate);
+    socket.on(ServerEvent.GAME_DELTA, handleGameDelta);
+    socket.on("connect", handleReconnect);
     return () => {
       socket.off(ServerEvent.GAME_UPDATE, handleGameUpdate);
+      socket.off(ServerEvent.GAME_DELTA, handleGameDelta);
+      socket.off("connect", handleReconnect);
     };
-  }, [handleGameUpdate]);
+  }, [handleGameUpdate, handleGameDelta, handleReconnect]);
 
   return { gameState, handleGameUpdate };
 }
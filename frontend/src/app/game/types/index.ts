@@ -32,5 +32,23 @@ export interface GameUpdate {
   question_text: string;
   question_options: string[];
   correct_answer: number;
-  time_remaining: number;
+  // The deadline of the phase and the time of the update, on the server's
+  // clock. Only their difference means anything here.
+  deadline: number;
+  server_time: number;
+  // Votes per category while categories are chosen, and the number of
+  // players who picked each option once a round has ended.
+  votes: Record<string, number>;
+  distribution: number[];
 }
+
+// A game update with its deadline converted to local time, in milliseconds.
+export interface GameState extends GameUpdate {
+  localDeadline: number;
+}
+
+export type GameDelta = Partial<Omit<GameUpdate, "players">> & {
+  id: string;
+  players?: Record<string, Partial<Player>>;
+  removed_players?: string[];
+};
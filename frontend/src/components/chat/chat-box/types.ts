@@ -6,4 +6,10 @@ interface Message {
   timestamp: string;
 }
 
-export type { Message };
+// A batch of chat lines for the room, or its recent history on joining it.
+interface ChatBatch {
+  room: string;
+  messages: Message[];
+}
+
+export type { ChatBatch, Message };
@@ -9,7 +9,7 @@ import {
 } from "react";
 import socket from "@/shared/socket";
 import { ClientEvent, ServerEvent } from "@/shared/events";
-import { Message } from "./types";
+import { ChatBatch, Message } from "./types";
 
 export const formatTime = (timestamp: string) => {
   return new Date(timestamp).toLocaleTimeString([], {
@@ -27,12 +27,11 @@ export default function useChatBox() {
     e.preventDefault();
     if (message.trim()) {
       console.log("Sending message:", message);
+      // The server fills in the sender, and sends the message back with the
+      // rest of the room's chat.
       socket.emit(ClientEvent.MESSAGE, {
         id: Date.now().toString(),
-        sender_id: socket.id,
-        username: "You",
         message: message.trim(),
-        timestamp: new Date().toISOString(),
       });
       setMessage("");
     }
@@ -43,12 +42,23 @@ export default function useChatBox() {
     setMessages((prevMessages) => [...prevMessages, message]);
   }, []);
 
+  // History replayed on joining a room may repeat messages already shown.
+  const handleChat = useCallback(({ messages: batch }: ChatBatch) => {
+    setMessages((prevMessages) => {
+      const seen = new Set(prevMessages.map((m) => `${m.sender_id}:${m.id}`));
+      const fresh = batch.filter((m) => !seen.has(`${m.sender_id}:${m.id}`));
+      return fresh.length ? [...prevMessages, ...fresh] : prevMessages;
+    });
+  }, []);
+
   useEffect(() => {
     socket.on(ServerEvent.MESSAGE, handleReceiveMessage);
+    socket.on(ServerEvent.CHAT, handleChat);
     return () => {
       socket.off(ServerEvent.MESSAGE, handleReceiveMessage);
+      socket.off(ServerEvent.CHAT, handleChat);
     };
-  }, [handleReceiveMessage]);
+  }, [handleReceiveMessage, handleChat]);
 
   const scrollToBottom = useCallback(() => {
     msgBoxRef.current?.scrollTo({
@@ -1,4 +1,5 @@
 import Countdown from "@/components/countdown/Countdown";
+import { useCountdown } from "@/shared/countdown";
 import QuestionDisplay from "./question-display/QuestionDisplay";
 import AnswerButtons from "./answer-buttons/AnswerButtons";
 import PowerupButtons from "./powerup-buttons/PowerupButtons";
@@ -11,12 +12,13 @@ export default function AwaitingAnswersScreen({
 }: AwaitingAnswersScreenProps) {
   // Get current player
   const currentPlayer = socket.id ? gameState.players[socket.id] : null;
+  const timeRemaining = useCountdown(gameState.localDeadline);
 
   return (
     <div className={`container-fullscreen ${styles.container}`}>
       {/* Countdown Timer */}
       <div className={styles.countdownTimer}>
-        <Countdown timeRemaining={gameState.time_remaining} />
+        <Countdown timeRemaining={timeRemaining ?? undefined} />
       </div>
 
       {/* Powerup Buttons */}
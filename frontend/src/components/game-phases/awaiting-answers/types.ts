@@ -1,5 +1,5 @@
-import { GameUpdate } from "@/app/game/types";
+import { GameState } from "@/app/game/types";
 
 export interface AwaitingAnswersScreenProps {
-  gameState: GameUpdate;
+  gameState: GameState;
 }
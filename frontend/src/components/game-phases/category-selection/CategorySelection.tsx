@@ -1,4 +1,5 @@
 import Countdown from "@/components/countdown/Countdown";
+import { useCountdown } from "@/shared/countdown";
 import CategoryButtons from "./category-buttons/CategoryButtons";
 import { CategorySelectionScreenProps } from "./types";
 import styles from "./CategorySelection.module.css";
@@ -6,11 +7,13 @@ import styles from "./CategorySelection.module.css";
 export default function CategorySelectionScreen({
   gameState,
 }: CategorySelectionScreenProps) {
+  const timeRemaining = useCountdown(gameState.localDeadline);
+
   return (
     <div className={`container-fullscreen ${styles.container}`}>
       {/* Countdown Timer */}
       <div className={styles.countdownTimer}>
-        <Countdown timeRemaining={gameState.time_remaining} />
+        <Countdown timeRemaining={timeRemaining ?? undefined} />
       </div>
 
       {/* Main Content */}
@@ -1,7 +1,7 @@
-import { GameUpdate } from "@/app/game/types";
+import { GameState } from "@/app/game/types";
 
 export interface CategorySelectionScreenProps {
-  gameState: GameUpdate;
+  gameState: GameState;
 }
 
 export interface CategoryButtonsProps {
@@ -1,13 +1,17 @@
+import { localDeadline, useCountdown } from "@/shared/countdown";
 import { ClientEvent, ServerEvent } from "@/shared/events";
+import { loadSession } from "@/shared/session";
 import socket from "@/shared/socket";
 import { useRouter } from "next/navigation";
 import { useCallback, useEffect, useState } from "react";
-import { LobbyUpdate, NewGame } from "../types";
+import { LobbyDelta, LobbyUpdate, NewGame } from "../types";
 
 export default function useJoinLobby() {
   const router = useRouter();
   const [isJoined, setIsJoined] = useState(false);
-  const [timeRemaining, setTimeRemaining] = useState<number | null>(null);
+  const [players, setPlayers] = useState<string[]>([]);
+  const [deadline, setDeadline] = useState<number | null>(null);
+  const timeRemaining = useCountdown(deadline);
 
   const onJoinLobby = () => {
     socket.emit(ClientEvent.JOIN_LOBBY, {});
@@ -16,12 +20,24 @@ export default function useJoinLobby() {
   const handleLobbyUpdate = useCallback((data: LobbyUpdate) => {
     console.log("[frontend] lobby_update", data);
     setIsJoined(true);
-    setTimeRemaining(data.time_remaining);
+    setPlayers(data.players);
+    setDeadline(localDeadline(data));
+  }, []);
+
+  const handleLobbyDelta = useCallback((data: LobbyDelta) => {
+    setPlayers((prev) => [
+      ...prev.filter((sid) => !data.left.includes(sid)),
+      ...data.joined.filter((sid) => !prev.includes(sid)),
+    ]);
+    setDeadline(localDeadline(data));
   }, []);
 
   const handleNewGame = useCallback(
     (game: NewGame) => {
-      socket.emit(ClientEvent.JOIN_GAME, { game_id: game.id });
+      socket.emit(ClientEvent.JOIN_GAME, {
+        game_id: game.id,
+        token: loadSession()?.token ?? "",
+      });
       router.push(`/game/${game.id}`);
     },
     [router]
@@ -29,12 +45,14 @@ export default function useJoinLobby() {
 
   useEffect(() => {
     socket.on(ServerEvent.LOBBY_UPDATE, handleLobbyUpdate);
+    socket.on(ServerEvent.LOBBY_DELTA, handleLobbyDelta);
     socket.on(ServerEvent.NEW_GAME, handleNewGame);
     return () => {
       socket.off(ServerEvent.LOBBY_UPDATE, handleLobbyUpdate);
+      socket.off(ServerEvent.LOBBY_DELTA, handleLobbyDelta);
       socket.off(ServerEvent.NEW_GAME, handleNewGame);
     };
-  }, [handleLobbyUpdate, handleNewGame]);
+  }, [handleLobbyUpdate, handleLobbyDelta, handleNewGame]);
 
-  return { onJoinLobby, isJoined, timeRemaining };
+  return { onJoinLobby, isJoined, players, timeRemaining };
 }
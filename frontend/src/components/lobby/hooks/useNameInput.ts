@@ -1,8 +1,12 @@
 import { ClientEvent } from "@/shared/events";
+import { saveName } from "@/shared/session";
 import socket from "@/shared/socket";
 import { useState } from "react";
+import { PlayerRegistered } from "../types";
 
-export default function useNameInput() {
+export default function useNameInput(
+  onRegistered: (registered: PlayerRegistered) => void
+) {
   const [nameInput, setNameInput] = useState("");
 
   const onChangeName = (e: React.ChangeEvent<HTMLInputElement>) => {
@@ -10,7 +14,8 @@ export default function useNameInput() {
   };
 
   const onSubmitName = () => {
-    socket.emit(ClientEvent.NEW_PLAYER, { name: nameInput });
+    saveName(nameInput);
+    socket.emit(ClientEvent.NEW_PLAYER, { name: nameInput }, onRegistered);
   };
 
   return { nameInput, onChangeName, onSubmitName };
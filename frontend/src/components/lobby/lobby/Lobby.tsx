@@ -9,8 +9,8 @@ import usePlayerInfo from "../hooks/usePlayerInfo";
 import useNameInput from "../hooks/useNameInput";
 
 export default function LobbyScreen() {
-  const { isRegistered } = usePlayerInfo();
-  const { nameInput, onChangeName, onSubmitName } = useNameInput();
+  const { isRegistered, onRegistered } = usePlayerInfo();
+  const { nameInput, onChangeName, onSubmitName } = useNameInput(onRegistered);
   const { onJoinLobby, isJoined, timeRemaining } = useJoinLobby();
 
   return (
@@ -9,10 +9,24 @@ export interface PlayerInfo {
   name: string;
 }
 
+export interface PlayerRegistered {
+  token: string;
+}
+
 export interface LobbyUpdate {
   players: string[];
-  time_remaining: number;
-  should_start_game: boolean;
+  deadline: number;
+  server_time: number;
+  room: string;
+  destination_id: string;
+}
+
+export interface LobbyDelta {
+  joined: string[];
+  left: string[];
+  deadline: number;
+  server_time: number;
+  room: string;
 }
 
 export interface NewGame {
@@ -0,0 +1,24 @@
+import { useEffect, useState } from "react";
+
+const COUNTDOWN_INTERVAL_MS = 250;
+
+// Converts a server deadline to local time, so clock skew does not matter.
+export function localDeadline(data: { deadline: number; server_time: number }) {
+  return Date.now() + (data.deadline - data.server_time) * 1000;
+}
+
+// Counts down to a local deadline, in whole seconds.
+export function useCountdown(deadline: number | null) {
+  const [timeRemaining, setTimeRemaining] = useState<number | null>(null);
+
+  useEffect(() => {
+    if (deadline === null) return;
+    const tick = () =>
+      setTimeRemaining(Math.max(0, Math.ceil((deadline - Date.now()) / 1000)));
+    tick();
+    const interval = setInterval(tick, COUNTDOWN_INTERVAL_MS);
+    return () => clearInterval(interval);
+  }, [deadline]);
+
+  return timeRemaining;
+}
@@ -1,6 +1,7 @@
 export enum ClientEvent {
   GET_PLAYER = "get_player",
   NEW_PLAYER = "new_player",
+  RESUME_SESSION = "resume_session",
   JOIN_LOBBY = "join_lobby",
   JOIN_GAME = "join_game",
   SET_BOT_LEVEL = "set_bot_level",
@@ -12,10 +13,13 @@ export enum ClientEvent {
 }
 
 export enum ServerEvent {
-  PLAYER_INFO = "player_info",
-  PLAYER_REGISTERED = "player_registered",
   LOBBY_UPDATE = "lobby_update",
+  LOBBY_DELTA = "lobby_delta",
   NEW_GAME = "new_game",
   GAME_UPDATE = "game_update",
+  GAME_DELTA = "game_delta",
+  SHOW_UPDATE = "show_update",
+  SHOW_RESULT = "show_result",
   MESSAGE = "server_message",
+  CHAT = "chat",
 }
@@ -0,0 +1,23 @@
+// The session token and name of this tab's player, kept across reconnects so
+// the player can reclaim their seat in a game under a new socket id.
+const TOKEN_KEY = "session:token";
+const NAME_KEY = "session:name";
+
+export interface Session {
+  token: string;
+  name: string;
+}
+
+export function saveToken(token: string) {
+  sessionStorage.setItem(TOKEN_KEY, token);
+}
+
+export function saveName(name: string) {
+  sessionStorage.setItem(NAME_KEY, name);
+}
+
+export function loadSession(): Session | null {
+  const token = sessionStorage.getItem(TOKEN_KEY);
+  if (!token) return null;
+  return { token, name: sessionStorage.getItem(NAME_KEY) ?? "" };
+}